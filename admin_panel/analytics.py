@@ -0,0 +1,155 @@
+# admin_panel/analytics.py - Time-bucketed queries for the analytics charts
+#
+# All series read the daily rollup tables (see admin_panel.rollups), so the
+# cost depends on the number of days in the range, not on the order history.
+
+from datetime import date, datetime, timedelta
+
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from store.models import Order
+from .models import DailySalesRollup, DailyProductSales, DailyCitySales, DailyServiceRollup
+
+REVENUE_STATUSES = ['PROCESSING', 'SHIPPED', 'DELIVERED']
+
+
+def month_starts(count, today=None):
+    """First day of the last `count` calendar months, oldest first"""
+    today = today or timezone.localdate()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append(date(year, month, 1))
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+    return list(reversed(months))
+
+
+def day_range(count, today=None):
+    """The last `count` days up to and including today, oldest first"""
+    today = today or timezone.localdate()
+    return [today - timedelta(days=i) for i in range(count - 1, -1, -1)]
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def monthly_revenue(months=12):
+    """Revenue per calendar month for the last `months` months in one GROUP BY query"""
+    buckets = month_starts(months)
+    rows = DailySalesRollup.objects.filter(
+        day__gte=buckets[0],
+        status__in=REVENUE_STATUSES,
+    ).annotate(
+        bucket=TruncMonth('day')
+    ).values('bucket').annotate(
+        total=Sum('revenue')
+    ).order_by()
+
+    totals = {row['bucket']: float(row['total'] or 0) for row in rows}
+    return [
+        {'month': month.strftime('%b %y'), 'amount': totals.get(month, 0)}
+        for month in buckets
+    ]
+
+
+def _daily_series(queryset, count_field, days):
+    buckets = day_range(days)
+    rows = queryset.filter(day__gte=buckets[0]).values('day').annotate(
+        count=Sum(count_field)
+    ).order_by()
+
+    counts = {row['day']: row['count'] for row in rows}
+    return [
+        {'day': day.strftime('%m/%d'), 'count': counts.get(day, 0)}
+        for day in buckets
+    ]
+
+
+def daily_orders(days=30):
+    """Orders placed per day for the last `days` days"""
+    return _daily_series(DailySalesRollup.objects.all(), 'order_count', days)
+
+
+def daily_services(days=30):
+    """Service requests per day for the last `days` days"""
+    return _daily_series(DailyServiceRollup.objects.all(), 'request_count', days)
+
+
+def status_distribution(first_day, last_day):
+    """Order count and share per status in the given days, in STATUS_CHOICES order"""
+    counts = dict(
+        DailySalesRollup.objects.filter(day__gte=first_day, day__lte=last_day)
+        .values_list('status')
+        .annotate(count=Sum('order_count'))
+        .order_by()
+    )
+    total = sum(counts.values())
+
+    distribution = []
+    for status_code, status_name in Order.STATUS_CHOICES:
+        count = counts.get(status_code, 0)
+        if count > 0:
+            distribution.append({
+                'status': status_name,
+                'count': count,
+                'percentage': count / total * 100,
+            })
+    return distribution
+
+
+def period_order_summary(first_day, last_day, previous_first_day):
+    """Order count and revenue for the current and previous period in one query"""
+    current = Q(day__gte=first_day, day__lte=last_day)
+    previous = Q(day__gte=previous_first_day, day__lt=first_day)
+    revenue = Q(status__in=REVENUE_STATUSES)
+
+    summary = DailySalesRollup.objects.filter(
+        day__gte=previous_first_day, day__lte=last_day
+    ).aggregate(
+        current_orders=Sum('order_count', filter=current),
+        previous_orders=Sum('order_count', filter=previous),
+        current_revenue=Sum('revenue', filter=current & revenue),
+        previous_revenue=Sum('revenue', filter=previous & revenue),
+    )
+    summary['current_orders'] = summary['current_orders'] or 0
+    summary['previous_orders'] = summary['previous_orders'] or 0
+    summary['current_revenue'] = float(summary['current_revenue'] or 0)
+    summary['previous_revenue'] = float(summary['previous_revenue'] or 0)
+    return summary
+
+
+def revenue_totals(month_start):
+    """All-time revenue and revenue since month_start in one query"""
+    totals = DailySalesRollup.objects.filter(status__in=REVENUE_STATUSES).aggregate(
+        all_time=Sum('revenue'),
+        current_month=Sum('revenue', filter=Q(day__gte=month_start)),
+    )
+    return {
+        'revenue': float(totals['all_time'] or 0),
+        'current_month_revenue': float(totals['current_month'] or 0),
+    }
+
+
+def top_products(first_day, last_day, limit=5):
+    """Best selling products by revenue in the given days"""
+    return DailyProductSales.objects.filter(
+        day__gte=first_day, day__lte=last_day
+    ).values('product_name').annotate(
+        total_quantity=Sum('quantity'),
+        total_sales=Sum('revenue'),
+    ).order_by('-total_sales')[:limit]
+
+
+def top_cities(first_day, last_day, limit=5):
+    """Cities with the most orders in the given days"""
+    return DailyCitySales.objects.filter(
+        day__gte=first_day, day__lte=last_day
+    ).values('city', 'state').annotate(
+        order_count=Sum('order_count'),
+    ).order_by('-order_count')[:limit]
@@ -6,4 +6,7 @@ from django.apps import AppConfig
 class AdminPanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'admin_panel'
-    verbose_name = 'TechVerse Admin Panel'
\ No newline at end of file
+    verbose_name = 'TechVerse Admin Panel'
+
+    def ready(self):
+        from . import signals  # noqa: F401
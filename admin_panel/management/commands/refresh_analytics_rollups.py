@@ -0,0 +1,89 @@
+# admin_panel/management/commands/refresh_analytics_rollups.py
+
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from store.models import Order
+from services.models import ServiceRequest
+from admin_panel.rollups import local_day, rebuild_range, refresh_dirty_days
+
+class Command(BaseCommand):
+    help = 'Refresh the daily analytics rollup tables (only days touched since the last run by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild every day from the first order/service request until today',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Rebuild every day from this date (YYYY-MM-DD) until today',
+        )
+        parser.add_argument(
+            '--batch-days',
+            type=int,
+            default=31,
+            help='Days rebuilt per transaction (default: 31)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh touched days every N seconds',
+        )
+
+    def handle(self, *args, **options):
+        batch_days = max(options['batch_days'], 1)
+
+        if options['full'] or options['since']:
+            first_day = self._first_day(options)
+            if first_day is None:
+                self.stdout.write(self.style.SUCCESS('No orders or service requests yet. Nothing to build.'))
+            else:
+                self._rebuild(first_day, timezone.localdate(), batch_days)
+
+        while True:
+            refreshed = 0
+            while True:
+                count = refresh_dirty_days(limit=batch_days)
+                if not count:
+                    break
+                refreshed += count
+            if refreshed:
+                self.stdout.write(self.style.SUCCESS(f'Refreshed {refreshed} touched day(s)'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _first_day(self, options):
+        if options['since']:
+            try:
+                return date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        firsts = [
+            Order.objects.aggregate(first=Min('order_date'))['first'],
+            ServiceRequest.objects.aggregate(first=Min('request_date'))['first'],
+        ]
+        firsts = [local_day(value) for value in firsts if value]
+        return min(firsts) if firsts else None
+
+    def _rebuild(self, first_day, last_day, batch_days):
+        current = first_day
+        while current <= last_day:
+            batch_end = min(current + timedelta(days=batch_days - 1), last_day)
+            rebuild_range(current, batch_end)
+            self.stdout.write(f'Rebuilt {current} to {batch_end}')
+            current = batch_end + timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rollups rebuilt from {first_day} to {last_day}')
+        )
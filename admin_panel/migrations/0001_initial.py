@@ -0,0 +1,114 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def mark_existing_days_dirty(apps, schema_editor):
+    # The rollups themselves are built by `manage.py refresh_analytics_rollups`
+    Order = apps.get_model('store', 'Order')
+    ServiceRequest = apps.get_model('services', 'ServiceRequest')
+    RollupDirtyDay = apps.get_model('admin_panel', 'RollupDirtyDay')
+
+    days = set(
+        Order.objects.annotate(day=TruncDate('order_date')).values_list('day', flat=True).distinct()
+    )
+    days.update(
+        ServiceRequest.objects.annotate(day=TruncDate('request_date')).values_list('day', flat=True).distinct()
+    )
+    RollupDirtyDay.objects.bulk_create(
+        [RollupDirtyDay(day=day) for day in days if day],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('services', '0003_jobsheet_jobsheetmaterial'),
+        ('store', '0005_order_total_amount_order_item_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('marked_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCitySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('city', models.CharField(max_length=100)),
+                ('state', models.CharField(max_length=100)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily City Sales',
+                'verbose_name_plural': 'Daily City Sales',
+                'ordering': ['day', 'city'],
+                'unique_together': {('day', 'city', 'state')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Rollup',
+                'ordering': ['day', 'status'],
+                'unique_together': {('day', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('product_name', models.CharField(max_length=255)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='store.product')),
+            ],
+            options={
+                'verbose_name': 'Daily Product Sales',
+                'verbose_name_plural': 'Daily Product Sales',
+                'ordering': ['day', 'product_name'],
+                'unique_together': {('day', 'product')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyServiceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('service_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='services.servicecategory')),
+            ],
+            options={
+                'verbose_name': 'Daily Service Rollup',
+                'ordering': ['day', 'service_category'],
+                'unique_together': {('day', 'service_category', 'status')},
+            },
+        ),
+        migrations.RunPython(mark_existing_days_dirty, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# admin_panel/models.py - Daily rollup tables backing the analytics pages
+
+from django.db import models
+from decimal import Decimal
+
+
+class DailySalesRollup(models.Model):
+    """Orders and revenue per day and order status"""
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    order_count = models.PositiveIntegerField(default=0)
+    item_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        ordering = ['day', 'status']
+        unique_together = ['day', 'status']
+        verbose_name = 'Daily Sales Rollup'
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.order_count} orders"
+
+
+class DailyProductSales(models.Model):
+    """Units sold and revenue per day and product"""
+    day = models.DateField()
+    product = models.ForeignKey('store.Product', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    product_name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        ordering = ['day', 'product_name']
+        unique_together = ['day', 'product']
+        verbose_name = 'Daily Product Sales'
+        verbose_name_plural = 'Daily Product Sales'
+
+    def __str__(self):
+        return f"{self.day} {self.product_name}: {self.quantity}"
+
+
+class DailyCitySales(models.Model):
+    """Orders per day and shipping city"""
+    day = models.DateField()
+    city = models.CharField(max_length=100)
+    state = models.CharField(max_length=100)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day', 'city']
+        unique_together = ['day', 'city', 'state']
+        verbose_name = 'Daily City Sales'
+        verbose_name_plural = 'Daily City Sales'
+
+    def __str__(self):
+        return f"{self.day} {self.city}, {self.state}: {self.order_count}"
+
+
+class DailyServiceRollup(models.Model):
+    """Service requests per day, category and status"""
+    day = models.DateField()
+    service_category = models.ForeignKey('services.ServiceCategory', on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20)
+    request_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day', 'service_category']
+        unique_together = ['day', 'service_category', 'status']
+        verbose_name = 'Daily Service Rollup'
+
+    def __str__(self):
+        return f"{self.day} {self.service_category_id} {self.status}: {self.request_count}"
+
+
+class RollupDirtyDay(models.Model):
+    """A day whose rollups are out of date because an order or service on it changed"""
+    day = models.DateField(unique=True)
+    marked_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-day']
+
+    def __str__(self):
+        return str(self.day)
@@ -0,0 +1,156 @@
+# admin_panel/rollups.py - Build and incrementally refresh the daily rollup tables
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from store.models import Order, OrderItem
+from services.models import ServiceRequest
+from .models import (
+    DailySalesRollup, DailyProductSales, DailyCitySales, DailyServiceRollup, RollupDirtyDay
+)
+from .analytics import start_of_day
+
+
+def local_day(value):
+    """Calendar day (in TIME_ZONE) that a timestamp belongs to"""
+    return timezone.localtime(value).date()
+
+
+def mark_days_dirty(days):
+    """Queue days for the next refresh - safe to call repeatedly for the same day"""
+    days = {day for day in days if day is not None}
+    if days:
+        now = timezone.now()
+        # An already queued day gets a fresh marked_at rather than being skipped
+        RollupDirtyDay.objects.bulk_create(
+            [RollupDirtyDay(day=day, marked_at=now) for day in days],
+            update_conflicts=True,
+            unique_fields=['day'],
+            update_fields=['marked_at'],
+        )
+
+
+def rebuild_range(first_day, last_day):
+    """
+    Recompute every rollup row for first_day..last_day (inclusive) with one
+    grouped query per table, replacing whatever was stored for those days.
+    """
+    start = start_of_day(first_day)
+    end = start_of_day(last_day + timedelta(days=1))
+    tz = timezone.get_current_timezone()
+
+    orders = Order.objects.filter(order_date__gte=start, order_date__lt=end).annotate(
+        day=TruncDate('order_date', tzinfo=tz)
+    )
+    # Annotation names must not shadow the columns being aggregated
+    sales = orders.values('day', 'status').annotate(
+        orders=Count('id'),
+        items=Sum('item_count'),
+        sales=Sum('total_amount'),
+    ).order_by()
+    cities = orders.filter(shipping_address__isnull=False).values(
+        'day', 'shipping_address__city', 'shipping_address__state'
+    ).annotate(order_count=Count('id')).order_by()
+
+    products = OrderItem.objects.filter(
+        order__order_date__gte=start, order__order_date__lt=end
+    ).annotate(
+        day=TruncDate('order__order_date', tzinfo=tz)
+    ).values('day', 'product_id', 'product__name').annotate(
+        units=Sum('quantity'),
+        sales=Sum(OrderItem.line_total_expression()),
+    ).order_by()
+
+    services = ServiceRequest.objects.filter(
+        request_date__gte=start, request_date__lt=end
+    ).annotate(
+        day=TruncDate('request_date', tzinfo=tz)
+    ).values('day', 'service_category_id', 'status').annotate(
+        request_count=Count('id')
+    ).order_by()
+
+    day_range = {'day__gte': first_day, 'day__lte': last_day}
+    with transaction.atomic():
+        DailySalesRollup.objects.filter(**day_range).delete()
+        DailySalesRollup.objects.bulk_create([
+            DailySalesRollup(
+                day=row['day'],
+                status=row['status'],
+                order_count=row['orders'],
+                item_count=row['items'] or 0,
+                revenue=row['sales'] or 0,
+            )
+            for row in sales
+        ])
+
+        DailyCitySales.objects.filter(**day_range).delete()
+        DailyCitySales.objects.bulk_create([
+            DailyCitySales(
+                day=row['day'],
+                city=row['shipping_address__city'],
+                state=row['shipping_address__state'],
+                order_count=row['order_count'],
+            )
+            for row in cities
+        ])
+
+        DailyProductSales.objects.filter(**day_range).delete()
+        DailyProductSales.objects.bulk_create([
+            DailyProductSales(
+                day=row['day'],
+                product_id=row['product_id'],
+                product_name=row['product__name'],
+                quantity=row['units'] or 0,
+                revenue=row['sales'] or 0,
+            )
+            for row in products
+        ])
+
+        DailyServiceRollup.objects.filter(**day_range).delete()
+        DailyServiceRollup.objects.bulk_create([
+            DailyServiceRollup(
+                day=row['day'],
+                service_category_id=row['service_category_id'],
+                status=row['status'],
+                request_count=row['request_count'],
+            )
+            for row in services
+        ])
+
+
+def refresh_dirty_days(limit=None):
+    """
+    Rebuild the days queued by mark_days_dirty(), most recent first.
+    Returns the number of days refreshed. Concurrent refreshers skip days
+    another worker is already rebuilding.
+
+    The days are claimed (their queue rows deleted) before the rebuild, so
+    an order or service committed while it runs queues its day again
+    instead of being dropped with the claimed row. A failed rebuild puts
+    the days back in the queue.
+    """
+    with transaction.atomic():
+        dirty = RollupDirtyDay.objects.select_for_update(skip_locked=True).order_by('-day')
+        if limit:
+            dirty = dirty[:limit]
+        days = list(dirty.values_list('day', flat=True))
+        RollupDirtyDay.objects.filter(day__in=days).delete()
+
+    try:
+        for day in days:
+            rebuild_range(day, day)
+    except Exception:
+        mark_days_dirty(days)
+        raise
+
+    return len(days)
+
+
+def refresh_on_read():
+    """Bring the most recently touched days up to date before an analytics page reads them"""
+    return refresh_dirty_days(limit=getattr(settings, 'ANALYTICS_ROLLUP_REFRESH_ON_READ_DAYS', 7))
@@ -0,0 +1,38 @@
+# admin_panel/signals.py - Keep cached dashboard stats and analytics rollups in step with order/service changes
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from store.models import Order, OrderItem
+from services.models import ServiceRequest, JobSheet
+from .stats import invalidate_admin_stats
+from .rollups import local_day, mark_days_dirty
+
+
+@receiver([post_save, post_delete], sender=Order)
+@receiver([post_save, post_delete], sender=OrderItem)
+@receiver([post_save, post_delete], sender=ServiceRequest)
+@receiver([post_save, post_delete], sender=JobSheet)
+def invalidate_stats_on_change(sender, **kwargs):
+    # After commit: deleted earlier, a dashboard load before the commit would cache the old counts again
+    transaction.on_commit(invalidate_admin_stats)
+
+
+@receiver([post_save, post_delete], sender=Order)
+def mark_order_day_dirty(sender, instance, **kwargs):
+    mark_days_dirty([local_day(instance.order_date)])
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def mark_order_item_day_dirty(sender, instance, **kwargs):
+    try:
+        order = instance.order
+    except Order.DoesNotExist:
+        return  # Deleted together with its order, which marks the day itself
+    mark_days_dirty([local_day(order.order_date)])
+
+
+@receiver([post_save, post_delete], sender=ServiceRequest)
+def mark_service_day_dirty(sender, instance, **kwargs):
+    mark_days_dirty([local_day(instance.request_date)])
@@ -0,0 +1,101 @@
+# admin_panel/stats.py - Aggregated counters for the admin dashboards
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from ecom_project.instrumentation import record_cache
+from store.models import Order, Product
+from services.models import ServiceRequest, TechnicianRating, JobSheet
+from . import analytics, rollups
+
+User = get_user_model()
+
+ADMIN_STATS_CACHE_KEY = 'admin_panel:stats'
+LOW_STOCK_THRESHOLD = 5
+
+
+def _order_stats():
+    stats = Order.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='PENDING')),
+        processing=Count('id', filter=Q(status='PROCESSING')),
+        delivered=Count('id', filter=Q(status='DELIVERED')),
+        unassigned=Count('id', filter=Q(technician__isnull=True)),
+    )
+    # Revenue comes from the daily sales rollup rather than the order table
+    stats.update(analytics.revenue_totals(timezone.localdate().replace(day=1)))
+    return stats
+
+
+def _service_stats():
+    return ServiceRequest.objects.aggregate(
+        total=Count('id'),
+        submitted=Count('id', filter=Q(status='SUBMITTED')),
+        in_progress=Count('id', filter=Q(status='IN_PROGRESS')),
+        completed=Count('id', filter=Q(status='COMPLETED')),
+        unassigned=Count('id', filter=Q(technician__isnull=True)),
+    )
+
+
+def _user_stats():
+    return User.objects.aggregate(
+        total=Count('id'),
+        customers=Count('id', filter=Q(role='CUSTOMER')),
+        technicians=Count('id', filter=Q(role='TECHNICIAN')),
+        active_technicians=Count('id', filter=Q(role='TECHNICIAN', is_active=True)),
+    )
+
+
+def _product_stats():
+    return Product.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        low_stock=Count('id', filter=Q(stock__lt=LOW_STOCK_THRESHOLD)),
+    )
+
+
+def _job_sheet_stats():
+    return JobSheet.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(approval_status='PENDING')),
+        approved=Count('id', filter=Q(approval_status='APPROVED')),
+        declined=Count('id', filter=Q(approval_status='DECLINED')),
+    )
+
+
+def _rating_stats():
+    stats = TechnicianRating.objects.aggregate(average=Avg('rating'), total=Count('id'))
+    stats['average'] = stats['average'] or 0
+    return stats
+
+
+def get_admin_stats():
+    """
+    Return every dashboard counter, grouped by area (orders, services, users,
+    products, job_sheets, ratings). One conditional-aggregation query per
+    table, cached for ADMIN_STATS_CACHE_TIMEOUT seconds.
+    """
+    stats = cache.get(ADMIN_STATS_CACHE_KEY)
+    if stats is None:
+        record_cache(misses=1)
+        rollups.refresh_on_read()
+        stats = {
+            'orders': _order_stats(),
+            'services': _service_stats(),
+            'users': _user_stats(),
+            'products': _product_stats(),
+            'job_sheets': _job_sheet_stats(),
+            'ratings': _rating_stats(),
+        }
+        cache.set(ADMIN_STATS_CACHE_KEY, stats, getattr(settings, 'ADMIN_STATS_CACHE_TIMEOUT', 60))
+    else:
+        record_cache(hits=1)
+    return stats
+
+
+def invalidate_admin_stats():
+    """Drop the cached counters so the next dashboard load recomputes them"""
+    cache.delete(ADMIN_STATS_CACHE_KEY)
@@ -47,6 +47,7 @@ urlpatterns = [
     # API endpoints for AJAX operations
     path('api/stats/', views.admin_stats_api, name='api_stats'),
     path('api/orders/<int:order_id>/', views.get_order_details_api, name='api_order_details'),
+    path('api/product-images/status/', views.product_image_status_api, name='api_product_image_status'),
     path('api/assign-technician/', views.assign_technician_api, name='api_assign_technician'),
     path('api/assign-service-technician/', views.assign_service_technician_api, name='api_assign_service_technician'),
     path('api/update-order-status/', views.update_order_status_api, name='api_update_order_status'),
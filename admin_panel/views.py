@@ -7,7 +7,8 @@ from django.views import View
 from django.views.generic import TemplateView
 from django.http import JsonResponse
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Sum, Avg, Q, F, DecimalField
+from django.db.models import Count, Sum, Avg, Q, F, DecimalField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
 from django.contrib import messages
 from django.views.decorators.http import require_POST
@@ -22,11 +23,15 @@ from django.utils import timezone
 import os
 
 # Import models
-from store.models import Product, ProductCategory, Order, OrderItem, ProductImage, ProductSpecification
+from store.models import Product, ProductCategory, Order, OrderItem, ProductImage, ProductImageUpload, ProductSpecification
+from store.search import search_products
+from store.uploads import stage_product_image, upload_status
 from services.models import ServiceRequest, ServiceCategory, TechnicianRating, ServiceIssue
 from users.models import CustomUser
 from users.forms import CustomUserCreationForm
 from django.views.decorators.http import require_http_methods
+from .stats import get_admin_stats
+from . import analytics, rollups
 
 User = get_user_model()
 
@@ -37,24 +42,21 @@ class AdminDashboardView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get current month and last month for comparison
-        now = timezone.now()
-        current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+        stats = get_admin_stats()
         
-        # Basic stats - ALL REAL DATA
+        # Basic stats - ALL REAL DATA (aggregated + cached in admin_panel.stats)
         context.update({
-            'total_users': User.objects.count(),
-            'total_customers': User.objects.filter(role='CUSTOMER').count(),
-            'total_technicians': User.objects.filter(role='TECHNICIAN').count(),
-            'total_products': Product.objects.count(),
-            'active_products': Product.objects.filter(is_active=True).count(),
-            'total_orders': Order.objects.count(),
-            'pending_orders': Order.objects.filter(status='PENDING').count(),
-            'unassigned_orders': Order.objects.filter(technician__isnull=True).count(),
-            'total_services': ServiceRequest.objects.count(),
-            'pending_services': ServiceRequest.objects.filter(status='SUBMITTED').count(),
-            'unassigned_services': ServiceRequest.objects.filter(technician__isnull=True).count(),
+            'total_users': stats['users']['total'],
+            'total_customers': stats['users']['customers'],
+            'total_technicians': stats['users']['technicians'],
+            'total_products': stats['products']['total'],
+            'active_products': stats['products']['active'],
+            'total_orders': stats['orders']['total'],
+            'pending_orders': stats['orders']['pending'],
+            'unassigned_orders': stats['orders']['unassigned'],
+            'total_services': stats['services']['total'],
+            'pending_services': stats['services']['submitted'],
+            'unassigned_services': stats['services']['unassigned'],
         })
         
         # Recent orders - REAL DATA
@@ -65,28 +67,26 @@ class AdminDashboardView(TemplateView):
             'customer', 'technician', 'service_category'
         ).order_by('-request_date')[:10]
         
-        # Monthly revenue - REAL DATA (calculated from OrderItems)
-        try:
-            current_month_revenue_data = OrderItem.objects.filter(
-                order__order_date__gte=current_month_start,
-                order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-            ).aggregate(
-                total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-            )
-            current_month_revenue = float(current_month_revenue_data['total'] or 0)
-        except:
-            current_month_revenue = 0
-        
-        context['current_month_revenue'] = current_month_revenue
+        # Monthly revenue - REAL DATA (stored order totals)
+        context['current_month_revenue'] = stats['orders']['current_month_revenue']
         
         # Top technicians by rating - REAL DATA
+        # One subquery per figure: joining ratings, orders and services in a
+        # single GROUP BY multiplies the rows (and the counts) per technician
+        def per_technician(queryset, aggregate):
+            return Subquery(
+                queryset.filter(technician=OuterRef('pk')).order_by().values('technician')
+                .annotate(value=aggregate).values('value')
+            )
+
         context['top_technicians'] = User.objects.filter(
             role='TECHNICIAN'
         ).annotate(
-            avg_rating=Avg('ratings_received__rating'),
-            total_orders=Count('assigned_orders'),
-            total_services=Count('assigned_services'),
-            total_jobs=Count('assigned_orders') + Count('assigned_services')
+            avg_rating=per_technician(TechnicianRating.objects, Avg('rating')),
+            total_orders=Coalesce(per_technician(Order.objects, Count('id')), 0),
+            total_services=Coalesce(per_technician(ServiceRequest.objects, Count('id')), 0),
+        ).annotate(
+            total_jobs=F('total_orders') + F('total_services')
         ).order_by('-avg_rating')[:5]
         
         return context
@@ -147,19 +147,26 @@ class AdminProductsView(View):
             products = products.filter(is_active=False)
         
         if search:
-            products = products.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(brand__icontains=search)
-            )
-        
-        products = products.order_by('-created_at')
+            # Ranked full-text/trigram search, same engine as /api/products/search/
+            products = search_products(products, search)
+        else:
+            products = products.order_by('-created_at')
         
         # Pagination
         paginator = Paginator(products, 20)
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
         
+        # Images still waiting for the upload worker (the page polls their status)
+        pending_images = dict(
+            ProductImageUpload.objects.filter(
+                product__in=[product.id for product in page_obj],
+                status__in=['PENDING', 'PROCESSING'],
+            ).values_list('product').annotate(count=Count('id')).order_by()
+        )
+        for product in page_obj:
+            product.pending_images = pending_images.get(product.id, 0)
+        
         context = {
             'products': page_obj,
             'categories': ProductCategory.objects.all(),
@@ -170,6 +177,11 @@ class AdminProductsView(View):
         
         return render(request, 'admin_panel/products.html', context)
 
+def images_processing_note(staged):
+    if not staged:
+        return ''
+    return f" {staged} image{'s are' if staged > 1 else ' is'} being processed and will appear shortly."
+
 @method_decorator(staff_member_required, name='dispatch')
 class AdminCreateProductView(View):
     def get(self, request):
@@ -237,21 +249,24 @@ class AdminCreateProductView(View):
                     is_featured=is_featured
                 )
                 
-                # Handle main image
+                # Images are staged here and published by `manage.py process_image_uploads`
+                staged = 0
                 if 'image' in request.FILES:
-                    product.image = request.FILES['image']
-                    product.save()
+                    stage_product_image(product, request.FILES['image'], ProductImageUpload.MAIN)
+                    staged += 1
                 
                 # Handle additional images
                 if 'additional_images' in request.FILES:
                     additional_images = request.FILES.getlist('additional_images')
                     for i, image_file in enumerate(additional_images[:10]):
-                        ProductImage.objects.create(
-                            product=product,
-                            image=image_file,
+                        stage_product_image(
+                            product,
+                            image_file,
+                            ProductImageUpload.ADDITIONAL,
                             alt_text=f"{product.name} - Image {i+1}",
                             order=i
                         )
+                        staged += 1
                 
                 # Handle specifications
                 spec_names = request.POST.getlist('spec_names[]')
@@ -266,7 +281,7 @@ class AdminCreateProductView(View):
                             order=i
                         )
                 
-                messages.success(request, f'Product "{product.name}" created successfully!')
+                messages.success(request, f'Product "{product.name}" created successfully!{images_processing_note(staged)}')
                 return redirect('admin_panel:products')
                 
         except Exception as e:
@@ -311,14 +326,14 @@ class AdminEditProductView(View):
                     category = get_object_or_404(ProductCategory, id=category_id)
                     product.category = category
                 
-                # Handle new main image
-                if 'new_main_image' in request.FILES:
-                    if product.image:
-                        product.image.delete()
-                    product.image = request.FILES['new_main_image']
-                
                 product.save()
                 
+                # Handle new main image (replaces the current one once processed)
+                staged = 0
+                if 'new_main_image' in request.FILES:
+                    stage_product_image(product, request.FILES['new_main_image'], ProductImageUpload.MAIN)
+                    staged += 1
+                
                 # Handle removed images
                 removed_images = request.POST.getlist('removed_images[]')
                 for image_id in removed_images:
@@ -330,15 +345,20 @@ class AdminEditProductView(View):
                 
                 # Handle new additional images
                 if 'new_additional_images' in request.FILES:
-                    existing_count = product.additional_images.count()
+                    # Count images still being processed too so the new ones go last
+                    existing_count = product.additional_images.count() + product.image_uploads.filter(
+                        target=ProductImageUpload.ADDITIONAL, status__in=['PENDING', 'PROCESSING']
+                    ).count()
                     new_images = request.FILES.getlist('new_additional_images')
                     for i, image_file in enumerate(new_images[:10]):
-                        ProductImage.objects.create(
-                            product=product,
-                            image=image_file,
+                        stage_product_image(
+                            product,
+                            image_file,
+                            ProductImageUpload.ADDITIONAL,
                             alt_text=f"{product.name} - Image {existing_count + i + 1}",
                             order=existing_count + i
                         )
+                        staged += 1
                 
                 # Update specifications
                 product.specifications.all().delete()
@@ -355,7 +375,7 @@ class AdminEditProductView(View):
                             order=i
                         )
                 
-                messages.success(request, f'Product "{product.name}" updated successfully!')
+                messages.success(request, f'Product "{product.name}" updated successfully!{images_processing_note(staged)}')
                 return redirect('admin_panel:products')
                 
         except Exception as e:
@@ -383,7 +403,7 @@ class AdminCreateUserView(View):
         from services.models import ServiceCategory
         
         form = CustomUserCreationForm()
-        service_categories = ServiceCategory.objects.all()
+        service_categories = ServiceCategory.objects.prefetch_related('issues')
         
         return render(request, 'admin_panel/create_user.html', {
             'form': form,
@@ -413,7 +433,7 @@ class AdminCreateUserView(View):
                     messages.error(request, f'{field}: {error}')
         
         from services.models import ServiceCategory
-        service_categories = ServiceCategory.objects.all()
+        service_categories = ServiceCategory.objects.prefetch_related('issues')
         
         return render(request, 'admin_panel/create_user.html', {
             'form': form,
@@ -423,10 +443,10 @@ class AdminCreateUserView(View):
 @method_decorator(staff_member_required, name='dispatch')
 class AdminEditUserView(View):
     def get(self, request, user_id):
-        user_obj = get_object_or_404(User, id=user_id)
+        user_obj = get_object_or_404(User.objects.prefetch_related('free_service_categories'), id=user_id)
         
         from services.models import ServiceCategory
-        service_categories = ServiceCategory.objects.all()
+        service_categories = ServiceCategory.objects.prefetch_related('issues')
         
         context = {
             'user_obj': user_obj,
@@ -484,12 +504,29 @@ class AdminDeleteUserView(View):
         return redirect('admin_panel:users')
 
 # ==================== ORDERS MANAGEMENT ====================
+ORDER_SORT_CHOICES = (
+    ('newest', 'Newest First'),
+    ('oldest', 'Oldest First'),
+    ('total_desc', 'Highest Total'),
+    ('total_asc', 'Lowest Total'),
+)
+
+ORDER_SORT_FIELDS = {
+    'newest': ('-order_date',),
+    'oldest': ('order_date',),
+    'total_desc': ('-total_amount', '-order_date'),
+    'total_asc': ('total_amount', '-order_date'),
+}
+
 @method_decorator(staff_member_required, name='dispatch')
 class AdminOrdersView(View):
     def get(self, request):
         status_filter = request.GET.get('status', '')
         technician_filter = request.GET.get('technician', '')
         search = request.GET.get('search', '')
+        sort = request.GET.get('sort', 'newest')
+        if sort not in ORDER_SORT_FIELDS:
+            sort = 'newest'
         
         orders = Order.objects.select_related('customer', 'technician', 'shipping_address').prefetch_related('items__product')
         
@@ -508,14 +545,15 @@ class AdminOrdersView(View):
                 Q(customer__email__icontains=search)
             )
         
-        orders = orders.order_by('-order_date')
+        # Totals are stored on the order, so sorting by them stays in SQL
+        orders = orders.order_by(*ORDER_SORT_FIELDS[sort])
         
         # REAL STATS
-        all_orders = Order.objects.all()
-        pending_count = all_orders.filter(status='PENDING').count()
-        unassigned_count = all_orders.filter(technician__isnull=True).count()
-        processing_count = all_orders.filter(status='PROCESSING').count()
-        completed_count = all_orders.filter(status='DELIVERED').count()
+        order_stats = get_admin_stats()['orders']
+        pending_count = order_stats['pending']
+        unassigned_count = order_stats['unassigned']
+        processing_count = order_stats['processing']
+        completed_count = order_stats['delivered']
         
         paginator = Paginator(orders, 20)
         page_number = request.GET.get('page')
@@ -528,6 +566,8 @@ class AdminOrdersView(View):
             'status_filter': status_filter,
             'technician_filter': technician_filter,
             'search': search,
+            'sort': sort,
+            'sort_choices': ORDER_SORT_CHOICES,
             'pending_count': pending_count,
             'unassigned_count': unassigned_count,
             'processing_count': processing_count,
@@ -613,7 +653,7 @@ class AdminServicesView(View):
         
         # UPDATE THIS LINE - Add prefetch_related for job_sheet
         services = ServiceRequest.objects.select_related(
-            'customer', 'technician', 'service_category', 'service_location'
+            'customer', 'technician', 'service_category', 'issue', 'service_location'
         ).prefetch_related('job_sheet')  # ADD THIS
         
         if status_filter:
@@ -638,11 +678,11 @@ class AdminServicesView(View):
         services = services.order_by('-request_date')
         
         # REAL STATS - NOT MOCK DATA
-        all_services = ServiceRequest.objects.all()
-        submitted_count = all_services.filter(status='SUBMITTED').count()
-        unassigned_count = all_services.filter(technician__isnull=True).count()
-        in_progress_count = all_services.filter(status='IN_PROGRESS').count()
-        completed_count = all_services.filter(status='COMPLETED').count()
+        service_stats = get_admin_stats()['services']
+        submitted_count = service_stats['submitted']
+        unassigned_count = service_stats['unassigned']
+        in_progress_count = service_stats['in_progress']
+        completed_count = service_stats['completed']
         
         paginator = Paginator(services, 20)
         page_number = request.GET.get('page')
@@ -728,7 +768,7 @@ class AdminCategoriesView(View):
         
         service_categories = ServiceCategory.objects.annotate(
             service_count=Count('servicerequest')
-        ).order_by('name')
+        ).prefetch_related('issues').order_by('name')
         
         context = {
             'categories': categories,
@@ -955,26 +995,18 @@ class AdminAnalyticsView(TemplateView):
         previous_start = start_date - timedelta(days=days)
         previous_end = start_date
         
-        # Current period data
-        current_orders = Order.objects.filter(order_date__range=[start_date, end_date])
-        previous_orders = Order.objects.filter(order_date__range=[previous_start, previous_end])
+        # Rollups are per calendar day - bring recently touched days up to date first
+        rollups.refresh_on_read()
+        last_day = timezone.localdate()
+        first_day = last_day - timedelta(days=days - 1)
+        previous_first_day = first_day - timedelta(days=days)
         
-        # Calculate revenue from order items (REAL DATA)
-        current_revenue_data = OrderItem.objects.filter(
-            order__order_date__range=[start_date, end_date],
-            order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-        ).aggregate(
-            total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-        )
-        current_revenue = float(current_revenue_data['total'] or 0)
-        
-        previous_revenue_data = OrderItem.objects.filter(
-            order__order_date__range=[previous_start, previous_end],
-            order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-        ).aggregate(
-            total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-        )
-        previous_revenue = float(previous_revenue_data['total'] or 0)
+        # Current vs previous period - one aggregate query
+        summary = analytics.period_order_summary(first_day, last_day, previous_first_day)
+        current_order_count = summary['current_orders']
+        previous_order_count = summary['previous_orders']
+        current_revenue = summary['current_revenue']
+        previous_revenue = summary['previous_revenue']
         
         # Calculate growth percentages
         revenue_growth = 0
@@ -984,14 +1016,14 @@ class AdminAnalyticsView(TemplateView):
             revenue_growth = 100
         
         order_growth = 0
-        if previous_orders.count() > 0:
-            order_growth = ((current_orders.count() - previous_orders.count()) / previous_orders.count()) * 100
-        elif current_orders.count() > 0:
+        if previous_order_count > 0:
+            order_growth = ((current_order_count - previous_order_count) / previous_order_count) * 100
+        elif current_order_count > 0:
             order_growth = 100
         
         # Average order value
-        avg_order_value = current_revenue / current_orders.count() if current_orders.count() > 0 else 0
-        prev_avg_order_value = previous_revenue / previous_orders.count() if previous_orders.count() > 0 else 0
+        avg_order_value = current_revenue / current_order_count if current_order_count > 0 else 0
+        prev_avg_order_value = previous_revenue / previous_order_count if previous_order_count > 0 else 0
         
         aov_growth = 0
         if prev_avg_order_value > 0:
@@ -1000,15 +1032,13 @@ class AdminAnalyticsView(TemplateView):
             aov_growth = 100
         
         # Customer growth
-        current_customers = User.objects.filter(
-            role='CUSTOMER',
-            date_joined__range=[start_date, end_date]
-        ).count()
-        
-        previous_customers = User.objects.filter(
-            role='CUSTOMER',
-            date_joined__range=[previous_start, previous_end]
-        ).count()
+        customer_stats = User.objects.filter(role='CUSTOMER').aggregate(
+            total=Count('id'),
+            current=Count('id', filter=Q(date_joined__range=[start_date, end_date])),
+            previous=Count('id', filter=Q(date_joined__range=[previous_start, previous_end])),
+        )
+        current_customers = customer_stats['current']
+        previous_customers = customer_stats['previous']
         
         customer_growth = 0
         if previous_customers > 0:
@@ -1016,85 +1046,19 @@ class AdminAnalyticsView(TemplateView):
         elif current_customers > 0:
             customer_growth = 100
         
-        # Monthly revenue data for chart (last 12 months) - REAL DATA
-        monthly_revenue = []
-        for i in range(11, -1, -1):
-            month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30*i)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
-            
-            revenue_data = OrderItem.objects.filter(
-                order__order_date__range=[month_start, month_end],
-                order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-            ).aggregate(
-                total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-            )
-            revenue = float(revenue_data['total'] or 0)
-            
-            monthly_revenue.append({
-                'month': month_start.strftime('%b %y'),
-                'amount': revenue
-            })
-        
-        # Daily orders for last 30 days - REAL DATA
-        daily_orders = []
-        for i in range(29, -1, -1):
-            day = timezone.now().date() - timedelta(days=i)
-            day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
-            day_end = timezone.make_aware(datetime.combine(day, datetime.max.time()))
-            
-            count = Order.objects.filter(order_date__range=[day_start, day_end]).count()
-            daily_orders.append({
-                'day': day.strftime('%m/%d'),
-                'count': count
-            })
-        
-        # Daily services for last 30 days - REAL DATA
-        daily_services = []
-        for i in range(29, -1, -1):
-            day = timezone.now().date() - timedelta(days=i)
-            day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
-            day_end = timezone.make_aware(datetime.combine(day, datetime.max.time()))
-            
-            count = ServiceRequest.objects.filter(request_date__range=[day_start, day_end]).count()
-            daily_services.append({
-                'day': day.strftime('%m/%d'),
-                'count': count
-            })
+        # Chart data - one GROUP BY query per series, empty buckets filled in Python
+        monthly_revenue = analytics.monthly_revenue(months=12)
+        daily_orders = analytics.daily_orders(days=30)
+        daily_services = analytics.daily_services(days=30)
         
         # Top products by sales - REAL DATA
-        top_products = OrderItem.objects.filter(
-            order__order_date__range=[start_date, end_date]
-        ).values('product__name').annotate(
-            total_quantity=Sum('quantity'),
-            total_sales=Sum(F('quantity') * F('price'), output_field=DecimalField())
-        ).order_by('-total_sales')[:5]
+        top_products = analytics.top_products(first_day, last_day)
         
         # Order status distribution - REAL DATA
-        total_orders_count = Order.objects.filter(order_date__range=[start_date, end_date]).count()
-        order_status_distribution = []
-        
-        for status_code, status_name in Order.STATUS_CHOICES:
-            count = Order.objects.filter(
-                order_date__range=[start_date, end_date],
-                status=status_code
-            ).count()
-            
-            percentage = (count / total_orders_count * 100) if total_orders_count > 0 else 0
-            
-            if count > 0:
-                order_status_distribution.append({
-                    'status': status_name,
-                    'count': count,
-                    'percentage': percentage
-                })
+        order_status_distribution = analytics.status_distribution(first_day, last_day)
         
         # Top cities by orders - REAL DATA
-        top_cities = Order.objects.filter(
-            order_date__range=[start_date, end_date],
-            shipping_address__isnull=False
-        ).values('shipping_address__city', 'shipping_address__state').annotate(
-            order_count=Count('id')
-        ).order_by('-order_count')[:5]
+        top_cities = analytics.top_cities(first_day, last_day)
         
         # Recent activities - REAL DATA
         recent_activities = []
@@ -1177,11 +1141,11 @@ class AdminAnalyticsView(TemplateView):
             # Summary stats - ALL REAL
             'total_revenue': current_revenue,
             'revenue_growth': revenue_growth,
-            'total_orders': current_orders.count(),
+            'total_orders': current_order_count,
             'order_growth': order_growth,
             'avg_order_value': avg_order_value,
             'aov_growth': aov_growth,
-            'total_customers': User.objects.filter(role='CUSTOMER').count(),
+            'total_customers': customer_stats['total'],
             'customer_growth': customer_growth,
             
             # Chart data (JSON serialized) - ALL REAL
@@ -1207,24 +1171,26 @@ class AdminSettingsView(TemplateView):
 def admin_stats_api(request):
     """API endpoint for dashboard stats - REAL DATA"""
     try:
-        # Calculate real revenue from OrderItems
-        revenue_data = OrderItem.objects.filter(
-            order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-        ).aggregate(
-            total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-        )
-        total_revenue = float(revenue_data['total'] or 0)
-        
+        admin_stats = get_admin_stats()
         stats = {
-            'total_users': User.objects.count(),
-            'total_orders': Order.objects.count(),
-            'pending_orders': Order.objects.filter(status='PENDING').count(),
-            'total_revenue': total_revenue,
+            'total_users': admin_stats['users']['total'],
+            'total_orders': admin_stats['orders']['total'],
+            'pending_orders': admin_stats['orders']['pending'],
+            'total_revenue': admin_stats['orders']['revenue'],
         }
         return JsonResponse(stats)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+@staff_member_required
+def product_image_status_api(request):
+    """Processing state of staged product images, polled by the products pages (?ids=1,2,3)"""
+    try:
+        product_ids = [int(value) for value in request.GET.get('ids', '').split(',') if value.strip()][:100]
+    except ValueError:
+        return JsonResponse({'error': 'ids must be a comma separated list of product ids'}, status=400)
+    return JsonResponse({'products': upload_status(product_ids)})
+
 @staff_member_required
 def get_order_details_api(request, order_id):
     """API endpoint for getting order details - REAL DATA"""
@@ -1234,23 +1200,20 @@ def get_order_details_api(request, order_id):
             id=order_id
         )
         
-        # Calculate total from OrderItems
         items_data = []
-        total_amount = 0
         for item in order.items.all():
-            item_total = float(item.price) * item.quantity
-            total_amount += item_total
+            item_total = item.get_total_item_price()
             items_data.append({
                 'product_name': item.product.name,
                 'quantity': item.quantity,
-                'price': str(item.price),
+                'price': str(item.unit_price),
                 'total': str(item_total)
             })
         
         order_data = {
             'id': order.id,
             'status': order.status,
-            'total_amount': str(total_amount),
+            'total_amount': str(order.total_amount),
             'order_date': order.order_date.strftime('%B %d, %Y at %I:%M %p'),
             'customer': {
                 'name': order.customer.name,
@@ -1390,10 +1353,10 @@ class AdminJobSheetsView(View):
         job_sheets = job_sheets.order_by('-created_at')
         
         # REAL STATS
-        all_job_sheets = JobSheet.objects.all()
-        pending_count = all_job_sheets.filter(approval_status='PENDING').count()
-        approved_count = all_job_sheets.filter(approval_status='APPROVED').count()
-        declined_count = all_job_sheets.filter(approval_status='DECLINED').count()
+        job_sheet_stats = get_admin_stats()['job_sheets']
+        pending_count = job_sheet_stats['pending']
+        approved_count = job_sheet_stats['approved']
+        declined_count = job_sheet_stats['declined']
         
         # Pagination
         paginator = Paginator(job_sheets, 20)
@@ -1410,7 +1373,7 @@ class AdminJobSheetsView(View):
             'pending_count': pending_count,
             'approved_count': approved_count,
             'declined_count': declined_count,
-            'total_count': all_job_sheets.count(),
+            'total_count': job_sheet_stats['total'],
         }
         
         return render(request, 'admin_panel/job_sheets.html', context)
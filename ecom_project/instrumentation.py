@@ -0,0 +1,178 @@
+# ecom_project/instrumentation.py - Per-request timing, SQL and cache metrics
+#
+# RequestMetricsMiddleware (first in MIDDLEWARE) measures every request:
+#   total      wall time through the middleware stack, view and rendering
+#   db         time spent in SQL and the number of queries (execute_wrapper)
+#   cache      hits and misses of the application caches (catalog payloads,
+#              facets, admin counters), reported by record_cache()
+#   render     time rendering the response (JSON encoding of DRF responses,
+#              templates) minus the SQL it ran, timed by the middleware's
+#              process_template_response hook
+#
+# They are sent back as a Server-Timing header (shown per request in the
+# browser's network panel) when SERVER_TIMING_HEADER is on (by default only
+# with DEBUG) and to staff users, and logged as one JSON line on the
+# `ecom_project.instrumentation` logger. Requests slower than
+# SLOW_REQUEST_THRESHOLD_MS are logged at WARNING with their most expensive
+# SQL statements, grouped by statement text so an N+1 shows up as one
+# statement run many times. Parameters are never logged.
+#
+# The cost per request is a few perf_counter() calls, one tuple per query
+# and the log line; statements are only grouped and sorted for slow requests.
+
+import json
+import logging
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.utils.functional import empty
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+# Longest SQL text kept in the slow-request log
+SQL_LOG_LENGTH = 1000
+# IN (%s, %s, ...) lists, collapsed so prefetches of different sizes group together
+IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+
+
+class RequestMetrics:
+    """Counters of the request being handled"""
+
+    __slots__ = (
+        'queries', 'db_seconds', 'cache_hits', 'cache_misses', 'render_seconds', 'statements',
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_seconds = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - started
+            self.queries += 1
+            self.db_seconds += seconds
+            self.statements.append((sql, seconds))
+
+    def top_statements(self, limit):
+        """[{sql, count, ms}] of the statements with the most total time"""
+        grouped = defaultdict(lambda: [0, 0.0])
+        for sql, seconds in self.statements:
+            entry = grouped[IN_LIST.sub('(%s, ...)', sql)]
+            entry[0] += 1
+            entry[1] += seconds
+        ranked = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {'sql': sql[:SQL_LOG_LENGTH], 'count': count, 'ms': round(seconds * 1000, 2)}
+            for sql, (count, seconds) in ranked
+        ]
+
+
+def record_cache(hits=0, misses=0):
+    """Count application cache lookups towards the current request, if any"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+class RequestMetricsMiddleware:
+    """Server-Timing header, request log line and slow-request SQL log"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 1000) / 1000
+        self.top_sql = getattr(settings, 'SLOW_REQUEST_TOP_SQL', 5)
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', settings.DEBUG)
+        self.skip_prefixes = tuple(prefix for prefix in (settings.STATIC_URL, settings.MEDIA_URL) if prefix)
+
+    def __call__(self, request):
+        if request.path.startswith(self.skip_prefixes):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                started = time.perf_counter()
+                response = self.get_response(request)
+                total = time.perf_counter() - started
+        finally:
+            _current.reset(token)
+
+        if self.server_timing or getattr(loaded_user(request), 'is_staff', False):
+            response.headers['Server-Timing'] = server_timing(metrics, total)
+        self.log(request, response, metrics, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called last (this middleware comes first), right before the handler
+        # renders; rendering here times it, and the handler's render() is then a no-op
+        metrics = _current.get()
+        if metrics is None:
+            return response
+        started, db_before = time.perf_counter(), metrics.db_seconds
+        response.render()
+        metrics.render_seconds += time.perf_counter() - started - (metrics.db_seconds - db_before)
+        return response
+
+    def log(self, request, response, metrics, total):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'status': response.status_code,
+            'user': loaded_user_id(request),
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db_seconds * 1000, 2),
+            'queries': metrics.queries,
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            'render_ms': round(metrics.render_seconds * 1000, 2),
+        }
+        if total >= self.threshold:
+            record['slow'] = True
+            record['top_sql'] = metrics.top_statements(self.top_sql)
+            logger.warning(json.dumps(record), extra={'request_metrics': record})
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record), extra={'request_metrics': record})
+
+
+def loaded_user(request):
+    """The request's user if the view loaded it (no query for the header or log line)"""
+    user = request.__dict__.get('user')
+    if user is None or getattr(user, '_wrapped', None) is empty:
+        return None
+    return user
+
+
+def loaded_user_id(request):
+    user = loaded_user(request)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def server_timing(metrics, total):
+    """Server-Timing header value for a finished request"""
+    return ', '.join([
+        f'total;dur={total * 1000:.2f}',
+        f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.queries} queries"',
+        f'cache;desc="hits={metrics.cache_hits} misses={metrics.cache_misses}"',
+        f'render;dur={metrics.render_seconds * 1000:.2f}',
+    ])
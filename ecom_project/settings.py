@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Your Apps
     'users',
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack
+    'ecom_project.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -93,6 +96,38 @@ DATABASES = {
     }
 }
 
+# Shared cache (dashboard counters, serialized product payloads).
+# REDIS_URL -> Redis (needs the `redis` package), CACHE_DIR -> files shared by
+# all gunicorn workers on the host, otherwise per-process local memory.
+# The file and memory caches cull a third of their entries once they hold
+# CACHE_MAX_ENTRIES (Django's default is 300, fewer than the product payload,
+# generation, facet and throttle keys of one catalog), so size it for a few
+# keys per product plus the active users; Redis evicts by its own maxmemory.
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 50000))
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+            'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'techverse',
+            'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+        }
+    }
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -178,6 +213,57 @@ REST_FRAMEWORK = {
     }
 }
 
+# Max age (seconds) shared caches and browsers may reuse public catalog responses
+# (products, service categories) before revalidating them with their ETag
+CATALOG_CACHE_MAX_AGE = int(os.environ.get('CATALOG_CACHE_MAX_AGE', 60))
+# Seconds serialized product payloads stay in CACHES (they are also dropped on every product change)
+PRODUCT_CACHE_TIMEOUT = int(os.environ.get('PRODUCT_CACHE_TIMEOUT', 3600))
+# Seconds facet counts stay cached per filter combination (any product change retires them)
+FACET_CACHE_TIMEOUT = int(os.environ.get('FACET_CACHE_TIMEOUT', 300))
+
+# Product images uploaded through the admin panel are processed by `manage.py process_image_uploads`:
+# largest width/height kept, uploads with more pixels are rejected, and seconds after
+# which an upload claimed by a worker that died is processed again
+PRODUCT_IMAGE_MAX_DIMENSION = int(os.environ.get('PRODUCT_IMAGE_MAX_DIMENSION', 2400))
+PRODUCT_IMAGE_MAX_PIXELS = int(os.environ.get('PRODUCT_IMAGE_MAX_PIXELS', 40_000_000))
+IMAGE_UPLOAD_STALE_AFTER = int(os.environ.get('IMAGE_UPLOAD_STALE_AFTER', 600))
+# Files and queued deletions younger than this (seconds) are never acted on by
+# `manage.py collect_media_garbage`: the row of an upload (re)using the file may not be committed yet
+MEDIA_GC_MIN_AGE = int(os.environ.get('MEDIA_GC_MIN_AGE', 3600))
+
+# Seconds a pending order holds its stock; `manage.py release_expired_reservations` frees it afterwards
+STOCK_RESERVATION_TTL = int(os.environ.get('STOCK_RESERVATION_TTL', 900))
+# Seconds a stored Idempotency-Key response is replayed to retries of the same create request
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+# Seconds after which a request that never finished (its worker died) no longer blocks retries
+# of its key with 409; keep it above the worker timeout
+IDEMPOTENCY_IN_FLIGHT_TIMEOUT = int(os.environ.get('IDEMPOTENCY_IN_FLIGHT_TIMEOUT', 60))
+
+# ============= REQUEST METRICS =============
+# ecom_project.instrumentation: Server-Timing header (total, db, cache, render), one JSON log
+# line per request, and the most expensive SQL statements of requests slower than
+# SLOW_REQUEST_THRESHOLD_MS milliseconds. Staff always get the header; everyone else only
+# with SERVER_TIMING_HEADER (defaults to DEBUG, so timings don't leak in production)
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', str(DEBUG)) == 'True'
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 1000))
+SLOW_REQUEST_TOP_SQL = int(os.environ.get('SLOW_REQUEST_TOP_SQL', 5))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # INFO logs every request, WARNING only the slow ones
+        'ecom_project.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # ============= DJ-REST-AUTH SETTINGS =============
 REST_AUTH = {
     'REGISTER_SERIALIZER': 'users.serializers.CustomRegisterSerializer',
@@ -201,7 +287,7 @@ CORS_ALLOWED_ORIGINS = os.environ.get(
 
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = False
-CORS_ALLOWED_HEADERS = [
+CORS_ALLOW_HEADERS = [
     'accept',
     'accept-encoding',
     'authorization',
@@ -212,7 +298,9 @@ CORS_ALLOWED_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
     'cache-control',
+    'idempotency-key',
 ]
+CORS_EXPOSE_HEADERS = ['idempotent-replayed']
 
 # ============= CSRF SETTINGS =============
 CSRF_COOKIE_NAME = 'csrftoken'
@@ -268,3 +356,10 @@ SOCIALACCOUNT_EMAIL_AUTHENTICATION = False
 SOCIALACCOUNT_EMAIL_AUTHENTICATION_AUTO_CONNECT = True
 
 ACCOUNT_DEFAULT_HTTP_PROTOCOL = 'https'
+
+# ============= ADMIN DASHBOARD =============
+# Seconds the aggregated dashboard counters stay cached (cleared on order/service changes)
+ADMIN_STATS_CACHE_TIMEOUT = int(os.environ.get('ADMIN_STATS_CACHE_TIMEOUT', 60))
+# Most recently touched days the analytics pages refresh before reading the rollups;
+# anything older is handled by `manage.py refresh_analytics_rollups`
+ANALYTICS_ROLLUP_REFRESH_ON_READ_DAYS = int(os.environ.get('ANALYTICS_ROLLUP_REFRESH_ON_READ_DAYS', 7))
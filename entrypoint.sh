@@ -7,6 +7,14 @@ set -e
 echo "Runnning migrations..."
 python manage.py migrate
 
+# Bring the analytics rollups up to date (only days touched since the last run)
+echo "Refreshing analytics rollups..."
+python manage.py refresh_analytics_rollups
+
+# Drop expired Idempotency-Key responses
+echo "Purging expired idempotency keys..."
+python manage.py purge_idempotency_keys
+
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
@@ -1,6 +1,11 @@
+# services/apps.py
+
 from django.apps import AppConfig
 
 
 class ServicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'services'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_jobsheet_jobsheetmaterial'),
+        ('store', '0015_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobsheet',
+            index=models.Index(fields=['approval_status', '-created_at'], name='jobsheet_approval_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['customer', '-request_date'], name='service_customer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['technician', 'status'], name='service_technician_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['status', '-request_date'], name='service_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['-request_date'], name='service_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('technician__isnull', True)), fields=['-request_date'], name='service_unassigned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technicianrating',
+            index=models.Index(fields=['technician', '-created_at'], name='rating_technician_created_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # services/models.py
 
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
 from django.conf import settings
 from store.models import Address
 
@@ -21,6 +22,13 @@ class ServiceIssue(models.Model):
     def __str__(self):
         return f"{self.category.name} - {self.description}"
 
+class ServiceRequestQuerySet(models.QuerySet):
+    def with_rating_status(self):
+        """Annotate has_rating: whether the technician was already rated for this request"""
+        return self.annotate(
+            has_rating=Exists(TechnicianRating.objects.filter(service_request=OuterRef('pk')))
+        )
+
 class ServiceRequest(models.Model):
     STATUS_CHOICES = (
         ('SUBMITTED', 'Submitted'),
@@ -30,8 +38,10 @@ class ServiceRequest(models.Model):
         ('CANCELLED', 'Cancelled'),
     )
 
-    customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    technician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_services', limit_choices_to={'role': 'TECHNICIAN'})
+    # customer and technician are indexed as the leading columns of
+    # service_customer_date_idx and service_technician_status_idx
+    customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
+    technician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_services', limit_choices_to={'role': 'TECHNICIAN'}, db_index=False)
     service_category = models.ForeignKey(ServiceCategory, on_delete=models.CASCADE)
     issue = models.ForeignKey(ServiceIssue, on_delete=models.SET_NULL, null=True, blank=True)
     custom_description = models.TextField(blank=True, help_text="If your issue isn't listed, describe it here.")
@@ -39,6 +49,21 @@ class ServiceRequest(models.Model):
     request_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='SUBMITTED')
 
+    objects = ServiceRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Customer service history, newest first
+            models.Index(fields=['customer', '-request_date'], name='service_customer_date_idx'),
+            # Technician service feed and completion counts
+            models.Index(fields=['technician', 'status'], name='service_technician_status_idx'),
+            # Admin service list: by status, and everything newest first (also the daily rollups)
+            models.Index(fields=['status', '-request_date'], name='service_status_date_idx'),
+            models.Index(fields=['-request_date'], name='service_date_idx'),
+            # Requests still waiting for a technician
+            models.Index(fields=['-request_date'], name='service_unassigned_idx', condition=Q(technician__isnull=True)),
+        ]
+
     def __str__(self):
         return f"Service Request #{self.id} by {self.customer.name}"
 
@@ -51,7 +76,8 @@ class TechnicianRating(models.Model):
         (5, '5 - Excellent'),
     )
 
-    technician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ratings_received', limit_choices_to={'role': 'TECHNICIAN'})
+    # Indexed as the leading column of rating_technician_created_idx
+    technician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ratings_received', limit_choices_to={'role': 'TECHNICIAN'}, db_index=False)
     customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ratings_given')
 
     # Link to the job being rated. Can be an Order or a ServiceRequest.
@@ -62,6 +88,12 @@ class TechnicianRating(models.Model):
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Technician profile: reviews newest first, and their average
+            models.Index(fields=['technician', '-created_at'], name='rating_technician_created_idx'),
+        ]
+
     def __str__(self):
         return f"Rating for {self.technician.name} by {self.customer.name} - {self.rating} stars"
 
@@ -138,6 +170,10 @@ class JobSheet(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Job Sheet'
         verbose_name_plural = 'Job Sheets'
+        indexes = [
+            # Admin job sheet list filtered by approval status
+            models.Index(fields=['approval_status', '-created_at'], name='jobsheet_approval_idx'),
+        ]
 
 
 class JobSheetMaterial(models.Model):
@@ -1,6 +1,6 @@
 # services/serializers.py
 from rest_framework import serializers
-from .models import ServiceCategory, ServiceIssue, ServiceRequest , JobSheet, JobSheetMaterial
+from .models import ServiceCategory, ServiceIssue, ServiceRequest , JobSheet, JobSheetMaterial, TechnicianRating
 
 
 class ServiceIssueSerializer(serializers.ModelSerializer):
@@ -21,7 +21,12 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             if request.user.role == 'AMC':
-                return request.user.has_free_service(obj)
+                # One lookup per response rather than one per category
+                if 'free_category_ids' not in self.context:
+                    self.context['free_category_ids'] = set(
+                        request.user.free_service_categories.values_list('id', flat=True)
+                    )
+                return obj.id in self.context['free_category_ids']
         return False
 
 class ServiceRequestSerializer(serializers.ModelSerializer):
@@ -69,8 +74,12 @@ class ServiceRequestHistorySerializer(serializers.ModelSerializer):
 
     def get_can_rate(self, obj):
         # Can rate only when completed, has technician, and not already rated
-        has_rating = hasattr(obj, 'rating') and obj.rating is not None
-        return bool(obj.technician and obj.status == 'COMPLETED' and not has_rating)
+        if obj.technician_id is None or obj.status != 'COMPLETED':
+            return False
+        # History list annotates has_rating via ServiceRequest.objects.with_rating_status()
+        if hasattr(obj, 'has_rating'):
+            return not obj.has_rating
+        return not TechnicianRating.objects.filter(service_request_id=obj.pk).exists()
 
     def get_service_location(self, obj):
         loc = obj.service_location
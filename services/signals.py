@@ -0,0 +1,14 @@
+# services/signals.py - Invalidate catalog HTTP validators when service categories change
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from store.models import CatalogVersion
+from store.caching import bump_catalog_version
+from .models import ServiceCategory, ServiceIssue
+
+
+@receiver([post_save, post_delete], sender=ServiceCategory)
+@receiver([post_save, post_delete], sender=ServiceIssue)
+def bump_services_version(sender, **kwargs):
+    bump_catalog_version(CatalogVersion.SERVICES)
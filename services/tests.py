@@ -1,3 +1,122 @@
-from django.test import TestCase
+# services/tests.py - Query budgets for the service, rating and job sheet endpoints
+# (see store.tests.QueryBudgetTestCase)
 
-# Create your tests here.
+from store.tests import QueryBudgetTestCase
+
+
+class ServicePageQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_create_service_request(self):
+        self.assertQueryBudget(
+            9, self.customer, 'post', f'/request/{self.service_category.id}/',
+            form={'issue': self.issue.id, 'service_location': self.address.id}, status_code=302,
+        )
+
+    def test_confirm_service_request(self):
+        self.assertQueryBudget(
+            5, self.customer, 'get',
+            lambda: f'/confirm-request/{self.create_service(status="SUBMITTED", job_sheet=False).id}/',
+            status_code=302,
+        )
+
+    def test_rate_order(self):
+        self.assertQueryBudget(
+            5, self.customer, 'post',
+            lambda: f'/rate/order/{self.create_order().id}/',
+            form={'rating': 5, 'comment': 'Great'}, status_code=302,
+        )
+
+    def test_update_service_status(self):
+        self.assertQueryBudget(
+            6, self.technician, 'post',
+            lambda: f'/update-service-status/{self.create_service(status="IN_PROGRESS").id}/',
+            status_code=302,
+        )
+
+
+class ServiceAPIQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_categories(self):
+        self.assertQueryBudget(3, None, 'get', '/api/categories/')
+        self.assertQueryBudget(5, self.customer, 'get', '/api/categories/')
+
+    def test_create_request(self):
+        self.assertQueryBudget(7, self.customer, 'post', '/api/requests/create/', data={
+            'service_category': self.service_category.id,
+            'issue': self.issue.id,
+            'service_location': self.address.id,
+        }, status_code=201)
+
+    def test_history(self):
+        self.assertQueryBudget(3, self.customer, 'get', '/api/requests/history/')
+
+
+class RatingAPIQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_rate_order(self):
+        self.assertQueryBudget(
+            6, self.customer, 'post', '/api/ratings/create/',
+            data=lambda: {'rating': 5, 'order_id': self.create_order().id}, status_code=201,
+        )
+
+    def test_rate_service(self):
+        self.assertQueryBudget(
+            6, self.customer, 'post', '/api/ratings/create/',
+            data=lambda: {'rating': 4, 'service_request_id': self.create_service().id}, status_code=201,
+        )
+
+    def test_my_ratings(self):
+        self.assertQueryBudget(3, self.customer, 'get', '/api/ratings/my-ratings/')
+
+    def test_test_endpoint(self):
+        self.assertQueryBudget(2, self.customer, 'get', '/api/ratings/test/')
+
+
+class JobSheetAPIQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_create(self):
+        self.assertQueryBudget(
+            14, self.technician, 'post', '/api/job-sheets/create/',
+            data=lambda: {
+                'service_request_id': self.create_service(status='IN_PROGRESS', job_sheet=False).id,
+                'equipment_type': 'Laptop',
+                'problem_description': 'Fan noise',
+                'work_performed': 'Cleaned the fan',
+                'date_of_service': '2026-01-06',
+                'start_time': '10:00',
+                'finish_time': '10:45',
+                'materials': [
+                    {'date_used': '2026-01-06', 'item_description': 'Cleaning kit', 'quantity': '1', 'unit_cost': '50'},
+                ],
+            },
+            status_code=201,
+        )
+
+    def test_list_for_technician(self):
+        self.assertQueryBudget(4, self.technician, 'get', '/api/job-sheets/')
+
+    def test_list_for_customer(self):
+        self.assertQueryBudget(4, self.customer, 'get', '/api/job-sheets/')
+
+    def test_detail(self):
+        sheet = self.create_service().job_sheet
+        self.assertQueryBudget(4, self.customer, 'get', f'/api/job-sheets/{sheet.id}/')
+
+    def test_approve(self):
+        self.assertQueryBudget(
+            6, self.customer, 'post',
+            lambda: f'/api/job-sheets/{self.create_service(approval_status="PENDING").job_sheet.id}/approve/',
+        )
+
+    def test_decline(self):
+        self.assertQueryBudget(
+            6, self.customer, 'post',
+            lambda: f'/api/job-sheets/{self.create_service(approval_status="PENDING").job_sheet.id}/decline/',
+            data={'reason': 'Too expensive'},
+        )
+
+    def test_complete_service_request(self):
+        self.assertQueryBudget(
+            6, self.technician, 'patch',
+            lambda: f'/api/service-requests/{self.create_service(status="IN_PROGRESS").id}/complete/',
+        )
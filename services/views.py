@@ -4,7 +4,9 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from .models import ServiceCategory, ServiceRequest, TechnicianRating
 from .forms import ServiceRequestForm, RatingForm
-from store.models import Order
+from store.models import Order, CatalogVersion
+from store.caching import catalog_validators, conditional_catalog
+from store.idempotency import idempotent
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import generics, permissions, status
@@ -13,6 +15,7 @@ from .serializers import ServiceCategorySerializer, ServiceRequestSerializer, Se
 from .models import JobSheet, JobSheetMaterial
 from .serializers import JobSheetSerializer, JobSheetDetailSerializer
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 
 @login_required
 def select_service_category(request):
@@ -129,14 +132,25 @@ def update_service_status(request, request_id):
     return redirect('technician_dashboard')
 
 # API Views
+def _is_amc_user(request):
+    # is_free_for_user differs per AMC customer, so their responses are private
+    return request.user.is_authenticated and request.user.role == 'AMC'
+
+def _service_category_validators(request, *args, **kwargs):
+    free_ids = []
+    if _is_amc_user(request):
+        free_ids = [request.user.pk, *request.user.free_service_categories.order_by('id').values_list('id', flat=True)]
+    return catalog_validators(request, CatalogVersion.SERVICES, *free_ids)
+
 class ServiceCategoryListAPIView(APIView):
     """
     API view to list all service categories and their nested issues.
     """
     permission_classes = [permissions.AllowAny]
     
+    @conditional_catalog(_service_category_validators, private=_is_amc_user)
     def get(self, request, format=None):
-        categories = ServiceCategory.objects.all()
+        categories = ServiceCategory.objects.prefetch_related('issues')
         serializer = ServiceCategorySerializer(
             categories, 
             many=True,
@@ -144,6 +158,7 @@ class ServiceCategoryListAPIView(APIView):
         )
         return Response(serializer.data)
 
+@method_decorator(idempotent, name='create')
 class ServiceRequestCreateAPIView(generics.CreateAPIView):
     queryset = ServiceRequest.objects.all()
     serializer_class = ServiceRequestSerializer
@@ -162,7 +177,11 @@ class ServiceRequestHistoryAPIView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return ServiceRequest.objects.filter(customer=self.request.user).order_by('-request_date')
+        return ServiceRequest.objects.filter(
+            customer=self.request.user
+        ).select_related(
+            'service_category', 'issue', 'technician', 'service_location'
+        ).with_rating_status().order_by('-request_date')
 
 # Rating API Views
 @api_view(['POST'])
@@ -321,7 +340,9 @@ def get_user_ratings(request):
     Get all ratings submitted by the current user
     """
     try:
-        ratings = TechnicianRating.objects.filter(customer=request.user).order_by('-created_at')
+        ratings = TechnicianRating.objects.filter(customer=request.user).select_related(
+            'technician', 'order', 'service_request__service_category'
+        ).order_by('-created_at')
         
         ratings_data = []
         for rating in ratings:
@@ -465,7 +486,7 @@ def get_job_sheets(request):
     try:
         if request.user.role == 'TECHNICIAN':
             job_sheets = JobSheet.objects.filter(created_by=request.user).select_related(
-                'service_request', 'service_request__customer', 'service_request__service_category'
+                'service_request', 'service_request__customer', 'service_request__service_category', 'created_by'
             ).prefetch_related('materials')
         
         elif request.user.role == 'CUSTOMER':
@@ -549,7 +570,9 @@ def approve_job_sheet(request, job_sheet_id):
     Customer approves a job sheet
     """
     try:
-        job_sheet = JobSheet.objects.select_related('service_request').get(id=job_sheet_id)
+        job_sheet = JobSheet.objects.select_related(
+            'service_request', 'service_request__service_category', 'created_by'
+        ).prefetch_related('materials').get(id=job_sheet_id)
         
         # Check if customer owns this service request
         if job_sheet.service_request.customer != request.user:
@@ -598,7 +621,9 @@ def decline_job_sheet(request, job_sheet_id):
     Customer declines a job sheet with reason
     """
     try:
-        job_sheet = JobSheet.objects.select_related('service_request').get(id=job_sheet_id)
+        job_sheet = JobSheet.objects.select_related(
+            'service_request', 'service_request__service_category', 'created_by'
+        ).prefetch_related('materials').get(id=job_sheet_id)
         
         # Check if customer owns this service request
         if job_sheet.service_request.customer != request.user:
@@ -8,7 +8,7 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from decimal import Decimal
-from .models import Address, ProductCategory, Product, ProductImage, ProductSpecification, Order, OrderItem
+from .models import Address, ProductCategory, Product, ProductImage, ProductImageUpload, ProductSpecification, Order, OrderItem
 
 User = get_user_model()
 
@@ -19,6 +19,9 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ('get_total_item_price_safe',)
     fields = ('product', 'quantity', 'price', 'get_total_item_price_safe')
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+    
     def get_total_item_price_safe(self, obj):
         """Safe method to get total item price"""
         try:
@@ -38,6 +41,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'customer_name', 'order_date', 'status', 'total_amount_safe', 'technician_name', 'assignment_status')
     list_filter = ('status', 'order_date', 'technician')
     search_fields = ('customer__name', 'customer__email', 'id')
+    list_select_related = ('customer', 'technician')
     inlines = [OrderItemInline]
     
     # Enhanced fieldsets with better organization
@@ -81,16 +85,12 @@ class OrderAdmin(admin.ModelAdmin):
     technician_name.admin_order_field = 'technician__name'
     
     def total_amount_safe(self, obj):
-        """Safe method to get total amount"""
-        try:
-            total = obj.total_amount
-            if total is not None:
-                return f"₹{total}"
-            else:
-                return "₹0.00"
-        except Exception as e:
-            return f"Error: {str(e)[:50]}"
+        """Display the stored order total"""
+        if obj.total_amount is not None:
+            return f"₹{obj.total_amount}"
+        return "₹0.00"
     total_amount_safe.short_description = 'Total Amount'
+    total_amount_safe.admin_order_field = 'total_amount'
     
     def assignment_status(self, obj):
         try:
@@ -216,6 +216,13 @@ class ProductImageAdmin(admin.ModelAdmin):
         return "No image"
     image_preview.short_description = "Preview"
 
+class ProductImageUploadAdmin(admin.ModelAdmin):
+    list_display = ('product', 'target', 'original_name', 'status', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('status', 'target')
+    search_fields = ('product__name', 'original_name', 'error')
+    readonly_fields = ('product_image', 'started_at', 'processed_at', 'attempts')
+    ordering = ['-created_at']
+
 class ProductSpecificationAdmin(admin.ModelAdmin):
     list_display = ('product', 'name', 'value', 'order')
     list_filter = ('name', 'product__category')
@@ -227,5 +234,6 @@ admin.site.register(Address)
 admin.site.register(ProductCategory, ProductCategoryAdmin)
 admin.site.register(Product, ProductAdmin)
 admin.site.register(ProductImage, ProductImageAdmin)
+admin.site.register(ProductImageUpload, ProductImageUploadAdmin)
 admin.site.register(ProductSpecification, ProductSpecificationAdmin)
 admin.site.register(Order, OrderAdmin)
\ No newline at end of file
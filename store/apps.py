@@ -1,6 +1,11 @@
+# store/apps.py
+
 from django.apps import AppConfig
 
 
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
+
+    def ready(self):
+        from . import signals  # noqa: F401
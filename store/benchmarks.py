@@ -0,0 +1,448 @@
+# store/benchmarks.py - Endpoint latency benchmarks against a seeded database
+#
+# Used by `manage.py benchmark_endpoints`. Each scenario requests one
+# endpoint (catalog, checkout, order history, technician dashboard, job
+# sheets, admin analytics) as the user it is meant for, picked from the data
+# already in the database - run `manage.py seed_load_data` first so the
+# numbers mean something. Requests go through the Django test client
+# in-process, or over HTTP to a running server (gunicorn on localhost) when
+# a base URL is given; both log in with a real session.
+#
+# Per scenario the report has latency percentiles (p50/p95/p99), throughput
+# and the number of SQL queries and the time spent in them: counted with a
+# connection.execute_wrapper hook in-process (DEBUG does not have to be on),
+# read from the Server-Timing header (ecom_project.instrumentation) over
+# HTTP, which non-staff users only get from a server started with
+# SERVER_TIMING_HEADER=True. compare_reports() diffs two reports and marks a metric as
+# regressed when it got worse by more than a relative threshold and an
+# absolute floor, so noise on fast endpoints is not flagged.
+#
+# DRF throttles every request (100/day anonymous, 1000/day per user), so the
+# clients clear their throttle history from the cache after each request,
+# outside the timing; over HTTP that only works when the server shares the
+# cache (Redis).
+#
+# Checkout creates real orders (holding stock like any pending order); they
+# are deleted, and their holds released, after the scenario.
+
+import math
+import platform
+import re
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Count, F
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+from services.models import JobSheet, ServiceRequest
+from users.models import CustomUser
+
+from .models import Address, Order, Product
+
+REPORT_VERSION = 1
+
+# Products in each benchmark checkout, one unit each
+CHECKOUT_ITEMS = 2
+
+# (group, metric, absolute floor below which a change is noise)
+COMPARED_METRICS = [
+    ('latency_ms', 'p50', None),
+    ('latency_ms', 'p95', None),
+    ('latency_ms', 'p99', None),
+    ('sql', 'queries_mean', 1),
+]
+
+# user is None (anonymous), 'customer', 'technician' or 'staff'; `creates` is
+# the model whose row the response's `id` refers to, deleted after the run
+Scenario = namedtuple('Scenario', 'name user method path data status creates')
+Sample = namedtuple('Sample', 'status seconds queries sql_seconds created')
+
+# The db metric of ecom_project.instrumentation's Server-Timing header
+SERVER_TIMING_DB = re.compile(r'(?:^|,\s*)db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class BenchmarkData:
+    """The users and rows the scenarios run against, picked from the seeded data"""
+
+    def __init__(self):
+        self.customer = self._busiest(
+            CustomUser, Order.objects.filter(shipping_address__isnull=False), 'customer'
+        )
+        self.address = self.customer and Address.objects.filter(
+            user=self.customer
+        ).order_by('-is_default', 'pk').first()
+        self.technician = self._busiest(CustomUser, Order.objects.all(), 'technician')
+        self.job_sheet = self.technician and JobSheet.objects.filter(
+            created_by=self.technician
+        ).order_by('-pk').first()
+        self.staff = CustomUser.objects.filter(is_staff=True, is_active=True).order_by('pk').first()
+        # The products with the most unreserved stock, so repeated checkouts keep succeeding
+        self.products = list(
+            Product.objects.filter(is_active=True).alias(
+                available=F('stock') - F('reserved_stock')
+            ).order_by('-available', 'pk')[:CHECKOUT_ITEMS]
+        )
+
+    @staticmethod
+    def _busiest(model, queryset, field):
+        """The `model` row referenced by `field` on the most rows of `queryset`"""
+        pk = queryset.filter(**{f'{field}__isnull': False}).values(field).annotate(
+            rows=Count('pk')
+        ).order_by('-rows').values_list(field, flat=True).first()
+        return model.objects.filter(pk=pk, is_active=True).first() if pk else None
+
+    def counts(self):
+        return {
+            'users': CustomUser.objects.count(),
+            'products': Product.objects.count(),
+            'orders': Order.objects.count(),
+            'service_requests': ServiceRequest.objects.count(),
+            'job_sheets': JobSheet.objects.count(),
+        }
+
+
+def build_scenarios(data):
+    """Every scenario the data allows, in run order"""
+    scenarios = [
+        Scenario('catalog.product_list', None, 'get', '/api/products/', None, 200, None),
+    ]
+    if data.products:
+        product = data.products[0]
+        scenarios += [
+            Scenario('catalog.product_search', None, 'get',
+                     f'/api/products/search/?q={quote(product.name.split()[0])}', None, 200, None),
+            Scenario('catalog.product_detail', None, 'get', f'/api/products/{product.slug}/', None, 200, None),
+        ]
+    if data.customer:
+        scenarios.append(Scenario('orders.history', 'customer', 'get', '/api/orders/', None, 200, None))
+        if data.address and data.products:
+            scenarios.append(Scenario(
+                'checkout.create_bulk_order', 'customer', 'post', '/api/orders/create-bulk/',
+                {
+                    'address_id': data.address.pk,
+                    'items': [{'product_slug': product.slug, 'quantity': 1} for product in data.products],
+                },
+                201, Order,
+            ))
+    if data.technician:
+        scenarios += [
+            Scenario('technician.stats', 'technician', 'get', '/api/technician/stats/', None, 200, None),
+            Scenario('technician.assigned_orders', 'technician', 'get',
+                     '/api/technician/assigned-orders/', None, 200, None),
+            Scenario('technician.assigned_services', 'technician', 'get',
+                     '/api/technician/assigned-services/', None, 200, None),
+            Scenario('job_sheets.list', 'technician', 'get', '/api/job-sheets/', None, 200, None),
+        ]
+        if data.job_sheet:
+            scenarios.append(Scenario(
+                'job_sheets.detail', 'technician', 'get', f'/api/job-sheets/{data.job_sheet.pk}/', None, 200, None
+            ))
+    if data.staff:
+        scenarios += [
+            Scenario('admin.dashboard', 'staff', 'get', '/admin-panel/', None, 200, None),
+            Scenario('admin.analytics', 'staff', 'get', '/admin-panel/analytics/', None, 200, None),
+            Scenario('admin.stats', 'staff', 'get', '/admin-panel/api/stats/', None, 200, None),
+        ]
+    return scenarios
+
+
+class QueryTimer:
+    """execute_wrapper hook counting the queries of one request and the time spent in them"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def throttle_keys(user):
+    """Cache keys of the throttle history requests as `user` build up"""
+    if user is None:
+        # The test client and a server on localhost both see 127.0.0.1
+        return [AnonRateThrottle.cache_format % {'scope': AnonRateThrottle.scope, 'ident': '127.0.0.1'}]
+    return [UserRateThrottle.cache_format % {'scope': UserRateThrottle.scope, 'ident': user.pk}]
+
+
+def session_client(user):
+    """A test client logged in as `user` (anonymous for None)"""
+    client = Client(raise_request_exception=False)
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+class InProcessClient:
+    """Requests through the Django test client, timing the SQL of each one"""
+
+    def __init__(self, user):
+        self.client = session_client(user)
+        self.throttle_keys = throttle_keys(user)
+
+    def request(self, scenario):
+        timer = QueryTimer()
+        kwargs = {'secure': True}
+        if scenario.data is not None:
+            kwargs.update(data=scenario.data, content_type='application/json')
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            started = time.perf_counter()
+            response = getattr(self.client, scenario.method)(scenario.path, **kwargs)
+            seconds = time.perf_counter() - started
+        SimpleRateThrottle.cache.delete_many(self.throttle_keys)
+        return Sample(
+            response.status_code, seconds, timer.queries, timer.seconds,
+            created_id(scenario, response.status_code, response.json),
+        )
+
+
+class HTTPClient:
+    """Requests to a running server, with the session and CSRF cookies of a real login"""
+
+    def __init__(self, base_url, user):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.throttle_keys = throttle_keys(user)
+        if user is not None:
+            session_cookie = session_client(user).cookies[settings.SESSION_COOKIE_NAME]
+            self.session.cookies.set(settings.SESSION_COOKIE_NAME, session_cookie.value)
+        # An unmasked secret is a valid token when the cookie and header match
+        csrf_token = get_random_string(32)
+        self.session.cookies.set(settings.CSRF_COOKIE_NAME, csrf_token)
+        self.session.headers['X-CSRFToken'] = csrf_token
+        self.session.headers['Referer'] = self.base_url + '/'
+
+    def request(self, scenario):
+        started = time.perf_counter()
+        response = self.session.request(
+            scenario.method.upper(), self.base_url + scenario.path, json=scenario.data, allow_redirects=False,
+        )
+        seconds = time.perf_counter() - started
+        SimpleRateThrottle.cache.delete_many(self.throttle_keys)
+        queries = sql_seconds = None
+        db = SERVER_TIMING_DB.search(response.headers.get('Server-Timing', ''))
+        if db:
+            queries, sql_seconds = int(db.group(2)), float(db.group(1)) / 1000
+        return Sample(
+            response.status_code, seconds, queries, sql_seconds,
+            created_id(scenario, response.status_code, response.json),
+        )
+
+
+def created_id(scenario, status, read_json):
+    """Id of the row a successful `creates` scenario made"""
+    if scenario.creates is None or status != scenario.status:
+        return None
+    try:
+        return read_json().get('id')
+    except ValueError:
+        return None
+
+
+def percentile(ordered, fraction):
+    """Linear interpolation between the closest ranks of a sorted list"""
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * fraction
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(scenario, samples, elapsed):
+    """Report entry of one scenario: latency percentiles, throughput and SQL"""
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    summary = {
+        'method': scenario.method.upper(),
+        'path': scenario.path,
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample.status != scenario.status),
+        'status_codes': sorted({sample.status for sample in samples}),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'sql': None,
+    }
+    # Over HTTP only when every response carried a Server-Timing header
+    if all(sample.queries is not None for sample in samples):
+        sql_ms = sorted(sample.sql_seconds * 1000 for sample in samples)
+        summary['sql'] = {
+            'queries_mean': round(sum(sample.queries for sample in samples) / len(samples), 2),
+            'queries_max': max(sample.queries for sample in samples),
+            'time_ms_mean': round(sum(sql_ms) / len(sql_ms), 3),
+            'time_ms_p95': round(percentile(sql_ms, 0.95), 3),
+            'share_of_latency': round(sum(sql_ms) / sum(latencies), 3) if sum(latencies) else None,
+        }
+    return summary
+
+
+class BenchmarkRunner:
+    """Runs the scenarios and builds the JSON report"""
+
+    def __init__(self, requests=50, warmup=5, concurrency=1, base_url=None, only=None, writes=True, log=print):
+        self.requests = max(requests, 1)
+        self.warmup = max(warmup, 0)
+        self.concurrency = max(concurrency, 1)
+        self.base_url = base_url
+        self.only = only or []
+        self.writes = writes
+        self.log = log
+        self.users = {}
+
+    def selected(self, scenarios):
+        """Scenarios named by `only` (full names or groups like `catalog`), without writes if disabled"""
+        if not self.writes:
+            scenarios = [scenario for scenario in scenarios if scenario.creates is None]
+        if not self.only:
+            return scenarios
+        return [
+            scenario for scenario in scenarios
+            if any(scenario.name == name or scenario.name.startswith(f'{name}.') for name in self.only)
+        ]
+
+    def client(self, scenario):
+        user = self.users[scenario.user] if scenario.user else None
+        if self.base_url:
+            return HTTPClient(self.base_url, user)
+        return InProcessClient(user)
+
+    def run(self):
+        data = BenchmarkData()
+        self.users = {'customer': data.customer, 'technician': data.technician, 'staff': data.staff}
+        for role, user in self.users.items():
+            self.log(f'{role}: {user.email if user else "none found, its scenarios are skipped"}')
+
+        report = {
+            'version': REPORT_VERSION,
+            'created_at': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'environment': {
+                'mode': 'http' if self.base_url else 'in-process',
+                'base_url': self.base_url,
+                'database': connection.vendor,
+                'cache': settings.CACHES['default']['BACKEND'],
+                'debug': settings.DEBUG,
+                'python': platform.python_version(),
+            },
+            'settings': {'requests': self.requests, 'warmup': self.warmup, 'concurrency': self.concurrency},
+            'dataset': data.counts(),
+            'scenarios': {},
+        }
+        # The test client's requests come from `testserver`
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for scenario in self.selected(build_scenarios(data)):
+                summary = self.run_scenario(scenario)
+                report['scenarios'][scenario.name] = summary
+                self.log(format_summary(scenario.name, summary))
+        return report
+
+    def run_scenario(self, scenario):
+        created = []
+        try:
+            client = self.client(scenario)
+            for _ in range(self.warmup):
+                created.append(client.request(scenario).created)
+
+            if self.concurrency == 1:
+                started = time.perf_counter()
+                samples = [client.request(scenario) for _ in range(self.requests)]
+            else:
+                # One client (and, per thread, one database connection) per worker
+                shares = [
+                    self.requests // self.concurrency + (worker < self.requests % self.concurrency)
+                    for worker in range(self.concurrency)
+                ]
+                clients = [self.client(scenario) for share in shares if share]
+                start = threading.Barrier(len(clients))
+
+                def work(worker_client, count):
+                    try:
+                        start.wait()
+                        return [worker_client.request(scenario) for _ in range(count)]
+                    finally:
+                        connections.close_all()
+
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+                    results = list(pool.map(work, clients, [share for share in shares if share]))
+                samples = [sample for result in results for sample in result]
+            elapsed = time.perf_counter() - started
+            created += [sample.created for sample in samples]
+        finally:
+            created = [pk for pk in created if pk is not None]
+            if created:
+                # Deleting a pending order releases its stock hold (store.signals)
+                scenario.creates.objects.filter(pk__in=created).delete()
+        return summarize(scenario, samples, elapsed)
+
+
+def format_summary(name, summary):
+    latency = summary['latency_ms']
+    line = (
+        f'{name}: p50 {latency["p50"]:.1f}ms  p95 {latency["p95"]:.1f}ms  p99 {latency["p99"]:.1f}ms  '
+        f'{summary["throughput_rps"]} req/s'
+    )
+    if summary['sql']:
+        line += f'  {summary["sql"]["queries_mean"]:g} queries / {summary["sql"]["time_ms_mean"]:.1f}ms SQL'
+    if summary['errors']:
+        line += f'  {summary["errors"]} errors (status {summary["status_codes"]})'
+    return line
+
+
+def compare_reports(baseline, current, threshold=0.10, min_delta_ms=2.0):
+    """
+    [(scenario, metric, before, after, relative change, regressed)] for every
+    metric both reports have; latency regresses when it grows by more than
+    `threshold` and `min_delta_ms`, the query count by more than `threshold`
+    and one query
+    """
+    rows = []
+    for name, before_summary in baseline.get('scenarios', {}).items():
+        after_summary = current.get('scenarios', {}).get(name)
+        if after_summary is None:
+            continue
+        for group, metric, floor in COMPARED_METRICS:
+            before = (before_summary.get(group) or {}).get(metric)
+            after = (after_summary.get(group) or {}).get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else (math.inf if after else 0.0)
+            regressed = change > threshold and after - before >= (min_delta_ms if floor is None else floor)
+            rows.append((name, f'{group}.{metric}', before, after, change, regressed))
+    return rows
+
+
+def git_commit():
+    """Current commit of the checkout, if it is one"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
@@ -0,0 +1,154 @@
+# store/caching.py - HTTP validators and server-side payload cache for the public catalog endpoints
+
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from ecom_project.instrumentation import record_cache
+
+from .models import CatalogVersion
+
+
+def bump_catalog_version(name):
+    """Bump the catalog version once the surrounding transaction commits"""
+    transaction.on_commit(lambda: CatalogVersion.bump(name))
+
+
+def catalog_validators(request, name, *parts):
+    """
+    Weak ETag and Last-Modified for a catalog response. The ETag covers the
+    catalog version, the full URL (filters, cursor, fields) and the Accept
+    header, plus any extra parts (e.g. a product's updated_at).
+    """
+    version, updated_at = CatalogVersion.current(name)
+    key = ':'.join(str(part) for part in (
+        name, version, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), *parts
+    ))
+    etag = 'W/' + quote_etag(hashlib.md5(key.encode()).hexdigest())
+    return etag, updated_at
+
+
+def conditional_catalog(validators, private=None):
+    """
+    Decorator for APIView.get methods serving catalog data.
+
+    validators(request, *args, **kwargs) returns (etag, last_modified);
+    matching If-None-Match / If-Modified-Since requests get a 304 without
+    running the view. private(request) may mark a response as user specific,
+    which keeps it out of shared caches (nginx).
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = validators(request, *args, **kwargs)
+            # HTTP dates have one second resolution
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+
+            max_age = getattr(settings, 'CATALOG_CACHE_MAX_AGE', 60)
+            if private and private(request):
+                patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+            else:
+                patch_cache_control(response, public=True, max_age=max_age)
+            patch_vary_headers(response, ('Accept',))
+            if private:
+                patch_vary_headers(response, ('Authorization', 'Cookie'))
+            return response
+        return wrapper
+    return decorator
+
+
+# --- Serialized product payloads ------------------------------------------
+#
+# Every product slug has a generation token in the cache. Payload keys embed
+# it, so invalidating a product is a single delete of its token: all of its
+# cached representations (card, full, detail, any host) become unreachable
+# and simply expire.
+
+PRODUCT_CACHE_PREFIX = 'store:product'
+
+
+def _generation_key(slug):
+    return f'{PRODUCT_CACHE_PREFIX}:gen:{slug}'
+
+
+def _product_generations(slugs):
+    keys = {slug: _generation_key(slug) for slug in slugs}
+    found = cache.get_many(keys.values())
+    generations, missing = {}, {}
+    for slug, key in keys.items():
+        if key in found:
+            generations[slug] = found[key]
+        else:
+            generations[slug] = missing[key] = uuid.uuid4().hex
+    record_cache(hits=len(keys) - len(missing), misses=len(missing))
+    if missing:
+        cache.set_many(missing, None)
+    return generations
+
+
+def _payload_key(slug, generation, serializer_class, request):
+    # Image URLs are absolute, so the payload depends on the host it was built for
+    origin = f'{request.scheme}://{request.get_host()}'
+    digest = hashlib.md5(f'{serializer_class.__name__}:{origin}'.encode()).hexdigest()
+    return f'{PRODUCT_CACHE_PREFIX}:{slug}:{generation}:{digest}'
+
+
+def invalidate_products(slugs):
+    """Drop every cached payload of these products once the transaction commits"""
+    keys = [_generation_key(slug) for slug in set(slugs) if slug]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def cached_product_payloads(products, serializer_class, request, queryset):
+    """
+    Serialized payloads for `products` (only pk and slug are read), in order.
+    Misses are loaded through `queryset` - which should carry the joins and
+    prefetches serializer_class needs - serialized in one go and cached.
+    """
+    timeout = getattr(settings, 'PRODUCT_CACHE_TIMEOUT', 3600)
+    generations = _product_generations([product.slug for product in products])
+    keys = {
+        product.pk: _payload_key(product.slug, generations[product.slug], serializer_class, request)
+        for product in products
+    }
+    payloads = cache.get_many(keys.values())
+
+    missing = [pk for pk, key in keys.items() if key not in payloads]
+    record_cache(hits=len(keys) - len(missing), misses=len(missing))
+    if missing:
+        serializer = serializer_class(queryset.filter(pk__in=missing), many=True, context={'request': request})
+        fresh = {keys[item['id']]: item for item in serializer.data}
+        cache.set_many(fresh, timeout)
+        payloads.update(fresh)
+
+    return [payloads[keys[product.pk]] for product in products if keys[product.pk] in payloads]
+
+
+def cached_product_payload(slug, serializer_class, request, build):
+    """Cached payload for one product; build() serializes it on a miss (and may raise Http404)"""
+    key = _payload_key(slug, _product_generations([slug])[slug], serializer_class, request)
+    payload = cache.get(key)
+    if payload is None:
+        record_cache(misses=1)
+        payload = build()
+        cache.set(key, payload, getattr(settings, 'PRODUCT_CACHE_TIMEOUT', 3600))
+    else:
+        record_cache(hits=1)
+    return payload
@@ -0,0 +1,130 @@
+# store/catalog.py - Filtering and pagination for the product catalog API
+
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .models import Product, ProductSpecification
+
+# Price bands offered as a facet (INR); None means open ended
+PRICE_BANDS = [
+    (Decimal('0'), Decimal('1000')),
+    (Decimal('1000'), Decimal('5000')),
+    (Decimal('5000'), Decimal('20000')),
+    (Decimal('20000'), Decimal('50000')),
+    (Decimal('50000'), None),
+]
+
+
+def price_band_key(low, high):
+    return f'{low}-{high}' if high is not None else f'{low}+'
+
+
+PRICE_BANDS_BY_KEY = {price_band_key(low, high): (low, high) for low, high in PRICE_BANDS}
+
+# Fields whose serialization needs the related image/specification rows
+PREFETCH_FIELDS = {
+    'additional_images': ('additional_images',),
+    'all_images': ('additional_images',),
+    'specifications': ('specifications',),
+}
+
+
+class ProductCursorPagination(CursorPagination):
+    """Stable newest-first pages that stay cheap however deep the client scrolls"""
+    ordering = ('-created_at', '-id')
+    page_size = 24
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class ProductSearchPagination(PageNumberPagination):
+    """Search results are ordered by relevance, so they are paged by number"""
+    page_size = 24
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def _csv(params, name):
+    return [value.strip() for value in params.get(name, '').split(',') if value.strip()]
+
+
+def _price(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'{name} must be a number')
+    if price < 0:
+        raise ValueError(f'{name} must not be negative')
+    return price
+
+
+def filter_products(queryset, params):
+    """
+    Apply the catalog query params to a product queryset:
+      category   - category slug(s), comma separated
+      brand      - brand name(s), comma separated, case insensitive
+      featured   - true/false
+      min_price / max_price
+      price_band - one of PRICE_BANDS, e.g. 1000-5000 or 50000+
+      spec       - Name:Value specification pair, repeatable (all must match)
+    Raises ValueError with a user facing message for invalid values.
+    """
+    categories = _csv(params, 'category')
+    if categories:
+        queryset = queryset.filter(category__slug__in=categories)
+
+    brands = _csv(params, 'brand')
+    if brands:
+        # brand__iexact__in does not exist - normalise both sides instead
+        queryset = queryset.annotate(brand_lower=Lower('brand')).filter(
+            brand_lower__in=[brand.lower() for brand in brands]
+        )
+
+    featured = params.get('featured')
+    if featured not in (None, ''):
+        if featured.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError('featured must be true or false')
+        queryset = queryset.filter(is_featured=featured.lower() in ('true', '1'))
+
+    min_price = _price(params, 'min_price')
+    max_price = _price(params, 'max_price')
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError('min_price must not be greater than max_price')
+    if min_price is not None:
+        queryset = queryset.filter(price__gte=min_price)
+    if max_price is not None:
+        queryset = queryset.filter(price__lte=max_price)
+
+    price_band = params.get('price_band')
+    if price_band:
+        if price_band not in PRICE_BANDS_BY_KEY:
+            raise ValueError(f"price_band must be one of: {', '.join(PRICE_BANDS_BY_KEY)}")
+        low, high = PRICE_BANDS_BY_KEY[price_band]
+        queryset = queryset.filter(price__gte=low)
+        if high is not None:
+            queryset = queryset.filter(price__lt=high)
+
+    for spec in params.getlist('spec') if hasattr(params, 'getlist') else []:
+        name, sep, value = spec.partition(':')
+        if not sep or not name.strip() or not value.strip():
+            raise ValueError('spec must look like Name:Value')
+        queryset = queryset.filter(Exists(ProductSpecification.objects.filter(
+            product=OuterRef('pk'), name=name.strip(), value=value.strip()
+        )))
+
+    return queryset
+
+
+def catalog_queryset(fields):
+    """Active products with only the relations the requested fields need"""
+    queryset = Product.objects.filter(is_active=True).select_related('category')
+    prefetch = {name for field in fields for name in PREFETCH_FIELDS.get(field, ())}
+    if prefetch:
+        queryset = queryset.prefetch_related(*sorted(prefetch))
+    return queryset
@@ -0,0 +1,108 @@
+# store/facets.py - Facet counts (category, brand, price band, featured, specifications)
+#
+# Counts are taken over the products matching the current filters, with a
+# fixed number of grouped queries whatever the number of facet values:
+#   1. categories, 2. brands, 3. price bands + featured (conditional
+#   aggregation), 4. specification name/value pairs.
+# Results are cached per filter signature and catalog version, so any
+# product change (which bumps the version) retires them.
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min, Q
+from django.db.models.functions import Lower
+
+from ecom_project.instrumentation import record_cache
+
+from .catalog import PRICE_BANDS, price_band_key
+from .models import CatalogVersion, Product, ProductSpecification
+
+# Query params that select products (pagination/representation params are not part of the signature)
+FILTER_PARAMS = ('q', 'category', 'brand', 'featured', 'min_price', 'max_price', 'price_band', 'spec')
+
+# Most common values returned per specification name
+SPEC_VALUE_LIMIT = 20
+
+
+def filter_signature(params):
+    parts = []
+    for name in FILTER_PARAMS:
+        values = sorted(v.strip() for v in params.getlist(name) if v.strip())
+        if values:
+            parts.append(f"{name}={'|'.join(values)}")
+    return '&'.join(parts)
+
+
+def _band_filter(low, high):
+    condition = Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def compute_facets(products):
+    """Facet counts for a (filtered) product queryset"""
+    matching = Product.objects.filter(pk__in=products.order_by().values('pk'))
+
+    categories = matching.values('category__slug', 'category__name').annotate(
+        count=Count('id')
+    ).order_by('-count', 'category__name')
+
+    # The brand filter is case insensitive, so 'Dell' and 'DELL' are one value;
+    # the label is one of the spellings in use
+    brands = matching.exclude(brand='').values(key=Lower('brand')).annotate(
+        label=Min('brand'), count=Count('id')
+    ).order_by('-count', 'key')
+
+    bands = {price_band_key(low, high): Count('id', filter=_band_filter(low, high)) for low, high in PRICE_BANDS}
+    totals = matching.aggregate(
+        featured=Count('id', filter=Q(is_featured=True)),
+        not_featured=Count('id', filter=Q(is_featured=False)),
+        **{f'band_{index}': count for index, count in enumerate(bands.values())},
+    )
+
+    specifications = {}
+    spec_rows = ProductSpecification.objects.filter(product__in=matching).values('name', 'value').annotate(
+        count=Count('product', distinct=True)
+    ).order_by('name', '-count', 'value')
+    for row in spec_rows:
+        values = specifications.setdefault(row['name'], [])
+        if len(values) < SPEC_VALUE_LIMIT:
+            values.append({'value': row['value'], 'count': row['count']})
+
+    return {
+        'category': [
+            {'value': row['category__slug'], 'label': row['category__name'], 'count': row['count']}
+            for row in categories
+        ],
+        'brand': [{'value': row['key'], 'label': row['label'], 'count': row['count']} for row in brands],
+        'price_band': [
+            {
+                'value': key,
+                'min': low,
+                'max': high,
+                'count': totals[f'band_{index}'],
+            }
+            for index, (key, (low, high)) in enumerate(zip(bands, PRICE_BANDS))
+        ],
+        'featured': {'true': totals['featured'], 'false': totals['not_featured']},
+        'specifications': specifications,
+    }
+
+
+def get_facets(products, params):
+    """compute_facets() cached per filter signature and catalog version"""
+    version, _ = CatalogVersion.current(CatalogVersion.PRODUCTS)
+    digest = hashlib.md5(filter_signature(params).encode()).hexdigest()
+    key = f'store:facets:{version}:{digest}'
+
+    facets = cache.get(key)
+    if facets is None:
+        record_cache(misses=1)
+        facets = compute_facets(products)
+        cache.set(key, facets, getattr(settings, 'FACET_CACHE_TIMEOUT', 300))
+    else:
+        record_cache(hits=1)
+    return facets
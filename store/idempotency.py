@@ -0,0 +1,107 @@
+# store/idempotency.py - Idempotency-Key support for endpoints that create orders and service requests
+#
+# A client sending `Idempotency-Key: <unique value>` may retry the request
+# safely: the first successful (2xx) response is stored per user and key and
+# returned as is for retries, without running the view (and its checkout
+# transaction) again. Failed requests are not stored, so they can be retried.
+# Keys expire after IDEMPOTENCY_KEY_TTL seconds.
+#
+# While the first request runs, retries get 409. A claim still unfinished
+# after IDEMPOTENCY_IN_FLIGHT_TIMEOUT seconds belonged to a worker that died
+# (timeout, OOM, restart) without releasing it, and is taken over by the
+# next retry.
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+
+def _request_hash(request):
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def _claim(request, key, endpoint):
+    """Return (record, created); an expired record is replaced by a fresh one"""
+    now = timezone.now()
+    defaults = {
+        'endpoint': endpoint,
+        'request_hash': _request_hash(request),
+        'expires_at': now + timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400)),
+    }
+    record, created = IdempotencyKey.objects.get_or_create(user=request.user, key=key, defaults=defaults)
+    abandoned_before = now - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_IN_FLIGHT_TIMEOUT', 60))
+    abandoned = record.status_code is None and record.created_at <= abandoned_before
+    if not created and (record.expires_at <= now or abandoned):
+        # Conditional, so of several concurrent retries only one replaces it
+        IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).delete()
+        record, created = IdempotencyKey.objects.get_or_create(user=request.user, key=key, defaults=defaults)
+    if created:
+        # Keep the table small: drop this user's expired keys as new ones come in
+        IdempotencyKey.objects.filter(user=request.user, expires_at__lte=now).delete()
+    return record, created
+
+
+def idempotent(view):
+    """
+    Decorator for DRF views (function views or methods via method_decorator)
+    creating objects for the authenticated user. Apply it outside
+    @transaction.atomic so the key is claimed before the view's transaction.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.META.get(HEADER, '').strip()
+        if not key or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': 'Idempotency-Key must be at most 255 characters'}, status=400)
+
+        endpoint = request.resolver_match.view_name if request.resolver_match else request.path
+        record, created = _claim(request, key, endpoint[:100])
+
+        if not created:
+            if record.endpoint != endpoint[:100] or record.request_hash != _request_hash(request):
+                return Response(
+                    {'error': 'This Idempotency-Key was already used for a different request'},
+                    status=422
+                )
+            if record.status_code is None:
+                return Response(
+                    {'error': 'A request with this Idempotency-Key is still being processed'},
+                    status=409
+                )
+            response = Response(record.response_body, status=record.status_code)
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if 200 <= response.status_code < 300:
+            # Store the body as it is rendered, so a replay is byte for byte the same JSON.
+            # No row is updated if a retry took the claim over as abandoned meanwhile
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code,
+                response_body=json.loads(JSONRenderer().render(response.data)),
+            )
+        else:
+            record.delete()
+        return response
+    return wrapper
+
+
+def purge_expired_keys():
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
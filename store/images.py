@@ -0,0 +1,212 @@
+# store/images.py - Responsive image variants (thumb/card/zoom in WebP and JPEG) for product images
+#
+# Variants are stored like the originals, as content-addressed blobs
+# (store.storage): products/blobs/<xx>/<sha256>.webp|.jpg. Nothing in a
+# variant's name links it to its original; the model's `image_variants` JSON
+# does, e.g. {'source': <original>, 'card': {'webp': ..., 'jpeg': ...,
+# 'width': 480, 'height': 360}, ...}, so serializers can build srcsets
+# without touching storage. Rows sharing an original share its variants.
+
+import logging
+from io import BytesIO
+
+from django.apps import apps
+from django.db.models import Q
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# name -> longest edge in pixels (images are never upscaled)
+VARIANT_SIZES = {
+    'thumb': 160,
+    'card': 480,
+    'zoom': 1200,
+}
+
+# format -> (extension, Pillow save options)
+VARIANT_FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 6}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def _flatten(image):
+    """RGB copy for JPEG output, compositing any transparency onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate_variants(field_file):
+    """
+    Write every variant of an uploaded image to the field's storage and
+    return the description stored in `image_variants`.
+    """
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as source:
+        original = Image.open(source)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    variants = {'source': field_file.name}
+    for variant, size in VARIANT_SIZES.items():
+        resized = original.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        entry = {'width': resized.width, 'height': resized.height}
+
+        for image_format, (extension, options) in VARIANT_FORMATS.items():
+            if image_format == 'jpeg':
+                output_image = _flatten(resized)
+            else:
+                output_image = resized if resized.mode in ('RGB', 'RGBA') else resized.convert('RGBA')
+            buffer = BytesIO()
+            output_image.save(buffer, **options)
+
+            # The storage names the file after its content; only the extension is used
+            entry[image_format] = storage.save(f'{variant}.{extension}', ContentFile(buffer.getvalue()))
+
+        variants[variant] = entry
+    return variants
+
+
+def variant_files(variants):
+    return {
+        variants[variant][image_format]
+        for variant in VARIANT_SIZES if variant in (variants or {})
+        for image_format in VARIANT_FORMATS if variants[variant].get(image_format)
+    }
+
+
+def _image_models():
+    return apps.get_model('store', 'Product'), apps.get_model('store', 'ProductImage')
+
+
+def is_image_referenced(name):
+    """Whether any product or product image still uses the stored file `name`"""
+    return any(model.objects.filter(image=name).exists() for model in _image_models())
+
+
+def referenced_variant_files(names):
+    """The subset of the variant files `names` still listed in some row's `image_variants`"""
+    names = set(names)
+    if not names:
+        return set()
+    condition = Q()
+    for variant in VARIANT_SIZES:
+        for image_format in VARIANT_FORMATS:
+            condition |= Q(**{f'image_variants__{variant}__{image_format}__in': names})
+    referenced = set()
+    for model in _image_models():
+        for variants in model.objects.filter(condition).values_list('image_variants', flat=True):
+            referenced |= variant_files(variants) & names
+    return referenced
+
+
+def build_variants(field_file):
+    """generate_variants(), or an entry without variants for a broken image (so it isn't retried)"""
+    try:
+        return generate_variants(field_file)
+    except Exception:
+        logger.exception('Could not generate variants for %s', field_file.name)
+        return {'source': field_file.name}
+
+
+def shared_variants(name, instance=None):
+    """Variants already built for `name` by another row using the same file"""
+    for model in _image_models():
+        rows = model.objects.filter(image=name, image_variants__has_key='card')
+        if isinstance(instance, model) and instance.pk:
+            rows = rows.exclude(pk=instance.pk)
+        variants = rows.values_list('image_variants', flat=True).first()
+        if variants and variants.get('source') == name:
+            return variants
+    return None
+
+
+def ensure_variants(instance, field_name='image', variants_field='image_variants'):
+    """
+    Called from model save(): when the image changed since the variants were
+    built, store the upload and regenerate the variants (or reuse those of
+    another row sharing the file). A broken image keeps the upload but gets
+    no variants.
+
+    Returns (name, variant files) of the previous image for the caller to
+    queue for deletion once the row is saved (None when nothing was replaced).
+    """
+    field_file = getattr(instance, field_name)
+    current = getattr(instance, variants_field) or {}
+
+    if not field_file:
+        if current:
+            setattr(instance, variants_field, {})
+            return current.get('source'), sorted(variant_files(current))
+        return None
+    if not field_file._committed:
+        # Commit the upload now so the variants are named after its final path
+        field_file.save(field_file.name, field_file.file, save=False)
+    if current.get('source') == field_file.name:
+        return None
+
+    variants = shared_variants(field_file.name, instance)
+    if variants is None:
+        variants = build_variants(field_file)
+    return replace_image(instance, field_file.name, variants, field_name, variants_field)
+
+
+def store_image(model, content, field_name='image'):
+    """
+    Store an image for `model` and build (or reuse) its variants without
+    touching any row, so the encoding happens before callers take row locks.
+    Returns (name, variants) for replace_image().
+    """
+    field_file = getattr(model(), field_name)
+    field_file.save(content.name, content, save=False)
+    variants = shared_variants(field_file.name)
+    if variants is None:
+        variants = build_variants(field_file)
+    return field_file.name, variants
+
+
+def replace_image(instance, name, variants, field_name='image', variants_field='image_variants'):
+    """
+    Point the row at a stored image and its variants; save() then keeps them
+    as they are. Returns what ensure_variants() does for the replaced image.
+    """
+    current = getattr(instance, variants_field) or {}
+    setattr(instance, field_name, name)
+    setattr(instance, variants_field, variants)
+    if current and current.get('source') != name:
+        return current.get('source'), sorted(variant_files(current) - variant_files(variants))
+    return None
+
+
+def variant_urls(variants, build_url):
+    """
+    Public representation of `image_variants`: per-size URLs plus ready to
+    use srcset strings, e.g. {'card': {'webp': ..., 'jpeg': ..., 'width': 480},
+    'srcset': {'webp': 'a.webp 160w, b.webp 480w, ...', 'jpeg': ...}}
+    """
+    if not variants or not any(variant in variants for variant in VARIANT_SIZES):
+        return None
+
+    data = {}
+    srcset = {image_format: [] for image_format in VARIANT_FORMATS}
+    widths = set()
+    for variant in VARIANT_SIZES:
+        entry = variants.get(variant)
+        if not entry:
+            continue
+        data[variant] = {'width': entry['width'], 'height': entry['height']}
+        for image_format in VARIANT_FORMATS:
+            data[variant][image_format] = build_url(entry[image_format])
+        # Small originals give identical sizes; list each width once
+        if entry['width'] not in widths:
+            widths.add(entry['width'])
+            for image_format in VARIANT_FORMATS:
+                srcset[image_format].append(f"{data[variant][image_format]} {entry['width']}w")
+    data['srcset'] = {image_format: ', '.join(urls) for image_format, urls in srcset.items()}
+    return data
@@ -0,0 +1,645 @@
+# store/load_data.py - Synthetic production-scale data for load tests and query plans
+#
+# Used by `manage.py seed_load_data`. Rows are generated with explicit ids
+# (continuing after the current maximum) so children can reference parents
+# without reading anything back, and written in batches: COPY FROM STDIN on
+# PostgreSQL, multi-row INSERTs elsewhere. Timestamps are generated too, so
+# the writes bypass save() and its auto_now(_add) handling; the denormalized
+# values save() would maintain (order totals, job sheet durations, material
+# costs) are computed here instead.
+#
+# The data is skewed the way real traffic is: a few products sell most of
+# the units, a few customers order often, some technicians get far more jobs
+# than others, and orders follow the calendar (festival season, weekends,
+# evenings, steady growth). The same seed and end date give the same rows.
+
+import csv
+import io
+import json
+import random
+import time as clock
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+from PIL import Image, ImageDraw
+
+from admin_panel.stats import invalidate_admin_stats
+from services.models import (
+    JobSheet, JobSheetMaterial, ServiceCategory, ServiceIssue, ServiceRequest, TechnicianRating,
+)
+from users.models import CustomUser
+
+from .images import generate_variants
+from .models import (
+    Address, CatalogVersion, Order, OrderItem, Product, ProductCategory, ProductImage, ProductSpecification,
+)
+from .search import update_search_vectors
+from .storage import product_image_storage
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Akhil', 'Ananya', 'Arjun', 'Deepa', 'Divya', 'Farhan', 'Gayathri', 'Hari',
+    'Ishaan', 'Joseph', 'Kavya', 'Krishna', 'Lakshmi', 'Meera', 'Mohammed', 'Nikhil', 'Nisha', 'Pooja',
+    'Rahul', 'Riya', 'Rohan', 'Sanjay', 'Sneha', 'Sreya', 'Thomas', 'Varun', 'Vishnu', 'Zara',
+]
+LAST_NAMES = [
+    'Nair', 'Menon', 'Pillai', 'Kurian', 'Iyer', 'Sharma', 'Reddy', 'Khan', 'Varghese', 'Das',
+    'Joshi', 'Patel', 'Rao', 'Mathew', 'George', 'Thomas', 'Krishnan', 'Gupta', 'Singh', 'Bose',
+]
+STREETS = [
+    'MG Road', 'Church Street', 'Temple Road', 'Market Road', 'Station Road', 'Lake View Road',
+    'Gandhi Nagar', 'Park Avenue', 'Hill Road', 'Beach Road', 'College Road', 'Canal Road',
+]
+# (city, state, first three pincode digits, share of the customers)
+CITIES = [
+    ('Kochi', 'Kerala', '682', 18),
+    ('Thiruvananthapuram', 'Kerala', '695', 10),
+    ('Kozhikode', 'Kerala', '673', 6),
+    ('Thrissur', 'Kerala', '680', 5),
+    ('Bengaluru', 'Karnataka', '560', 16),
+    ('Chennai', 'Tamil Nadu', '600', 12),
+    ('Mumbai', 'Maharashtra', '400', 10),
+    ('Hyderabad', 'Telangana', '500', 8),
+    ('Delhi', 'Delhi', '110', 8),
+    ('Pune', 'Maharashtra', '411', 4),
+    ('Kolkata', 'West Bengal', '700', 3),
+]
+
+# Product categories created when the catalog has none: (name, base price)
+PRODUCT_CATEGORIES = [
+    ('Laptops', 55000), ('Desktops', 45000), ('Monitors', 14000), ('Printers', 12000),
+    ('Networking', 3500), ('Storage', 6000), ('Accessories', 1500), ('Components', 8000),
+]
+BRANDS = ['Dell', 'HP', 'Lenovo', 'Asus', 'Acer', 'Apple', 'Samsung', 'LG', 'Logitech', 'TP-Link', 'Canon', 'Seagate']
+SPECIFICATIONS = {
+    'Processor': ['Intel Core i3', 'Intel Core i5', 'Intel Core i7', 'AMD Ryzen 5', 'AMD Ryzen 7', 'Apple M2'],
+    'RAM': ['4GB', '8GB', '16GB', '32GB'],
+    'Storage': ['256GB SSD', '512GB SSD', '1TB SSD', '1TB HDD', '2TB HDD'],
+    'Display': ['14 inch FHD', '15.6 inch FHD', '24 inch IPS', '27 inch QHD'],
+    'Connectivity': ['Wi-Fi 6, Bluetooth 5.2', 'Gigabit Ethernet', 'USB-C, HDMI', 'Dual band Wi-Fi'],
+    'Colour': ['Black', 'Silver', 'Grey', 'White', 'Blue'],
+    'Power': ['45W', '65W', '90W', '150W'],
+    'Operating System': ['Windows 11 Home', 'Windows 11 Pro', 'macOS', 'None'],
+}
+
+# Service categories created when there are none: (name, [(issue, price)])
+SERVICE_CATEGORIES = [
+    ('Laptop Repair', [('Screen replacement', 4500), ('Keyboard not working', 1800), ('Does not boot', 900), ('Battery replacement', 3200)]),
+    ('Desktop Repair', [('No display', 800), ('Random restarts', 900), ('Upgrade RAM or storage', 600)]),
+    ('Printer Service', [('Paper jam', 500), ('Poor print quality', 700), ('Not detected', 600)]),
+    ('Network Setup', [('New router setup', 1200), ('Slow Wi-Fi', 800)]),
+    ('Data Recovery', [('Deleted files', 2500), ('Failed hard disk', 6000)]),
+    ('Virus Removal', [('Malware cleanup', 1000), ('OS reinstall', 1500)]),
+]
+WORK_PERFORMED = [
+    'Diagnosed the fault and replaced the defective part',
+    'Cleaned internals, replaced thermal paste and tested under load',
+    'Reinstalled drivers and updated firmware',
+    'Reseated connectors and ran hardware diagnostics',
+    'Configured the device and verified with the customer',
+]
+MATERIALS = [
+    ('Thermal paste', 250), ('SATA cable', 150), ('Screws kit', 80), ('Cleaning kit', 120),
+    ('Keyboard', 1800), ('Battery', 2900), ('RAM module', 2400), ('Power adapter', 1600),
+]
+RATING_COMMENTS = ['', '', '', 'Quick and professional', 'Solved the problem', 'Arrived late', 'Very helpful', 'Good service']
+
+# Relative order volume per month (festival season in Oct/Nov, year end sales)
+MONTH_FACTORS = {1: 1.1, 2: 0.8, 3: 0.85, 4: 0.9, 5: 0.95, 6: 0.85, 7: 0.9, 8: 1.05, 9: 1.1, 10: 1.5, 11: 1.6, 12: 1.3}
+# Relative volume per hour of the day, busiest in the evening
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 9, 9, 9, 8, 8, 9, 10, 12, 14, 14, 12, 7, 3]
+
+ORDER_ITEM_COUNTS = ([1, 2, 3, 4], [70, 20, 7, 3])
+ITEM_QUANTITIES = ([1, 2, 3], [85, 12, 3])
+
+Customer = namedtuple('Customer', 'id name phone address_ids city is_amc')
+
+
+def cumulative(weights):
+    total, result = 0, []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+def zipf_weights(rng, count, exponent):
+    """Popularity weights 1/rank^exponent, ranks shuffled so popularity does not follow the id"""
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return [1 / rank ** exponent for rank in ranks]
+
+
+def spread(total, weights):
+    """Split `total` into integer parts proportional to `weights` (largest remainder)"""
+    weight_sum = sum(weights)
+    exact = [total * weight / weight_sum for weight in weights]
+    parts = [int(value) for value in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda index: exact[index] - parts[index], reverse=True)
+    for index in by_remainder[:total - sum(parts)]:
+        parts[index] += 1
+    return parts
+
+
+class TableWriter:
+    """
+    Buffers the rows of one model and writes them `batch_size` at a time.
+    Columns left out of add() get the field default; the primary key is
+    assigned here, continuing after the current maximum. Writers of the
+    tables a row references are flushed first, so foreign keys always
+    point at rows already written.
+    """
+
+    def __init__(self, model, batch_size, use_copy, parents=()):
+        self.model = model
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.parents = parents
+        self.fields = list(model._meta.concrete_fields)
+        self.defaults = [(field.attname, field.get_default()) for field in self.fields]
+        self.next_id = (model._base_manager.aggregate(last=Max('pk'))['last'] or 0) + 1
+        self.first_id = self.next_id
+        self.rows = []
+        self.written = 0
+        # The connection itself rather than the proxy, which is looked up on every attribute access
+        self.connection = connections[DEFAULT_DB_ALIAS]
+
+    def add(self, **values):
+        """Queue one row and return its id"""
+        values.setdefault(self.model._meta.pk.attname, self.next_id)
+        self.next_id = max(self.next_id, values[self.model._meta.pk.attname] + 1)
+        self.rows.append([values.get(attname, default) for attname, default in self.defaults])
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+        return values[self.model._meta.pk.attname]
+
+    def flush(self):
+        for parent in self.parents:
+            parent.flush()
+        if not self.rows:
+            return
+        with transaction.atomic():
+            if self.use_copy:
+                self._copy()
+            else:
+                self._insert()
+        self.written += len(self.rows)
+        self.rows = []
+
+    def _insert(self):
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in self.fields)
+        placeholders = '(' + ', '.join(['%s'] * len(self.fields)) + ')'
+        rows = [[self._prepare(field, value) for field, value in zip(self.fields, row)] for row in self.rows]
+        batch = self.connection.ops.bulk_batch_size(self.fields, rows) or len(rows)
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(rows), batch):
+                chunk = rows[start:start + batch]
+                cursor.execute(
+                    f'INSERT INTO {quote(self.model._meta.db_table)} ({columns}) VALUES {", ".join([placeholders] * len(chunk))}',
+                    [value for row in chunk for value in row],
+                )
+
+    def _prepare(self, field, value):
+        # Plain values go to the driver as they are; the field adapts the rest (dates, decimals, JSON)
+        if value is None or type(value) in (int, str, bool):
+            return value
+        return field.get_db_prep_save(value, self.connection)
+
+    def _copy(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in self.rows:
+            writer.writerow([self._copy_value(value) for value in row])
+
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in self.fields)
+        sql = f"COPY {quote(self.model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        with self.connection.cursor() as cursor:
+            if hasattr(cursor.cursor, 'copy_expert'):  # psycopg2
+                buffer.seek(0)
+                cursor.cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    @staticmethod
+    def _copy_value(value):
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+
+class LoadDataGenerator:
+    """Generates every table in dependency order; volumes are row counts per kind"""
+
+    def __init__(self, volumes, seed=0, end_date=None, days=730, batch_size=5000, use_copy=None,
+                 rating_share=0.35, password='loadtest', placeholder_images=12, log=print):
+        self.volumes = volumes
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.last_day = end_date or timezone.localdate()
+        self.days = max(days, 1)
+        self.first_day = self.last_day - timedelta(days=self.days - 1)
+        self.batch_size = max(batch_size, 1)
+        self.use_copy = connection.vendor == 'postgresql' if use_copy is None else use_copy
+        self.rating_share = rating_share
+        self.password = password
+        self.placeholder_images = max(placeholder_images, 1)
+        self.log = log
+        self.tz = timezone.get_current_timezone()
+        self.writers = []
+
+    def writer(self, model, *parents):
+        writer = TableWriter(model, self.batch_size, self.use_copy, parents)
+        self.writers.append(writer)
+        return writer
+
+    def run(self):
+        started = clock.monotonic()
+        self.users = self.writer(CustomUser)
+        self.addresses = self.writer(Address, self.users)
+        self.free_categories = self.writer(CustomUser.free_service_categories.through, self.users)
+        self.products = self.writer(Product)
+        self.product_images = self.writer(ProductImage, self.products)
+        self.specifications = self.writer(ProductSpecification, self.products)
+        self.orders = self.writer(Order, self.addresses, self.products)
+        self.order_items = self.writer(OrderItem, self.orders)
+        self.services = self.writer(ServiceRequest, self.addresses)
+        self.job_sheets = self.writer(JobSheet, self.services)
+        self.materials = self.writer(JobSheetMaterial, self.job_sheets)
+        self.ratings = self.writer(TechnicianRating, self.orders, self.services)
+
+        self._step('users and addresses', self.generate_users)
+        self._step('products', self.generate_products)
+        self._step('orders', self.generate_orders)
+        self._step('service requests', self.generate_services)
+        self._step('finishing', self.finish)
+
+        summary = ', '.join(
+            f'{writer.written} {writer.model._meta.label}' for writer in self.writers if writer.written
+        )
+        self.log(f'Wrote {summary} in {clock.monotonic() - started:.1f}s')
+        return {writer.model._meta.label: writer.written for writer in self.writers}
+
+    def _step(self, label, generate):
+        started = clock.monotonic()
+        generate()
+        for writer in self.writers:
+            writer.flush()
+        self.log(f'{label}: {clock.monotonic() - started:.1f}s')
+
+    # Helpers
+
+    def timestamp(self, day, hour=None):
+        if hour is None:
+            hour = self.rng.choices(range(24), cum_weights=self.hour_weights)[0]
+        moment = time(hour, self.rng.randrange(60), self.rng.randrange(60))
+        return datetime.combine(day, moment, tzinfo=self.tz)
+
+    def daily_counts(self, total):
+        """How many rows fall on each day: seasonal, busier at weekends, growing over the period"""
+        weights = []
+        for offset in range(self.days):
+            day = self.first_day + timedelta(days=offset)
+            growth = 0.6 + 0.8 * offset / self.days
+            weekend = 1.3 if day.weekday() >= 5 else 1.0
+            weights.append(growth * weekend * MONTH_FACTORS[day.month])
+        return spread(total, weights)
+
+    def pick(self, population, cum_weights):
+        return population[self.rng.choices(range(len(population)), cum_weights=cum_weights)[0]]
+
+    # Users
+
+    def generate_users(self):
+        self.hour_weights = cumulative(HOUR_WEIGHTS)
+        # One hash shared by every user (hashing is slow by design); salted from the seed to stay reproducible
+        password = make_password(self.password, salt=f'loaddata{self.seed}')
+        self.service_categories = self.ensure_service_categories()
+
+        self.technicians = [
+            self.add_user(CustomUser.Role.TECHNICIAN, password)[0] for _ in range(self.volumes['technicians'])
+        ]
+        if not self.technicians:
+            self.technicians = list(
+                CustomUser.objects.filter(role=CustomUser.Role.TECHNICIAN, is_active=True).values_list('id', flat=True)
+            )
+        # Busy technicians get most of the jobs; each has a typical rating
+        self.technician_weights = cumulative(zipf_weights(self.rng, len(self.technicians), 0.9))
+        self.technician_quality = {technician: self.rng.uniform(3.3, 4.8) for technician in self.technicians}
+
+        city_weights = cumulative([city[3] for city in CITIES])
+        self.customers = []
+        for role, count in (
+            (CustomUser.Role.CUSTOMER, self.volumes['customers']),
+            (CustomUser.Role.AMC, self.volumes['amc']),
+        ):
+            is_amc = role == CustomUser.Role.AMC
+            for _ in range(count):
+                user_id, name, phone = self.add_user(role, password)
+                city = self.rng.choices(range(len(CITIES)), cum_weights=city_weights)[0]
+                address_count = self.rng.choices([1, 2, 3], [75, 20, 5])[0]
+                address_ids = [
+                    self.add_address(user_id, city, is_default=index == 0) for index in range(address_count)
+                ]
+                self.customers.append(Customer(user_id, name, phone, address_ids, city, is_amc))
+                if is_amc and self.service_categories:
+                    count = min(len(self.service_categories), self.rng.randint(1, 3))
+                    for category in self.rng.sample(self.service_categories, count):
+                        self.free_categories.add(customuser_id=user_id, servicecategory_id=category['id'])
+
+        if not self.customers:
+            # Only products and orders requested: order for the existing customers
+            for address in Address.objects.filter(is_default=True).select_related('user')[:1000]:
+                city = next((index for index, city in enumerate(CITIES) if city[0] == address.city), 0)
+                self.customers.append(
+                    Customer(address.user_id, address.user.name, address.user.phone or '', [address.id], city, False)
+                )
+        # A few customers place most of the orders; AMC customers book more services
+        self.customer_weights = cumulative(
+            self.rng.paretovariate(1.4) * (3 if customer.is_amc else 1) for customer in self.customers
+        )
+
+    def add_user(self, role, password):
+        """(id, name, phone) of a new user"""
+        user_id = self.users.next_id
+        name = f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+        phone = f'9{self.rng.randrange(10 ** 9):09d}'
+        self.users.add(
+            password=password,
+            email=f'{role.value.lower()}{user_id}@load.example.com',
+            name=name,
+            phone=phone,
+            role=role.value,
+            date_joined=self.timestamp(self.first_day - timedelta(days=self.rng.randrange(365))),
+        )
+        return user_id, name, phone
+
+    def add_address(self, user_id, city, is_default):
+        name, state, pincode, _ = CITIES[city]
+        return self.addresses.add(
+            user_id=user_id,
+            street_address=f'{self.rng.randint(1, 400)}, {self.rng.choice(STREETS)}',
+            city=name,
+            state=state,
+            pincode=f'{pincode}{self.rng.randrange(1000):03d}',
+            is_default=is_default,
+        )
+
+    def ensure_service_categories(self):
+        if not ServiceIssue.objects.exists():
+            for name, issues in SERVICE_CATEGORIES:
+                category, _ = ServiceCategory.objects.get_or_create(name=name)
+                for description, price in issues:
+                    ServiceIssue.objects.get_or_create(category=category, description=description, defaults={'price': price})
+        categories = []
+        for category in ServiceCategory.objects.order_by('pk'):
+            issues = list(category.issues.order_by('pk').values('id', 'description'))
+            if issues:
+                categories.append({'id': category.id, 'name': category.name, 'issues': issues})
+        return categories
+
+    # Products
+
+    def generate_products(self):
+        categories = list(ProductCategory.objects.order_by('pk').values_list('id', 'name'))
+        if not categories:
+            for name, _ in PRODUCT_CATEGORIES:
+                ProductCategory.objects.get_or_create(name=name, defaults={'slug': slugify(name)})
+            categories = list(ProductCategory.objects.order_by('pk').values_list('id', 'name'))
+        base_prices = dict(PRODUCT_CATEGORIES)
+        images = self.placeholder_image_files()
+
+        self.product_ids, self.product_prices = [], []
+        for _ in range(self.volumes['products']):
+            category_id, category_name = self.rng.choice(categories)
+            brand = self.rng.choice(BRANDS)
+            model_number = f'{brand[:2].upper()}-{self.rng.randint(1000, 9999)}'
+            product_id = self.products.next_id
+            name = f'{brand} {category_name.rstrip("s")} {model_number}'
+            price = Decimal(round(base_prices.get(category_name, 10000) * self.rng.lognormvariate(0, 0.45), -1))
+            # ~3% are almost sold out (the partial product_low_stock_idx index covers them)
+            stock = self.rng.randint(0, 4) if self.rng.random() < 0.03 else self.rng.randint(5, 250)
+            created = self.timestamp(self.first_day - timedelta(days=self.rng.randrange(180)))
+            image, variants = self.rng.choice(images)
+
+            self.products.add(
+                category_id=category_id,
+                name=name,
+                slug=f'{slugify(name)}-{product_id}',
+                description=f'{name} from {brand}, covered by the manufacturer warranty.',
+                price=price,
+                image=image,
+                image_variants=variants,
+                stock=stock,
+                delivery_time_info='Delivered within 2-5 business days',
+                brand=brand,
+                model_number=model_number,
+                features='Free installation, Genuine product, Easy returns',
+                is_featured=self.rng.random() < 0.03,
+                is_active=self.rng.random() < 0.95,
+                created_at=created,
+                updated_at=created,
+            )
+            self.product_ids.append(product_id)
+            self.product_prices.append(price)
+
+            for order in range(self.rng.randint(0, self.volumes['images_per_product'])):
+                image, variants = self.rng.choice(images)
+                self.product_images.add(
+                    product_id=product_id, image=image, image_variants=variants,
+                    alt_text=f'{name} view {order + 1}', order=order,
+                )
+            names = self.rng.sample(sorted(SPECIFICATIONS), min(self.volumes['specs_per_product'], len(SPECIFICATIONS)))
+            for order, spec in enumerate(names):
+                self.specifications.add(product_id=product_id, name=spec, value=self.rng.choice(SPECIFICATIONS[spec]), order=order)
+
+        if not self.product_ids:
+            rows = Product.objects.filter(is_active=True).values_list('id', 'price')[:1000]
+            self.product_ids = [pk for pk, _ in rows]
+            self.product_prices = [price for _, price in rows]
+        # A few products sell most of the units
+        self.product_weights = cumulative(zipf_weights(self.rng, len(self.product_ids), 1.1))
+
+    def placeholder_image_files(self):
+        """A handful of stored images (with their variants) shared by every generated product"""
+        files = []
+        for index in range(self.placeholder_images):
+            image = Image.new('RGB', (800, 800), tuple(self.rng.randrange(40, 220) for _ in range(3)))
+            ImageDraw.Draw(image).rectangle((200, 250, 600, 550), fill=tuple(self.rng.randrange(256) for _ in range(3)))
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=80)
+            name = product_image_storage.save(f'load-{index}.jpg', ContentFile(buffer.getvalue()))
+            files.append((name, generate_variants(Product(image=name).image)))
+        return files
+
+    # Orders
+
+    def order_status(self, age):
+        if age > 14:
+            return self.rng.choices(['DELIVERED', 'CANCELLED'], [92, 8])[0]
+        if age > 3:
+            return self.rng.choices(['SHIPPED', 'DELIVERED', 'CANCELLED'], [35, 55, 10])[0]
+        return self.rng.choices(['PENDING', 'PROCESSING', 'SHIPPED', 'CANCELLED'], [35, 35, 20, 10])[0]
+
+    def rating(self, technician, customer_id, moment, **target):
+        if self.rng.random() >= self.rating_share:
+            return
+        score = round(self.rng.gauss(self.technician_quality.get(technician, 4), 0.9))
+        self.ratings.add(
+            technician_id=technician,
+            customer_id=customer_id,
+            rating=min(max(score, 1), 5),
+            comment=self.rng.choice(RATING_COMMENTS),
+            created_at=min(moment + timedelta(days=self.rng.randint(1, 10)), self.timestamp(self.last_day, 23)),
+            **target,
+        )
+
+    def generate_orders(self):
+        if not self.product_ids or not self.customers:
+            return
+        for offset, count in enumerate(self.daily_counts(self.volumes['orders'])):
+            day = self.first_day + timedelta(days=offset)
+            age = (self.last_day - day).days
+            # Ids follow order_date, as they do in production
+            for moment in sorted(self.timestamp(day) for _ in range(count)):
+                customer = self.pick(self.customers, self.customer_weights)
+                status = self.order_status(age)
+                technician = None
+                if status != 'PENDING' and self.technicians:
+                    technician = self.pick(self.technicians, self.technician_weights)
+
+                item_count = self.rng.choices(*ORDER_ITEM_COUNTS)[0]
+                products = set(self.rng.choices(range(len(self.product_ids)), cum_weights=self.product_weights, k=item_count))
+                items = [(product, self.rng.choices(*ITEM_QUANTITIES)[0]) for product in sorted(products)]
+
+                order_id = self.orders.add(
+                    customer_id=customer.id,
+                    technician_id=technician,
+                    order_date=moment,
+                    status=status,
+                    shipping_address_id=self.rng.choice(customer.address_ids),
+                    total_amount=sum((self.product_prices[product] * quantity for product, quantity in items), Decimal('0.00')),
+                    item_count=sum(quantity for _, quantity in items),
+                )
+                for product, quantity in items:
+                    self.order_items.add(
+                        order_id=order_id,
+                        product_id=self.product_ids[product],
+                        quantity=quantity,
+                        price=self.product_prices[product],
+                    )
+                if status == 'DELIVERED' and technician:
+                    self.rating(technician, customer.id, moment, order_id=order_id)
+
+    # Service requests
+
+    def service_status(self, age):
+        if age > 10:
+            return self.rng.choices(['COMPLETED', 'CANCELLED'], [88, 12])[0]
+        if age > 2:
+            return self.rng.choices(['ASSIGNED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED'], [20, 30, 40, 10])[0]
+        return self.rng.choices(['SUBMITTED', 'ASSIGNED', 'IN_PROGRESS'], [50, 30, 20])[0]
+
+    def generate_services(self):
+        if not self.service_categories or not self.customers:
+            return
+        category_weights = cumulative(zipf_weights(self.rng, len(self.service_categories), 0.8))
+        for offset, count in enumerate(self.daily_counts(self.volumes['services'])):
+            day = self.first_day + timedelta(days=offset)
+            age = (self.last_day - day).days
+            for moment in sorted(self.timestamp(day) for _ in range(count)):
+                customer = self.pick(self.customers, self.customer_weights)
+                category = self.pick(self.service_categories, category_weights)
+                issue = self.rng.choice(category['issues']) if self.rng.random() < 0.9 else None
+                status = self.service_status(age)
+                technician = None
+                if status != 'SUBMITTED' and self.technicians:
+                    technician = self.pick(self.technicians, self.technician_weights)
+
+                service_id = self.services.add(
+                    customer_id=customer.id,
+                    technician_id=technician,
+                    service_category_id=category['id'],
+                    issue_id=issue['id'] if issue else None,
+                    custom_description='' if issue else 'Intermittent fault, details on the phone',
+                    service_location_id=self.rng.choice(customer.address_ids),
+                    request_date=moment,
+                    status=status,
+                )
+                if status in ('IN_PROGRESS', 'COMPLETED') and technician:
+                    self.add_job_sheet(service_id, status, technician, customer, category, issue, moment)
+                if status == 'COMPLETED' and technician:
+                    self.rating(technician, customer.id, moment, service_request_id=service_id)
+
+    def add_job_sheet(self, service_id, status, technician, customer, category, issue, requested):
+        if status == 'COMPLETED':
+            approval = self.rng.choices(['APPROVED', 'PENDING'], [95, 5])[0]
+        else:
+            approval = self.rng.choices(['PENDING', 'DECLINED'], [80, 20])[0]
+        service_day = min(requested.date() + timedelta(days=self.rng.randint(0, 3)), self.last_day)
+        start = self.timestamp(service_day, self.rng.randint(9, 16))
+        finish = start + timedelta(minutes=self.rng.randint(30, 180))
+
+        job_sheet_id = self.job_sheets.add(
+            service_request_id=service_id,
+            customer_name=customer.name,
+            customer_contact=customer.phone,
+            service_address=f'{CITIES[customer.city][0]}, {CITIES[customer.city][1]}',
+            equipment_type=category['name'].split()[0],
+            serial_number=f'SN{self.rng.randrange(10 ** 8):08d}',
+            equipment_brand=self.rng.choice(BRANDS),
+            equipment_model=f'M{self.rng.randint(100, 999)}',
+            problem_description=issue['description'] if issue else 'Intermittent fault',
+            work_performed=self.rng.choice(WORK_PERFORMED),
+            date_of_service=service_day,
+            start_time=start.time(),
+            finish_time=finish.time(),
+            total_time_taken=finish - start,
+            approval_status=approval,
+            approved_at=finish + timedelta(hours=2) if approval == 'APPROVED' else None,
+            declined_reason='Cost too high' if approval == 'DECLINED' else None,
+            created_by_id=technician,
+            created_at=finish,
+            updated_at=finish,
+        )
+        for _ in range(self.rng.choices([0, 1, 2, 3], [30, 40, 20, 10])[0]):
+            description, unit_cost = self.rng.choice(MATERIALS)
+            quantity = Decimal(self.rng.choices([1, 2], [85, 15])[0])
+            self.materials.add(
+                job_sheet_id=job_sheet_id,
+                date_used=service_day,
+                item_description=description,
+                quantity=quantity,
+                unit_cost=Decimal(unit_cost),
+                total_cost=quantity * unit_cost,
+            )
+
+    # Bookkeeping the skipped save()/signals would have done
+
+    def finish(self):
+        for writer in self.writers:
+            writer.flush()
+        if connection.vendor == 'postgresql':
+            # Ids were supplied explicitly, move the sequences past them
+            statements = connection.ops.sequence_reset_sql(no_style(), [writer.model for writer in self.writers])
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+        update_search_vectors(Product.objects.filter(pk__gte=self.products.first_id))
+        CatalogVersion.bump(CatalogVersion.PRODUCTS)
+        CatalogVersion.bump(CatalogVersion.SERVICES)
+        invalidate_admin_stats()
@@ -0,0 +1,133 @@
+# store/management/commands/benchmark_endpoints.py
+# Latency/throughput/SQL benchmark of the hot endpoints (see store.benchmarks)
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.benchmarks import BenchmarkRunner, compare_reports
+
+class Command(BaseCommand):
+    help = 'Benchmark the catalog, checkout, order history, technician, job sheet and admin endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Measured requests per scenario (default: 50)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Unmeasured requests per scenario before measuring (default: 5)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Parallel clients per scenario (default: 1)',
+        )
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            help='Benchmark a running server, e.g. http://127.0.0.1:8000, instead of in-process',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            dest='scenarios',
+            help='Run only this scenario or group (e.g. catalog, checkout.create_bulk_order); repeatable',
+        )
+        parser.add_argument(
+            '--no-writes',
+            action='store_true',
+            help='Skip the scenarios that create rows (checkout)',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the JSON report to this file',
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='Compare against this earlier report and fail on regressions',
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='Compare this existing report with --baseline instead of running the benchmark',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=10.0,
+            help='Percent a metric may worsen before it counts as a regression (default: 10)',
+        )
+        parser.add_argument(
+            '--min-delta-ms',
+            type=float,
+            default=2.0,
+            help='Latency increases below this many milliseconds are never regressions (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        if options['compare'] and not options['baseline']:
+            raise CommandError('--compare needs --baseline')
+        baseline = self.load(options['baseline']) if options['baseline'] else None
+
+        if options['compare']:
+            report = self.load(options['compare'])
+        else:
+            runner = BenchmarkRunner(
+                requests=options['requests'],
+                warmup=options['warmup'],
+                concurrency=options['concurrency'],
+                base_url=options['base_url'],
+                only=options['scenarios'],
+                writes=not options['no_writes'],
+                log=self.stdout.write,
+            )
+            try:
+                report = runner.run()
+            except OSError as e:
+                # requests' connection errors, with --base-url
+                raise CommandError(f'Benchmark failed: {e}')
+            if not report['scenarios']:
+                raise CommandError('No scenario ran; seed the database first (manage.py seed_load_data)')
+            if options['output']:
+                with open(options['output'], 'w') as handle:
+                    json.dump(report, handle, indent=2)
+                self.stdout.write(f'Report written to {options["output"]}')
+
+        errors = sum(summary['errors'] for summary in report['scenarios'].values())
+        if errors:
+            self.stdout.write(self.style.WARNING(f'{errors} request(s) returned an unexpected status'))
+
+        if baseline is None:
+            self.stdout.write(self.style.SUCCESS(f'Benchmarked {len(report["scenarios"])} scenario(s)'))
+            return
+
+        rows = compare_reports(
+            baseline, report, threshold=options['threshold'] / 100, min_delta_ms=options['min_delta_ms']
+        )
+        regressions = []
+        for name, metric, before, after, change, regressed in rows:
+            line = f'{name} {metric}: {before:g} -> {after:g} ({change:+.1%})'
+            if regressed:
+                regressions.append(f'{name} {metric}')
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'{len(regressions)} regression(s): {", ".join(regressions)}')
+        self.stdout.write(self.style.SUCCESS(f'No regression beyond {options["threshold"]:g}%'))
+
+    def load(self, path):
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read report {path}: {e}')
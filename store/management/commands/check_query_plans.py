@@ -0,0 +1,37 @@
+# store/management/commands/check_query_plans.py
+# Verify with EXPLAIN that each hot query can use the index declared for it
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from store.query_plans import check_query_plans
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot order/service/product/address queries and check each one uses its index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan of every query, not only of the failing ones',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f'Plans below come from {connection.vendor}; the indexes are tuned for PostgreSQL'
+            ))
+
+        missing = []
+        for label, index, uses_index, plan in check_query_plans():
+            if uses_index:
+                self.stdout.write(f'{label}: {index}')
+            else:
+                missing.append(label)
+                self.stdout.write(self.style.ERROR(f'{label}: {index} NOT USED'))
+            if options['verbose_plans'] or not uses_index:
+                self.stdout.write(f'    {plan}'.replace('\n', '\n    '))
+
+        if missing:
+            raise CommandError(f'{len(missing)} hot query(ies) do not use their index: {", ".join(missing)}')
+        self.stdout.write(self.style.SUCCESS('Every hot query uses its index'))
@@ -0,0 +1,67 @@
+# store/management/commands/collect_media_garbage.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.media_gc import collect_orphans, process_deletion_queue
+
+class Command(BaseCommand):
+    help = 'Delete queued product image files and sweep orphaned files out of the media directories'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Queued deletions / scanned files handled at a time (default: 500)',
+        )
+        parser.add_argument(
+            '--queue-only',
+            action='store_true',
+            help='Only process the deletion queue, skip the orphan sweep',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report orphaned files without deleting them (the queue is left untouched)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and process the deletion queue every N seconds',
+        )
+        parser.add_argument(
+            '--sweep-every',
+            type=int,
+            default=86400,
+            help='With --interval, seconds between orphan sweeps (default: 86400)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        last_sweep = None
+
+        while True:
+            if not options['dry_run']:
+                deleted = 0
+                while True:
+                    count = process_deletion_queue(limit=batch_size)
+                    if not count:
+                        break
+                    deleted += count
+                if deleted:
+                    self.stdout.write(self.style.SUCCESS(f'Processed {deleted} queued deletion(s)'))
+
+            if not options['queue_only'] and (
+                last_sweep is None or time.monotonic() - last_sweep >= options['sweep_every']
+            ):
+                checked, orphans = collect_orphans(batch_size=batch_size, dry_run=options['dry_run'])
+                last_sweep = time.monotonic()
+                verb = 'Found' if options['dry_run'] else 'Deleted'
+                self.stdout.write(self.style.SUCCESS(f'{verb} {orphans} orphaned file(s) out of {checked} checked'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
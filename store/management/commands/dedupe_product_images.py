@@ -0,0 +1,42 @@
+# store/management/commands/dedupe_product_images.py
+# Move product images stored by upload filename into the content-addressed store
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from store.models import MediaDeletion, Product, ProductImage
+from store.storage import BLOB_DIRECTORY
+
+class Command(BaseCommand):
+    help = 'Re-store product images under their content hash so duplicate uploads share one file'
+
+    def handle(self, *args, **options):
+        for model in (Product, ProductImage):
+            images = model.objects.exclude(
+                Q(image='') | Q(image__startswith=BLOB_DIRECTORY + '/')
+            ).order_by('pk')
+
+            moved = missing = 0
+            for instance in images.iterator(chunk_size=100):
+                storage = instance.image.storage
+                old_name = instance.image.name
+                if not storage.exists(old_name):
+                    self.stdout.write(self.style.WARNING(f'Missing file for {model.__name__} #{instance.pk}: {old_name}'))
+                    missing += 1
+                    continue
+
+                had_variants = bool(instance.image_variants)
+                with storage.open(old_name, 'rb') as source:
+                    instance.image.save(old_name, File(source), save=False)
+                # save() reuses or builds the variants and queues the previous
+                # file for deletion, unless the row never had variants
+                instance.save(update_fields=['image', 'image_variants'])
+                if not had_variants:
+                    MediaDeletion.queue(old_name)
+                moved += 1
+
+            self.stdout.write(self.style.SUCCESS(
+                f'Moved {moved} {model._meta.verbose_name_plural} to content-addressed storage'
+                + (f' ({missing} missing)' if missing else '')
+            ))
@@ -1,9 +1,10 @@
 # store/management/commands/fix_order_prices.py
-# Create this file in your Django app to fix existing orders with None prices
+# Backfill OrderItems with None prices from their product prices
 
 from django.core.management.base import BaseCommand
-from store.models import OrderItem
-from decimal import Decimal
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from store.models import OrderItem, Product
 
 class Command(BaseCommand):
     help = 'Fix OrderItems with None prices by setting them to their product prices'
@@ -14,75 +15,75 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be fixed without making changes',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of OrderItems updated per statement (default: 1000)',
+        )
+        parser.add_argument(
+            '--start-after',
+            type=int,
+            default=0,
+            help='Resume from the OrderItem id printed by a previous run',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        
+        batch_size = max(options['batch_size'], 1)
+        last_pk = options['start_after']
+
         # Find OrderItems with None prices
-        items_with_none_price = OrderItem.objects.filter(price__isnull=True)
-        
-        if not items_with_none_price.exists():
+        items_with_none_price = OrderItem.objects.filter(price__isnull=True, pk__gt=last_pk)
+        pending_count = items_with_none_price.count()
+
+        if not pending_count:
             self.stdout.write(
                 self.style.SUCCESS('No OrderItems with None prices found. All good!')
             )
             return
 
-        self.stdout.write(
-            f'Found {items_with_none_price.count()} OrderItems with None prices'
-        )
-
-        fixed_count = 0
-        error_count = 0
-
-        for item in items_with_none_price:
-            try:
-                if item.product and item.product.price:
-                    old_price = item.price
-                    new_price = item.product.price
-                    
-                    if not dry_run:
-                        item.price = new_price
-                        item.save(update_fields=['price'])
-                    
-                    self.stdout.write(
-                        f'OrderItem {item.id}: {old_price} → ₹{new_price} '
-                        f'(Product: {item.product.name})'
-                    )
-                    fixed_count += 1
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'OrderItem {item.id}: Cannot fix - '
-                            f'Product {"missing" if not item.product else "has no price"}'
-                        )
-                    )
-                    error_count += 1
-                    
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f'Error fixing OrderItem {item.id}: {e}'
-                    )
-                )
-                error_count += 1
+        self.stdout.write(f'Found {pending_count} OrderItems with None prices')
 
         if dry_run:
             self.stdout.write(
                 self.style.WARNING(
                     f'\n=== DRY RUN COMPLETE ===\n'
-                    f'Would fix: {fixed_count} items\n'
-                    f'Errors: {error_count} items\n'
+                    f'Would fix: {pending_count} items in batches of {batch_size}\n'
                     f'Run without --dry-run to apply changes'
                 )
             )
-        else:
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'\n=== REPAIR COMPLETE ===\n'
-                    f'Fixed: {fixed_count} items\n'
-                    f'Errors: {error_count} items'
-                )
+            return
+
+        product_price = Product.objects.filter(pk=OuterRef('product_id')).values('price')[:1]
+        fixed_count = 0
+
+        # Each batch is one UPDATE ... SET price = (SELECT price FROM product) in its own
+        # transaction, so an interrupted run can be resumed with --start-after.
+        while True:
+            batch_ids = list(
+                items_with_none_price.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch_ids:
+                break
+
+            with transaction.atomic():
+                fixed_count += OrderItem.objects.filter(
+                    pk__in=batch_ids,
+                    price__isnull=True,
+                ).update(price=Subquery(product_price))
+
+            last_pk = batch_ids[-1]
+            self.stdout.write(f'Fixed {fixed_count}/{pending_count} items (last OrderItem id: {last_pk})')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n=== REPAIR COMPLETE ===\n'
+                f'Fixed: {fixed_count} items'
             )
+        )
 
         # Also check for any remaining issues
         remaining_issues = OrderItem.objects.filter(price__isnull=True)
@@ -91,4 +92,4 @@ class Command(BaseCommand):
                 self.style.WARNING(
                     f'\nWarning: {remaining_issues.count()} OrderItems still have None prices'
                 )
-            )
\ No newline at end of file
+            )
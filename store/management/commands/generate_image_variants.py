@@ -0,0 +1,40 @@
+# store/management/commands/generate_image_variants.py
+# Build responsive variants for product images uploaded before the image pipeline existed
+
+from django.core.management.base import BaseCommand
+from store.images import build_variants
+from store.models import Product, ProductImage
+
+class Command(BaseCommand):
+    help = 'Generate thumb/card/zoom WebP and JPEG variants for product images that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants even for images that already have them',
+        )
+
+    def handle(self, *args, **options):
+        # With --force, variants built this run for each file; rows sharing it reuse them
+        regenerated = {}
+        for model in (Product, ProductImage):
+            images = model.objects.exclude(image='').order_by('pk')
+            if not options['force']:
+                images = images.filter(image_variants={})
+
+            count = 0
+            for instance in images.iterator(chunk_size=100):
+                if options['force']:
+                    # save() would reuse the stored variants of this row or another one sharing the file
+                    name = instance.image.name
+                    if name not in regenerated:
+                        regenerated[name] = build_variants(instance.image)
+                    instance.image_variants = regenerated[name]
+                # save() builds missing variants; update_fields keeps updated_at untouched
+                instance.save(update_fields=['image_variants'])
+                count += 1
+
+            self.stdout.write(
+                self.style.SUCCESS(f'Generated variants for {count} {model._meta.verbose_name_plural}')
+            )
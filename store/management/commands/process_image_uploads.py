@@ -0,0 +1,41 @@
+# store/management/commands/process_image_uploads.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.uploads import process_pending_uploads
+
+class Command(BaseCommand):
+    help = 'Validate, optimize and publish product images staged by the admin panel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Uploads claimed at a time (default: 10)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and check for new uploads every N seconds',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+
+        while True:
+            processed = 0
+            while True:
+                count = process_pending_uploads(limit=batch_size)
+                if not count:
+                    break
+                processed += count
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'Processed {processed} image upload(s)'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
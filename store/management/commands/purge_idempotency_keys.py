@@ -0,0 +1,12 @@
+# store/management/commands/purge_idempotency_keys.py
+
+from django.core.management.base import BaseCommand
+
+from store.idempotency import purge_expired_keys
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency key(s)'))
@@ -0,0 +1,50 @@
+# store/management/commands/release_expired_reservations.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.stock import rebuild_reserved_stock, release_expired_reservations
+
+class Command(BaseCommand):
+    help = 'Give the stock held by pending orders whose reservation expired back to the catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Reservations released per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and release expired reservations every N seconds',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='First recompute every product\'s reserved stock from the reservation rows',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+
+        if options['rebuild']:
+            count = rebuild_reserved_stock()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt reserved stock ({count} product(s) with holds)'))
+
+        while True:
+            released = 0
+            while True:
+                count = release_expired_reservations(limit=batch_size)
+                if not count:
+                    break
+                released += count
+            if released:
+                self.stdout.write(self.style.SUCCESS(f'Released {released} expired reservation(s)'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,139 @@
+# store/management/commands/seed_load_data.py
+# Fill the database with production-scale synthetic data (see store.load_data)
+
+from datetime import date
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from store.load_data import LoadDataGenerator
+
+# Rows generated at --scale 1
+VOLUMES = {
+    'customers': 100000,
+    'technicians': 200,
+    'amc': 2000,
+    'products': 5000,
+    'orders': 500000,
+    'services': 100000,
+}
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, products, orders, service requests, job sheets and ratings for load testing'
+
+    def add_arguments(self, parser):
+        for name, default in VOLUMES.items():
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                help=f'Number of {name} to generate (default: {default} x --scale)',
+            )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply every default volume, e.g. 10 for ~15 million rows (default: 1)',
+        )
+        parser.add_argument(
+            '--images-per-product',
+            type=int,
+            default=3,
+            help='Most additional images per product (default: 3)',
+        )
+        parser.add_argument(
+            '--specs-per-product',
+            type=int,
+            default=4,
+            help='Specifications per product (default: 4)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed; the same seed and --end-date give the same data (default: 0)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            help='Last day with orders, YYYY-MM-DD (default: today)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=730,
+            help='Days of order and service history (default: 730)',
+        )
+        parser.add_argument(
+            '--rating-share',
+            type=float,
+            default=0.35,
+            help='Share of delivered orders and completed services that get rated (default: 0.35)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows written per COPY/INSERT (default: 5000)',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use INSERTs on PostgreSQL too instead of COPY',
+        )
+        parser.add_argument(
+            '--password',
+            type=str,
+            default='loadtest',
+            help='Password of every generated user (default: loadtest)',
+        )
+        parser.add_argument(
+            '--skip-rollups',
+            action='store_true',
+            help='Do not rebuild the analytics rollups for the generated days',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run even though DEBUG is off',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('DEBUG is off; pass --force if this really is a load test database')
+
+        end_date = None
+        if options['end_date']:
+            try:
+                end_date = date.fromisoformat(options['end_date'])
+            except ValueError:
+                raise CommandError('--end-date must be a date in YYYY-MM-DD format')
+
+        volumes = {
+            name: options[name] if options[name] is not None else round(default * options['scale'])
+            for name, default in VOLUMES.items()
+        }
+        volumes['images_per_product'] = max(options['images_per_product'], 0)
+        volumes['specs_per_product'] = max(options['specs_per_product'], 0)
+        self.stdout.write('Generating ' + ', '.join(
+            f'{volumes[name]} {name}' for name in VOLUMES
+        ))
+
+        generator = LoadDataGenerator(
+            volumes,
+            seed=options['seed'],
+            end_date=end_date,
+            days=options['days'],
+            batch_size=options['batch_size'],
+            use_copy=False if options['no_copy'] else None,
+            rating_share=options['rating_share'],
+            password=options['password'],
+            log=self.stdout.write,
+        )
+        generator.run()
+
+        if not options['skip_rollups']:
+            call_command(
+                'refresh_analytics_rollups', since=generator.first_day.isoformat(), stdout=self.stdout
+            )
+        self.stdout.write(self.style.SUCCESS('Load data generated'))
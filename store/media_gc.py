@@ -0,0 +1,136 @@
+# store/media_gc.py - Deferred deletion and garbage collection of product media
+#
+# Requests never delete image files themselves: releasing an image queues a
+# MediaDeletion row, and `manage.py collect_media_garbage` deletes the files
+# in the background, after checking nothing uses them again. Queue rows and
+# files younger than MEDIA_GC_MIN_AGE are left alone: ContentAddressedStorage
+# touches a blob it reuses, and the row of an upload reusing it may not be
+# committed yet.
+# A periodic sweep also diffs the managed media directories against every
+# referenced file, catching anything the queue never saw (queryset
+# updates, crashes between writing a file and saving its row, ...).
+
+import logging
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .images import is_image_referenced, referenced_variant_files, variant_files
+from .models import MediaDeletion, Product, ProductImage, ProductImageUpload
+from .storage import product_image_storage
+
+logger = logging.getLogger(__name__)
+
+# Media directories owned by the store (product images and the upload staging
+# area both live in MEDIA_ROOT); nothing else under MEDIA_ROOT is touched
+MANAGED_DIRECTORIES = ('products', 'staging')
+
+
+def _delete(storage, name):
+    try:
+        storage.delete(name)
+    except OSError:
+        logger.warning('Could not delete media file %s', name, exc_info=True)
+
+
+def _modified_since(storage, name, cutoff):
+    try:
+        return storage.get_modified_time(name) >= cutoff
+    except OSError:
+        return False  # Already gone
+
+
+def process_deletion_queue(limit=100, min_age=None):
+    """Carry out up to `limit` queued deletions; returns the number handled"""
+    if min_age is None:
+        min_age = getattr(settings, 'MEDIA_GC_MIN_AGE', 3600)
+    cutoff = timezone.now() - timedelta(seconds=min_age)
+    with transaction.atomic():
+        deletions = list(
+            MediaDeletion.objects.select_for_update(skip_locked=True).filter(
+                queued_at__lte=cutoff
+            ).order_by('queued_at', 'id')[:limit]
+        )
+        if not deletions:
+            return 0
+        MediaDeletion.objects.filter(pk__in=[deletion.pk for deletion in deletions]).delete()
+
+        for deletion in deletions:
+            if is_image_referenced(deletion.name):
+                continue  # Uploaded again (same content) or shared by another row
+            # Variants are content-addressed too: another original may have produced the same files
+            in_use = referenced_variant_files(deletion.files)
+            for name in [*deletion.files, deletion.name]:
+                # Recently reused by an upload that may still be uncommitted; if it
+                # rolls back, collect_orphans() removes the file later
+                if name in in_use or _modified_since(product_image_storage, name, cutoff):
+                    continue
+                _delete(product_image_storage, name)
+    return len(deletions)
+
+
+def referenced_media(chunk_size=2000):
+    """Every media file name still in use: product images, their variants and staged uploads"""
+    referenced = set()
+    for model in (Product, ProductImage):
+        rows = model.objects.exclude(image='').values_list('image', 'image_variants').order_by()
+        for name, variants in rows.iterator(chunk_size=chunk_size):
+            referenced.add(name)
+            referenced.update(variant_files(variants))
+
+    staged = ProductImageUpload.objects.exclude(staged_file='').values_list('staged_file', flat=True).order_by()
+    referenced.update(staged.iterator(chunk_size=chunk_size))
+    referenced.update(MediaDeletion.objects.values_list('name', flat=True).order_by())
+    return referenced
+
+
+def _walk(storage, directory):
+    try:
+        directories, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from _walk(storage, posixpath.join(directory, name))
+
+
+def collect_orphans(batch_size=500, min_age=None, dry_run=False):
+    """
+    Delete files under MANAGED_DIRECTORIES that nothing references.
+    Files younger than MEDIA_GC_MIN_AGE seconds are left alone, since their
+    row may not be committed yet. Returns (files checked, files deleted).
+    """
+    if min_age is None:
+        min_age = getattr(settings, 'MEDIA_GC_MIN_AGE', 3600)
+    cutoff = timezone.now() - timedelta(seconds=min_age)
+    referenced = referenced_media()
+    storage = default_storage
+
+    checked = deleted = 0
+    batch = []
+
+    def flush():
+        nonlocal deleted
+        for name in batch:
+            # Re-check the database: the file may have been reused since the scan started
+            if storage.get_modified_time(name) >= cutoff or is_image_referenced(name):
+                continue
+            if not dry_run:
+                _delete(storage, name)
+            deleted += 1
+        batch.clear()
+
+    for directory in MANAGED_DIRECTORIES:
+        for name in _walk(storage, directory):
+            checked += 1
+            if name not in referenced:
+                batch.append(name)
+            if len(batch) >= batch_size:
+                flush()
+    flush()
+    return checked, deleted
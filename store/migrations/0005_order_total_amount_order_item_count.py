@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:15
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, IntegerField, DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_totals(apps, schema_editor):
+    Order = apps.get_model('store', 'Order')
+    OrderItem = apps.get_model('store', 'OrderItem')
+
+    items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+    total = items.annotate(
+        total=Sum(F('quantity') * Coalesce(F('price'), F('product__price')))
+    ).values('total')
+    count = items.annotate(count=Sum('quantity')).values('count')
+
+    Order.objects.update(
+        total_amount=Coalesce(
+            Subquery(total, output_field=DecimalField(max_digits=12, decimal_places=2)),
+            Value(Decimal('0.00')),
+        ),
+        item_count=Coalesce(Subquery(count), Value(0), output_field=IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_alter_orderitem_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Total quantity across all items'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,20 @@
 # store/models.py - Fixed with proper error handling
 
 from django.db import models
+from django.db.models import F, Q, Sum, DecimalField, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings # To get the CustomUser model
+from django.utils import timezone
 from decimal import Decimal
 
+from .images import ensure_variants
+from .storage import product_image_storage
+
 class Address(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Indexed as the leading column of address_user_default_idx
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
     street_address = models.CharField(max_length=255)
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=100)
@@ -14,6 +23,10 @@ class Address(models.Model):
 
     class Meta:
         verbose_name_plural = 'Addresses'
+        indexes = [
+            # Checkout and the address book look up a user's default address
+            models.Index(fields=['user', 'is_default'], name='address_user_default_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.name}'s Address in {self.city}"
@@ -34,8 +47,10 @@ class Product(models.Model):
     slug = models.SlugField(max_length=255, unique=True, help_text="A unique, URL-friendly name for the product.")
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    image = models.ImageField(upload_to='products/', help_text="Main product image")  # Main image
+    image = models.ImageField(upload_to='products/', storage=product_image_storage, help_text="Main product image")  # Main image
     stock = models.PositiveIntegerField(default=0)
+    # Units held by pending orders (StockReservation), maintained by store.stock
+    reserved_stock = models.PositiveIntegerField(default=0, editable=False)
     delivery_time_info = models.CharField(max_length=255, help_text="e.g., 'Delivered within 2-3 business days'")
     
     # New fields for enhanced product details
@@ -55,11 +70,44 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Resized copies of `image`, see store.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Full-text search document, maintained by store.search.update_search_vectors
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+            # Trigram indexes back the typo tolerant matching in store.search
+            GinIndex(fields=['name'], name='product_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['brand'], name='product_brand_trgm_idx', opclasses=['gin_trgm_ops']),
+            # Catalog filters and facet counts
+            models.Index(fields=['is_active', 'category', 'price'], name='product_active_cat_price_idx'),
+            models.Index(fields=['is_active', 'brand'], name='product_active_brand_idx'),
+            # Newest-first listings and the sitemap
+            models.Index(fields=['is_active', '-created_at'], name='product_active_created_idx'),
+            # Low stock alerts (admin_panel.stats.LOW_STOCK_THRESHOLD); only the few low rows are indexed
+            models.Index(fields=['stock'], name='product_low_stock_idx', condition=Q(stock__lt=5)),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        """Override save to build the responsive image variants of a new main image"""
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            # reserved_stock only changes through the conditional UPDATEs in store.stock;
+            # writing back a stale in-memory value would lose concurrent reservations
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'reserved_stock'
+            ]
+        replaced = ensure_variants(self)
+        super().save(*args, **kwargs)
+        if replaced:
+            MediaDeletion.queue(*replaced)
     
     def get_features_list(self):
         """Return features as a list"""
@@ -67,6 +115,11 @@ class Product(models.Model):
             return [feature.strip() for feature in self.features.split(',') if feature.strip()]
         return []
     
+    @property
+    def available_stock(self):
+        """Units that can still be ordered: stock not held by pending orders"""
+        return max(self.stock - self.reserved_stock, 0)
+
     @property
     def main_image_url(self):
         """Get the main image URL"""
@@ -86,8 +139,9 @@ class Product(models.Model):
             images.append(main_url)
             seen_urls.add(main_url)
         
-        # Add additional images, avoiding duplicates
-        additional_images = self.additional_images.all().order_by('order', 'id')
+        # Add additional images, avoiding duplicates (identical uploads share one stored file and URL)
+        # Meta.ordering is already ('order', 'id'); no order_by() so a prefetch is reused
+        additional_images = self.additional_images.all()
         for img_obj in additional_images:
             if img_obj.image:
                 img_url = img_obj.image.url
@@ -100,10 +154,11 @@ class Product(models.Model):
 class ProductImage(models.Model):
     """Additional images for products"""
     product = models.ForeignKey(Product, related_name='additional_images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to='products/additional/')
+    image = models.ImageField(upload_to='products/additional/', storage=product_image_storage)
     alt_text = models.CharField(max_length=255, blank=True, help_text="Alternative text for the image")
     is_primary = models.BooleanField(default=False, help_text="Set as primary image")
     order = models.PositiveIntegerField(default=0, help_text="Display order")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     class Meta:
         ordering = ['order', 'id']
@@ -121,18 +176,11 @@ class ProductImage(models.Model):
                 product=self.product, 
                 is_primary=True
             ).exclude(pk=self.pk).update(is_primary=False)
+        replaced = ensure_variants(self)
         super().save(*args, **kwargs)
-    
-    def delete(self, *args, **kwargs):
-        """Override delete to remove image file from filesystem"""
-        if self.image:
-            try:
-                import os
-                if os.path.isfile(self.image.path):
-                    os.remove(self.image.path)
-            except (ValueError, OSError):
-                pass  # Handle cases where file doesn't exist
-        super().delete(*args, **kwargs)
+        if replaced:
+            MediaDeletion.queue(*replaced)
+
 
 class ProductSpecification(models.Model):
     """Technical specifications for products"""
@@ -144,10 +192,175 @@ class ProductSpecification(models.Model):
     class Meta:
         ordering = ['order', 'name']
         unique_together = ['product', 'name']
+        indexes = [
+            # spec=Name:Value filters and the specification facet
+            models.Index(fields=['name', 'value'], name='productspec_name_value_idx'),
+        ]
     
     def __str__(self):
         return f"{self.product.name} - {self.name}: {self.value}"
 
+class ProductImageUpload(models.Model):
+    """
+    An image uploaded through the admin panel, waiting in the staging area
+    until `manage.py process_image_uploads` turns it into the product's main
+    image or a ProductImage (see store.uploads)
+    """
+    MAIN = 'MAIN'
+    ADDITIONAL = 'ADDITIONAL'
+    TARGET_CHOICES = (
+        (MAIN, 'Main image'),
+        (ADDITIONAL, 'Additional image'),
+    )
+
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+
+    product = models.ForeignKey(Product, related_name='image_uploads', on_delete=models.CASCADE)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    staged_file = models.FileField(upload_to='staging/products/', blank=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    alt_text = models.CharField(max_length=255, blank=True)
+    order = models.PositiveIntegerField(default=0)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    product_image = models.ForeignKey(ProductImage, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='imageupload_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_target_display()} for product #{self.product_id} ({self.status})"
+
+class MediaDeletion(models.Model):
+    """
+    A stored product image (plus its variant files) that lost its last
+    reference. Deleted by `manage.py collect_media_garbage` unless a product
+    uses the file again by then; queued in the same transaction as the
+    change that released it.
+    """
+    name = models.CharField(max_length=255)
+    files = models.JSONField(default=list, blank=True, help_text="Variant files deleted along with it")
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['queued_at', 'id']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def queue(cls, name, files=()):
+        if name:
+            cls.objects.create(name=name, files=list(files))
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a create request sent with an Idempotency-Key header,
+    replayed when the client retries it (see store.idempotency)
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=100)
+    request_hash = models.CharField(max_length=64)
+    # Null while the first request is still running
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ['user', 'key']
+
+    def __str__(self):
+        return f"{self.key} ({self.endpoint})"
+
+class CatalogVersion(models.Model):
+    """
+    Counter bumped whenever a public catalog (products, service categories)
+    changes. Used to build ETags without re-reading the catalog itself.
+    """
+    PRODUCTS = 'products'
+    SERVICES = 'services'
+
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def current(cls, name):
+        """Return (version, updated_at) for a catalog, creating its row on first use"""
+        row, _ = cls.objects.get_or_create(name=name)
+        return row.version, row.updated_at
+
+    @classmethod
+    def bump(cls, name):
+        """Invalidate every validator issued for the catalog"""
+        updated = cls.objects.filter(name=name).update(
+            version=F('version') + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.get_or_create(name=name)
+
+class OrderQuerySet(models.QuerySet):
+    """Queryset helpers for working with order totals in SQL"""
+
+    def with_computed_totals(self):
+        """Annotate totals calculated from the item rows (used to audit the stored totals)"""
+        return self.annotate(
+            computed_total=Coalesce(
+                Sum(OrderItem.line_total_expression('items__')),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            computed_item_count=Coalesce(Sum('items__quantity'), Value(0), output_field=IntegerField()),
+        )
+
+    def refresh_totals(self):
+        """Recalculate the stored total_amount/item_count of every order in one UPDATE"""
+        items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+        total = items.annotate(
+            total=Sum(OrderItem.line_total_expression())
+        ).values('total')
+        count = items.annotate(count=Sum('quantity')).values('count')
+
+        return self.update(
+            total_amount=Coalesce(
+                Subquery(total, output_field=DecimalField(max_digits=12, decimal_places=2)),
+                Value(Decimal('0.00')),
+            ),
+            item_count=Coalesce(Subquery(count), Value(0), output_field=IntegerField()),
+        )
+
+    def with_rating_status(self):
+        """Annotate has_rating: whether the customer already rated the technician for this order"""
+        # Import here to avoid circular imports
+        from services.models import TechnicianRating
+
+        return self.annotate(
+            has_rating=Exists(TechnicianRating.objects.filter(
+                order=OuterRef('pk'),
+                customer=OuterRef('customer'),
+            ))
+        )
+
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('PENDING', 'Pending'),
@@ -157,29 +370,49 @@ class Order(models.Model):
         ('CANCELLED', 'Cancelled'),
     )
 
-    customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+    # customer and technician are indexed as the leading columns of
+    # order_customer_date_idx and order_technician_status_idx
+    customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, db_index=False)
     # MAKE SURE THIS FIELD EXISTS
-    technician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_orders', limit_choices_to={'role': 'TECHNICIAN'})
+    technician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_orders', limit_choices_to={'role': 'TECHNICIAN'}, db_index=False)
     order_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     shipping_address = models.ForeignKey(Address, on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Denormalized totals - kept in sync by OrderItem.save()/delete()
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), editable=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False, help_text="Total quantity across all items")
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Customer order history, newest first
+            models.Index(fields=['customer', '-order_date'], name='order_customer_date_idx'),
+            # Technician task list and completion counts
+            models.Index(fields=['technician', 'status'], name='order_technician_status_idx'),
+            # Admin order list: by status, and everything newest first (also the daily rollups)
+            models.Index(fields=['status', '-order_date'], name='order_status_date_idx'),
+            models.Index(fields=['-order_date'], name='order_date_idx'),
+            # Orders still waiting for a technician
+            models.Index(fields=['-order_date'], name='order_unassigned_idx', condition=Q(technician__isnull=True)),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} by {self.customer.name if self.customer else 'Guest'}"
 
-    @property
-    def total_amount(self):
-        """Calculate total amount with proper error handling"""
-        try:
-            total = Decimal('0.00')
-            for item in self.items.all():
-                item_total = item.get_total_item_price()
-                if item_total is not None:
-                    total += item_total
-            return total
-        except Exception as e:
-
-            return Decimal('0.00')
+    def refresh_totals(self):
+        """Recalculate total_amount/item_count from the item rows and store them"""
+        totals = self.items.aggregate(
+            total=Sum(OrderItem.line_total_expression(), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            count=Sum('quantity'),
+        )
+        self.total_amount = totals['total'] or Decimal('0.00')
+        self.item_count = totals['count'] or 0
+        Order.objects.filter(pk=self.pk).update(
+            total_amount=self.total_amount,
+            item_count=self.item_count,
+        )
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
@@ -190,33 +423,54 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.quantity} of {self.product.name}"
 
-    def get_total_item_price(self):
-        """Calculate total item price with proper error handling"""
-        try:
-            # Use the stored price from order time, fallback to current product price
-            item_price = self.price
-            if item_price is None:
-                if self.product and self.product.price:
-                    item_price = self.product.price
-                    # Update the stored price for future reference
-                    self.price = item_price
-                    self.save(update_fields=['price'])
-                else:
-
-                    return Decimal('0.00')
-            
-            if self.quantity and item_price:
-                return Decimal(str(self.quantity)) * Decimal(str(item_price))
-            else:
-
-                return Decimal('0.00')
-                
-        except Exception as e:
+    @staticmethod
+    def line_total_expression(prefix=''):
+        """SQL expression for quantity * price, falling back to the current product price"""
+        return F(f'{prefix}quantity') * Coalesce(F(f'{prefix}price'), F(f'{prefix}product__price'))
 
+    @property
+    def unit_price(self):
+        """Price at time of order, falling back to the current product price (no writes)"""
+        if self.price is not None:
+            return self.price
+        if self.product_id and self.product.price is not None:
+            return self.product.price
+        return Decimal('0.00')
+
+    def get_total_item_price(self):
+        """Calculate total item price - read only, legacy None prices are fixed by fix_order_prices"""
+        if not self.quantity:
             return Decimal('0.00')
+        return Decimal(self.quantity) * self.unit_price
     
     def save(self, *args, **kwargs):
         """Override save to ensure price is set"""
         if self.price is None and self.product:
             self.price = self.product.price
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+        self.order.refresh_totals()
+
+    def delete(self, *args, **kwargs):
+        """Override delete to keep the order totals in sync"""
+        order = self.order
+        result = super().delete(*args, **kwargs)
+        order.refresh_totals()
+        return result
+
+class StockReservation(models.Model):
+    """Stock held for a PENDING order until expires_at (see store.stock)"""
+    order = models.ForeignKey(Order, related_name='stock_reservations', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['order', 'product']
+        indexes = [
+            # Expiry sweep (store.stock.release_expired_reservations)
+            models.Index(fields=['expires_at'], name='reservation_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x product #{self.product_id} for order #{self.order_id}"
@@ -0,0 +1,119 @@
+# store/query_plans.py - EXPLAIN check for the indexes behind the hot queries
+#
+# Each entry mirrors a filter/ordering used by the views (store/views.py,
+# store/technician_views.py, services/views.py, admin_panel/views.py) and
+# names the index declared for it in Meta.indexes. `manage.py
+# check_query_plans` runs EXPLAIN on each one and fails when the plan does
+# not mention the index, e.g. after a query is changed so it no longer
+# matches the index's columns or its partial-index condition.
+#
+# On PostgreSQL sequential scans are disabled for the check
+# (SET LOCAL enable_seqscan = off): on a small or empty database a seq scan
+# is always cheapest, so the question asked is "can this index serve the
+# query", not "is the table big enough yet".
+
+from django.db import connection, transaction
+
+from services.models import JobSheet, ServiceRequest, TechnicianRating
+
+from .models import Address, Order, Product
+
+# Any id will do, the plan does not depend on the row existing
+SAMPLE_ID = 0
+PAGE = 20
+
+HOT_QUERIES = [
+    (
+        'Customer order history',
+        'order_customer_date_idx',
+        lambda: Order.objects.filter(customer_id=SAMPLE_ID).order_by('-order_date'),
+    ),
+    (
+        'Technician orders by status',
+        'order_technician_status_idx',
+        lambda: Order.objects.filter(technician_id=SAMPLE_ID, status='DELIVERED'),
+    ),
+    (
+        'Admin orders filtered by status',
+        'order_status_date_idx',
+        lambda: Order.objects.filter(status='PENDING').order_by('-order_date')[:PAGE],
+    ),
+    (
+        'Admin orders, newest first',
+        'order_date_idx',
+        lambda: Order.objects.order_by('-order_date')[:PAGE],
+    ),
+    (
+        'Unassigned orders',
+        'order_unassigned_idx',
+        lambda: Order.objects.filter(technician__isnull=True).order_by('-order_date')[:PAGE],
+    ),
+    (
+        'Customer service history',
+        'service_customer_date_idx',
+        lambda: ServiceRequest.objects.filter(customer_id=SAMPLE_ID).order_by('-request_date'),
+    ),
+    (
+        'Technician services by status',
+        'service_technician_status_idx',
+        lambda: ServiceRequest.objects.filter(technician_id=SAMPLE_ID, status='COMPLETED'),
+    ),
+    (
+        'Admin services filtered by status',
+        'service_status_date_idx',
+        lambda: ServiceRequest.objects.filter(status='SUBMITTED').order_by('-request_date')[:PAGE],
+    ),
+    (
+        'Admin services, newest first',
+        'service_date_idx',
+        lambda: ServiceRequest.objects.order_by('-request_date')[:PAGE],
+    ),
+    (
+        'Unassigned service requests',
+        'service_unassigned_idx',
+        lambda: ServiceRequest.objects.filter(technician__isnull=True).order_by('-request_date')[:PAGE],
+    ),
+    (
+        'Active products, newest first',
+        'product_active_created_idx',
+        lambda: Product.objects.filter(is_active=True).order_by('-created_at')[:PAGE],
+    ),
+    (
+        'Low stock products',
+        'product_low_stock_idx',
+        lambda: Product.objects.filter(stock__lt=5, stock__gt=0).order_by(),
+    ),
+    (
+        'Default address',
+        'address_user_default_idx',
+        lambda: Address.objects.filter(user_id=SAMPLE_ID, is_default=True),
+    ),
+    (
+        'Technician ratings',
+        'rating_technician_created_idx',
+        lambda: TechnicianRating.objects.filter(technician_id=SAMPLE_ID).order_by('-created_at'),
+    ),
+    (
+        'Job sheets by approval status',
+        'jobsheet_approval_idx',
+        lambda: JobSheet.objects.filter(approval_status='PENDING').order_by('-created_at')[:PAGE],
+    ),
+]
+
+
+def explain(queryset):
+    """EXPLAIN output for a queryset, with sequential scans disabled on PostgreSQL"""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def check_query_plans():
+    """[(label, index, uses_index, plan)] for every hot query"""
+    results = []
+    for label, index, build_queryset in HOT_QUERIES:
+        plan = explain(build_queryset())
+        results.append((label, index, index in plan, plan))
+    return results
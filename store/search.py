@@ -0,0 +1,76 @@
+# store/search.py - Ranked, typo tolerant product search (PostgreSQL full-text + trigram)
+#
+# Every product keeps a weighted tsvector in Product.search_vector:
+#   A name, B brand/model number, C features/specifications, D description
+# It is rebuilt by the store signals whenever a product or one of its
+# specifications changes. Typos are handled by trigram word similarity on
+# name and brand; both paths are backed by GIN indexes.
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+)
+from django.db import connection
+from django.db.models import F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Greatest
+
+from .models import Product, ProductSpecification
+
+SEARCH_CONFIG = 'english'
+
+
+def product_search_vector():
+    """Expression building a product's search document (usable in update())"""
+    specifications = ProductSpecification.objects.filter(
+        product=OuterRef('pk')
+    ).order_by().values('product').annotate(
+        text=StringAgg(Concat('name', Value(' '), 'value'), delimiter=' ')
+    ).values('text')
+
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('brand', 'model_number', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('features', Coalesce(Subquery(specifications), Value(''), output_field=TextField()), weight='C', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(queryset=None):
+    """Rebuild the search document of the given products (all by default) in one UPDATE"""
+    if connection.vendor != 'postgresql':
+        return 0
+    if queryset is None:
+        queryset = Product.objects.all()
+    return queryset.update(search_vector=product_search_vector())
+
+
+def search_products(queryset, query):
+    """
+    Filter a product queryset down to matches for `query`, best first.
+    Accepts web-search syntax ("quoted phrases", -exclusions, or).
+    """
+    query = query.strip()
+    if not query:
+        return queryset.none()
+
+    if connection.vendor != 'postgresql':
+        # Development databases without full-text support
+        return queryset.filter(
+            Q(name__icontains=query) |
+            Q(brand__icontains=query) |
+            Q(model_number__icontains=query) |
+            Q(description__icontains=query)
+        ).order_by('-created_at')
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.annotate(
+        rank=SearchRank(F('search_vector'), search_query),
+        similarity=Greatest(
+            TrigramWordSimilarity(query, 'name'),
+            TrigramWordSimilarity(query, 'brand'),
+        ),
+    ).filter(
+        Q(search_vector=search_query) |
+        Q(name__trigram_word_similar=query) |
+        Q(brand__trigram_word_similar=query)
+    ).order_by('-rank', '-similarity', '-id')
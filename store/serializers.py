@@ -1,6 +1,20 @@
 # store/serializers.py - Updated with better can_rate logic
 from rest_framework import serializers
+from django.utils.text import Truncator
 from .models import Product, ProductCategory, ProductImage, ProductSpecification, Address, Order, OrderItem
+from .images import variant_urls
+
+
+def image_variant_urls(serializer, field_file, variants):
+    """Responsive variants of an image field as URLs (absolute when a request is in context)"""
+    request = serializer.context.get('request')
+
+    def build_url(path):
+        url = field_file.storage.url(path)
+        return request.build_absolute_uri(url) if request else url
+
+    return variant_urls(variants, build_url)
+
 
 class ProductCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,15 +22,40 @@ class ProductCategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug']
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'order']
+        fields = ['id', 'image', 'image_variants', 'alt_text', 'is_primary', 'order']
+
+    def get_image_variants(self, obj):
+        return image_variant_urls(self, obj.image, obj.image_variants)
 
 class ProductSpecificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductSpecification
         fields = ['id', 'name', 'value', 'order']
 
+class ProductCardSerializer(serializers.ModelSerializer):
+    """Lightweight product representation for listing pages"""
+    category = ProductCategorySerializer(read_only=True)
+    short_description = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
+    available_stock = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'name', 'slug', 'short_description', 'price', 'image', 'image_variants',
+            'category', 'brand', 'stock', 'available_stock', 'is_featured'
+        ]
+
+    def get_short_description(self, obj):
+        return obj.meta_description or Truncator(obj.description).chars(160)
+
+    def get_image_variants(self, obj):
+        return image_variant_urls(self, obj.image, obj.image_variants)
+
 class ProductSerializer(serializers.ModelSerializer):
     # To show the category name instead of just its ID
     category = ProductCategorySerializer(read_only=True)
@@ -24,12 +63,15 @@ class ProductSerializer(serializers.ModelSerializer):
     specifications = ProductSpecificationSerializer(many=True, read_only=True)
     features_list = serializers.SerializerMethodField()
     all_images = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
+    # Stock not held by pending orders
+    available_stock = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Product
         fields = [
-            'id', 'name', 'slug', 'description', 'price', 'image', 'category', 
-            'stock', 'delivery_time_info', 'brand', 'model_number', 'weight', 
+            'id', 'name', 'slug', 'description', 'price', 'image', 'image_variants', 'category', 
+            'stock', 'available_stock', 'delivery_time_info', 'brand', 'model_number', 'weight', 
             'dimensions', 'warranty_period', 'features', 'features_list', 
             'is_featured', 'is_active', 'additional_images', 'specifications',
             'all_images', 'created_at', 'updated_at'
@@ -42,6 +84,9 @@ class ProductSerializer(serializers.ModelSerializer):
         """Return all images avoiding duplicates - uses the fixed model property"""
         return obj.all_images
 
+    def get_image_variants(self, obj):
+        return image_variant_urls(self, obj.image, obj.image_variants)
+
 class ProductDetailSerializer(ProductSerializer):
     """Extended serializer for product detail view with all related data"""
     
@@ -60,7 +105,7 @@ class ProductDetailSerializer(ProductSerializer):
                 'Brand': data.get('brand', 'TechVerse'),
                 'Model': data.get('model_number', data.get('name', '')),
                 'Warranty': data.get('warranty_period', '1 Year'),
-                'Stock': str(data.get('stock', 0)) + ' units'
+                'Stock': str(data.get('available_stock', 0)) + ' units'
             }
         
         # Add default features if none exist
@@ -110,10 +155,17 @@ class AddressCreateUpdateSerializer(serializers.ModelSerializer):
 class OrderItemSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_image = serializers.SerializerMethodField()
+    product_image_variants = serializers.SerializerMethodField()
+    price = serializers.DecimalField(source='unit_price', max_digits=10, decimal_places=2, read_only=True)
     
     class Meta:
         model = OrderItem
-        fields = ['id', 'product_name', 'product_image', 'quantity', 'price']
+        fields = ['id', 'product_name', 'product_image', 'product_image_variants', 'quantity', 'price']
+
+    def get_product_image_variants(self, obj):
+        if not obj.product:
+            return None
+        return image_variant_urls(self, obj.product.image, obj.product.image_variants)
     
     def get_product_image(self, obj):
         """Get the product image URL"""
@@ -136,6 +188,7 @@ class OrderSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     customer_phone = serializers.CharField(source='customer.phone', read_only=True)
     customer_email = serializers.CharField(source='customer.email', read_only=True)
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False)
     can_rate = serializers.SerializerMethodField()
     
     class Meta:
@@ -150,21 +203,24 @@ class OrderSerializer(serializers.ModelSerializer):
     def get_can_rate(self, obj):
         """Check if user can rate this order"""
         try:
-            # Import here to avoid circular imports
-            from services.models import TechnicianRating
-            
             # User can rate if:
             # 1. Order is delivered
             # 2. Has a technician assigned
             # 3. No rating exists yet for this order by this customer
-            return (
-                obj.status == 'DELIVERED' and 
-                obj.technician is not None and
-                not TechnicianRating.objects.filter(
-                    order=obj, 
-                    customer=obj.customer
-                ).exists()
-            )
+            if obj.status != 'DELIVERED' or obj.technician_id is None:
+                return False
+
+            # List views annotate has_rating via Order.objects.with_rating_status()
+            if hasattr(obj, 'has_rating'):
+                return not obj.has_rating
+
+            # Import here to avoid circular imports
+            from services.models import TechnicianRating
+
+            return not TechnicianRating.objects.filter(
+                order=obj,
+                customer_id=obj.customer_id
+            ).exists()
         except Exception as e:
 
             return False
\ No newline at end of file
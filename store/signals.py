@@ -0,0 +1,68 @@
+# store/signals.py - Keep catalog validators, cached payloads and search vectors in step with product changes; queue deleted images for the media GC; release the stock held by deleted orders
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .images import variant_files
+from .models import CatalogVersion, MediaDeletion, Order, Product, ProductCategory, ProductImage, ProductSpecification
+from .caching import bump_catalog_version, invalidate_products
+from .search import update_search_vectors
+from .stock import release_order
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductCategory)
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductSpecification)
+def bump_products_version(sender, **kwargs):
+    bump_catalog_version(CatalogVersion.PRODUCTS)
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_slug(sender, instance, update_fields=None, **kwargs):
+    # A renamed product must also drop the payloads cached under its old slug
+    instance._previous_slug = None
+    if instance.pk and (update_fields is None or 'slug' in update_fields):
+        instance._previous_slug = Product.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    invalidate_products([instance.slug, getattr(instance, '_previous_slug', None)])
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductSpecification)
+def invalidate_product_of_related(sender, instance, **kwargs):
+    invalidate_products(Product.objects.filter(pk=instance.product_id).values_list('slug', flat=True))
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+def invalidate_category_products(sender, instance, **kwargs):
+    # Every product embeds its category
+    invalidate_products(instance.products.values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_search_vector(sender, instance, **kwargs):
+    update_search_vectors(Product.objects.filter(pk=instance.pk))
+
+
+@receiver([post_save, post_delete], sender=ProductSpecification)
+def refresh_search_vector_of_specification(sender, instance, **kwargs):
+    update_search_vectors(Product.objects.filter(pk=instance.product_id))
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=ProductImage)
+def queue_image_deletion(sender, instance, **kwargs):
+    # Also sent for cascades (category -> products -> images) that skip delete();
+    # the media GC removes the file later, unless another row still uses it
+    if instance.image:
+        MediaDeletion.queue(instance.image.name, variant_files(instance.image_variants))
+
+
+@receiver(pre_delete, sender=Order)
+def release_deleted_order_stock(sender, instance, **kwargs):
+    # Reservation rows go with the order (cascade); give their units back first
+    release_order(instance)
@@ -0,0 +1,151 @@
+# store/stock.py - The only place product stock and reservations change
+#
+# Each line is applied as a conditional UPDATE:
+#   UPDATE store_product SET stock = stock - n WHERE id = ... AND stock - reserved_stock >= n
+# so concurrent checkouts never read-modify-write the same row in Python and
+# can't oversell. All lines of an order are applied in one transaction, in
+# product id order (a stable lock order, no deadlocks between two orders);
+# a shortfall on any line raises InsufficientStock and rolls back the rest.
+#
+# Pending orders hold their units for STOCK_RESERVATION_TTL seconds: a
+# StockReservation row per product plus Product.reserved_stock, the running
+# total the catalog reads (available = stock - reserved_stock) without
+# looking at orders. Expired holds are released by
+# `manage.py release_expired_reservations`.
+#
+# update() skips the post_save signals, so the catalog caches are
+# invalidated here.
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .caching import bump_catalog_version, invalidate_products
+from .models import CatalogVersion, Product, StockReservation
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(f'Only {product.available_stock} items available in stock for {product.name}')
+
+
+def order_quantities(order):
+    """{product_id: quantity} over an order's items (a product may appear on several lines)"""
+    rows = order.items.values('product').annotate(quantity=Sum('quantity')).order_by('product')
+    return {row['product']: row['quantity'] for row in rows}
+
+
+def _changed(product_ids):
+    bump_catalog_version(CatalogVersion.PRODUCTS)
+    invalidate_products(Product.objects.filter(pk__in=product_ids).values_list('slug', flat=True))
+
+
+def _apply_if_available(quantities, **changes):
+    """Apply `changes(quantity)` to each product with at least that many unreserved units"""
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        updated = Product.objects.alias(
+            available=F('stock') - F('reserved_stock')
+        ).filter(pk=product_id, available__gte=quantity).update(
+            **{field: change(quantity) for field, change in changes.items()}
+        )
+        if not updated:
+            raise InsufficientStock(
+                Product.objects.only('name', 'stock', 'reserved_stock').get(pk=product_id), quantity
+            )
+    _changed(quantities)
+
+
+@transaction.atomic
+def take_stock(quantities):
+    """Remove {product_id: quantity} of unreserved stock, all or nothing"""
+    _apply_if_available(quantities, stock=lambda quantity: F('stock') - quantity)
+
+
+@transaction.atomic
+def return_stock(quantities):
+    """Put {product_id: quantity} back into stock"""
+    for product_id in sorted(quantities):
+        Product.objects.filter(pk=product_id).update(stock=F('stock') + quantities[product_id])
+    _changed(quantities)
+
+
+@transaction.atomic
+def reserve_order(order, quantities=None):
+    """Hold the order's items for STOCK_RESERVATION_TTL seconds, all or nothing"""
+    if quantities is None:
+        quantities = order_quantities(order)
+    _apply_if_available(quantities, reserved_stock=lambda quantity: F('reserved_stock') + quantity)
+
+    expires_at = timezone.now() + timedelta(seconds=getattr(settings, 'STOCK_RESERVATION_TTL', 900))
+    StockReservation.objects.bulk_create([
+        StockReservation(order=order, product_id=product_id, quantity=quantity, expires_at=expires_at)
+        for product_id, quantity in quantities.items()
+    ])
+
+
+def _release(reservations):
+    held = {}
+    for reservation in reservations:
+        held[reservation.product_id] = held.get(reservation.product_id, 0) + reservation.quantity
+    for product_id in sorted(held):
+        Product.objects.filter(pk=product_id).update(
+            reserved_stock=Greatest(F('reserved_stock') - held[product_id], Value(0))
+        )
+    StockReservation.objects.filter(pk__in=[reservation.pk for reservation in reservations]).delete()
+    if held:
+        _changed(held)
+
+
+@transaction.atomic
+def release_order(order):
+    """Give back whatever the order still holds (cancelled or deleted orders)"""
+    _release(list(order.stock_reservations.select_for_update()))
+
+
+@transaction.atomic
+def confirm_order_stock(order):
+    """Turn the order's hold (or, once expired, free stock) into a stock decrement"""
+    _release(list(order.stock_reservations.select_for_update()))
+    take_stock(order_quantities(order))
+
+
+@transaction.atomic
+def release_expired_reservations(limit=500):
+    """Release one batch of expired holds; returns the number released"""
+    reservations = list(
+        StockReservation.objects.select_for_update(skip_locked=True).filter(
+            expires_at__lte=timezone.now()
+        ).order_by('expires_at')[:limit]
+    )
+    _release(reservations)
+    return len(reservations)
+
+
+@transaction.atomic
+def rebuild_reserved_stock():
+    """Recompute Product.reserved_stock from the reservation rows (repairs drift)"""
+    # Lock the products first, in the checkouts' id order, then count the holds:
+    # a reserve_order or release that touched one of them either committed before
+    # the lock was granted (and its rows are counted) or waits for this transaction
+    affected = list(
+        Product.objects.select_for_update().filter(
+            Q(pk__in=StockReservation.objects.values('product')) | Q(reserved_stock__gt=0)
+        ).order_by('pk').values_list('pk', flat=True)
+    )
+    held = dict(
+        StockReservation.objects.filter(product__in=affected).values('product').annotate(
+            total=Sum('quantity')
+        ).values_list('product', 'total')
+    )
+    Product.objects.filter(pk__in=affected).exclude(pk__in=held).update(reserved_stock=0)
+    for product_id in sorted(held):
+        Product.objects.filter(pk=product_id).update(reserved_stock=held[product_id])
+    _changed(affected)
+    return len(held)
@@ -0,0 +1,61 @@
+# store/storage.py - Content-addressed storage for product images
+#
+# Files are named after the SHA-256 of their bytes:
+#   products/blobs/3f/3fa9...c2.jpg
+# so the same photo uploaded twice (as a main image, an additional image or
+# a re-upload during an edit) is stored once, and its variants are shared
+# too. A name never changes content, which lets nginx serve
+# /media/products/blobs/ as immutable.
+#
+# Several rows may point at one file: deletions are queued as MediaDeletion
+# rows and carried out by store.media_gc, which keeps files still in use.
+# Reusing a stored file refreshes its mtime, which tells the GC the file was
+# just handed out again (its new row may not be committed yet).
+
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIRECTORY = 'products/blobs'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def content_name(self, digest, extension):
+        return posixpath.join(BLOB_DIRECTORY, digest[:2], f'{digest}{extension}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+        content.seek(0)
+
+        extension = posixpath.splitext(name)[1].lower()
+        name = self.content_name(digest.hexdigest(), extension)
+        try:
+            os.utime(self.path(name))
+            return name  # Already stored, nothing to write
+        except FileNotFoundError:
+            pass
+
+        saved = super().save(name, content, max_length)
+        if saved != name:
+            # Another process stored the same bytes meanwhile; keep its copy
+            self.delete(saved)
+        return name
+
+    def is_content_addressed(self, name):
+        return name.startswith(BLOB_DIRECTORY + '/')
+
+
+product_image_storage = ContentAddressedStorage()
@@ -4,8 +4,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Avg, Count, Q
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import Avg, Count, F, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from datetime import datetime, timedelta
 from .models import Order, OrderItem
 from .serializers import OrderSerializer
@@ -48,73 +50,125 @@ class TechnicianAssignedOrdersView(APIView):
                 'items': [{
                     'product_name': item.product.name,
                     'quantity': item.quantity,
-                    'price': str(item.price)
+                    'price': str(item.unit_price)
                 } for item in order.items.all()]
             }
             orders_data.append(order_data)
         
         return Response(orders_data)
 
+class TechnicianServicePagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+def technician_service_feed(technician, since=None, statuses=None):
+    """
+    Service requests assigned to a technician, newest first, with the job
+    sheet id and approval status joined in (no per-row job sheet lookups).
+    """
+    services = ServiceRequest.objects.filter(
+        technician=technician
+    ).select_related(
+        'customer', 'service_category', 'issue', 'service_location'
+    ).annotate(
+        job_sheet_pk=F('job_sheet__id'),
+        job_sheet_status=F('job_sheet__approval_status'),
+    ).order_by('-request_date', '-id')
+
+    if since is not None:
+        services = services.filter(request_date__gte=since)
+    if statuses:
+        services = services.filter(status__in=statuses)
+    return services
+
+
+def serialize_technician_service(service):
+    location = service.service_location
+    return {
+        'id': service.id,
+        'customer': {
+            'name': service.customer.name if service.customer else 'Unknown',
+            'phone': service.customer.phone if service.customer else 'N/A',
+            'email': service.customer.email if service.customer else 'N/A',
+        },
+        'service_category': {
+            'name': service.service_category.name
+        },
+        'issue': {
+            'description': service.issue.description
+        } if service.issue else None,
+        'custom_description': service.custom_description,
+        'service_location': {
+            'street_address': location.street_address,
+            'city': location.city,
+            'state': location.state,
+            'pincode': location.pincode,
+        } if location else None,
+        'request_date': service.request_date,
+        'status': service.status,
+        'has_job_sheet': service.job_sheet_pk is not None,
+        'job_sheet_status': service.job_sheet_status,
+        'job_sheet_id': service.job_sheet_pk,
+    }
+
+
+def _parse_since(value):
+    """Accepts an ISO date (start of that day) or an ISO datetime"""
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        since = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def technician_service_feed_response(request, view=None):
+    """
+    Paginated technician service feed shared by the technician dashboard
+    endpoints. Query params: since (date/datetime), status (comma separated),
+    page, page_size.
+    """
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = _parse_since(since)
+        except ValueError:
+            return Response(
+                {'error': 'since must be an ISO date or datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    statuses = [s.strip().upper() for s in request.query_params.get('status', '').split(',') if s.strip()]
+    valid_statuses = {code for code, _ in ServiceRequest.STATUS_CHOICES}
+    invalid = [s for s in statuses if s not in valid_statuses]
+    if invalid:
+        return Response(
+            {'error': f"Invalid status: {', '.join(invalid)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    services = technician_service_feed(request.user, since=since or None, statuses=statuses)
+    paginator = TechnicianServicePagination()
+    page = paginator.paginate_queryset(services, request, view=view)
+    return paginator.get_paginated_response(
+        [serialize_technician_service(service) for service in page]
+    )
+
+
 class TechnicianAssignedServicesView(APIView):
-    """Get service requests assigned to the technician"""
+    """Get service requests assigned to the technician (paginated, see technician_service_feed_response)"""
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
         if request.user.role != 'TECHNICIAN':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        from services.models import JobSheet
-        
-        services = ServiceRequest.objects.filter(
-            technician=request.user
-        ).select_related(
-            'customer', 'service_category', 'issue', 'service_location'
-        ).order_by('-request_date')
-        
-        # Enhanced serializer data with job sheet information
-        services_data = []
-        for service in services:
-            # Check for job sheet
-            try:
-                job_sheet = JobSheet.objects.get(service_request=service)
-                has_job_sheet = True
-                job_sheet_status = job_sheet.approval_status
-                job_sheet_id = job_sheet.id
-            except JobSheet.DoesNotExist:
-                has_job_sheet = False
-                job_sheet_status = None
-                job_sheet_id = None
-            
-            service_data = {
-                'id': service.id,
-                'customer': {
-                    'name': service.customer.name if service.customer else 'Unknown',
-                    'phone': service.customer.phone if service.customer else 'N/A',
-                    'email': service.customer.email if service.customer else 'N/A',
-                },
-                'service_category': {
-                    'name': service.service_category.name
-                },
-                'issue': {
-                    'description': service.issue.description
-                } if service.issue else None,
-                'custom_description': service.custom_description,
-                'service_location': {
-                    'street_address': service.service_location.street_address if service.service_location else '',
-                    'city': service.service_location.city if service.service_location else '',
-                    'state': service.service_location.state if service.service_location else '',
-                    'pincode': service.service_location.pincode if service.service_location else '',
-                } if service.service_location else None,
-                'request_date': service.request_date,
-                'status': service.status,
-                # Job sheet fields - NEW
-                'has_job_sheet': has_job_sheet,
-                'job_sheet_status': job_sheet_status,
-                'job_sheet_id': job_sheet_id,
-            }
-            services_data.append(service_data)
-        
-        return Response(services_data)
+        return technician_service_feed_response(request, view=self)
 
 class TechnicianStatsView(APIView):
     """Get technician statistics"""
@@ -1,3 +1,695 @@
-from django.test import TestCase
+# store/tests.py - Query budgets for the store endpoints
+#
+# Every endpoint is requested against a small fixture and again after the
+# fixture has grown (more orders x items, services with job sheets and
+# ratings, products). The number of queries must not change between the two
+# runs and must stay within the endpoint's budget, so a new N+1 (a lazy FK in
+# a serializer, a per-row exists()) fails the test run. services/tests.py and
+# users/tests.py reuse QueryBudgetTestCase for their URLs and the admin panel.
+#
+# Server-rendered pages whose templates are not part of this tree (the React
+# frontend replaced them) are covered through their POST/redirect paths only.
+# '/' resolves to services' select_service_category, which shadows
+# store's product_list, and the admin panel's product delete route shadows
+# store's delete_product the same way.
+#
+# RequestMetricsTests covers the Server-Timing header and request log of
+# ecom_project.instrumentation, MediaDeletionTests the media GC
+# (store.media_gc), ImageVariantTests generate_image_variants and
+# StockReservationTests the stock holds of pending orders (store.stock),
+# IdempotencyTests the Idempotency-Key handling of checkout (store.idempotency)
+# and CatalogFacetTests the facet counts (store.facets).
 
-# Create your tests here.
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.decorators import api_view
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from services.models import JobSheet, JobSheetMaterial, ServiceCategory, ServiceIssue, ServiceRequest, TechnicianRating
+
+from .idempotency import idempotent
+from .media_gc import process_deletion_queue
+from .models import (
+    Address, CatalogVersion, IdempotencyKey, MediaDeletion, Order, OrderItem, Product, ProductCategory,
+    ProductImage, ProductSpecification, StockReservation,
+)
+from .stock import InsufficientStock, rebuild_reserved_stock, release_expired_reservations, take_stock
+from .storage import product_image_storage
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='techverse-tests-')
+
+
+def sample_image(name='photo.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48), (30, 120, 200)).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class QueryBudgetTestCase(TestCase):
+    """
+    assertQueryBudget() requests a URL at two fixture sizes: SMALL rows of
+    everything, then LARGE. Each seeded row adds a delivered order with
+    ITEMS_PER_ORDER new products (each with an additional image and
+    specifications), a completed service request with an approved job sheet
+    and materials, a rating for each job, plus a user, an address, a product
+    category and a service category with an issue.
+    """
+    SMALL = 2
+    LARGE = 6
+    ITEMS_PER_ORDER = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            'customer@example.com', 'password', name='Customer', phone='9000000001'
+        )
+        cls.technician = User.objects.create_user(
+            'technician@example.com', 'password', name='Technician', phone='9000000002', role='TECHNICIAN'
+        )
+        cls.admin = User.objects.create_superuser('admin@example.com', 'password', name='Admin')
+        cls.address = Address.objects.create(
+            user=cls.customer, street_address='1 Main Road', city='Kochi', state='Kerala',
+            pincode='682001', is_default=True,
+        )
+        cls.category = ProductCategory.objects.create(name='Laptops', slug='laptops')
+        cls.service_category = ServiceCategory.objects.create(name='Laptop Repair')
+        cls.issue = ServiceIssue.objects.create(
+            category=cls.service_category, description='Does not boot', price=Decimal('499.00')
+        )
+        # A live site has these rows already; creating them on first use is not per-request work
+        for name in (CatalogVersion.PRODUCTS, CatalogVersion.SERVICES):
+            CatalogVersion.current(name)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # No request log line (ecom_project.instrumentation) for every test request
+        request_logger = logging.getLogger('ecom_project.instrumentation')
+        cls.addClassCleanup(request_logger.setLevel, request_logger.level)
+        request_logger.setLevel(logging.ERROR)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.seeded = 0
+
+    # Fixture
+
+    def create_product(self, **fields):
+        self.seeded += 1
+        number = self.seeded
+        product = Product.objects.create(**{
+            'category': self.category,
+            'name': f'Laptop {number}',
+            'slug': f'laptop-{number}',
+            'description': 'A laptop',
+            'price': Decimal('1000.00'),
+            'image': sample_image(),
+            'stock': 50,
+            'delivery_time_info': 'Delivered within 2-3 business days',
+            'brand': 'Dell',
+            **fields,
+        })
+        ProductImage.objects.create(product=product, image=sample_image(), alt_text='Side view')
+        ProductSpecification.objects.create(product=product, name='RAM', value='16GB')
+        ProductSpecification.objects.create(product=product, name='Storage', value='512GB')
+        return product
+
+    def create_order(self, status='DELIVERED', technician=True, products=None):
+        order = Order.objects.create(
+            customer=self.customer,
+            technician=self.technician if technician else None,
+            status=status,
+            shipping_address=self.address,
+        )
+        for product in products or [self.create_product() for _ in range(self.ITEMS_PER_ORDER)]:
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+        return order
+
+    def create_service(self, status='COMPLETED', approval_status='APPROVED', job_sheet=True):
+        service = ServiceRequest.objects.create(
+            customer=self.customer,
+            technician=self.technician,
+            service_category=self.service_category,
+            issue=self.issue,
+            service_location=self.address,
+            status=status,
+        )
+        if job_sheet:
+            sheet = JobSheet.objects.create(
+                service_request=service,
+                customer_name=self.customer.name,
+                customer_contact=self.customer.phone,
+                service_address=str(self.address),
+                equipment_type='Laptop',
+                problem_description='Does not boot',
+                work_performed='Replaced the SSD',
+                date_of_service=date(2026, 1, 5),
+                start_time=time(10, 0),
+                finish_time=time(11, 30),
+                approval_status=approval_status,
+                created_by=self.technician,
+            )
+            for description in ('SSD', 'Thermal paste'):
+                JobSheetMaterial.objects.create(
+                    job_sheet=sheet, date_used=date(2026, 1, 5), item_description=description,
+                    quantity=Decimal('1.00'), unit_cost=Decimal('100.00'),
+                )
+        return service
+
+    def seed(self, count):
+        for _ in range(count):
+            number = self.seeded + 1
+            User.objects.create_user(f'customer{number}@example.com', 'password', name=f'Customer {number}')
+            Address.objects.create(
+                user=self.customer, street_address=f'{number} Side Street', city='Kochi', state='Kerala',
+                pincode='682002',
+            )
+            ProductCategory.objects.create(name=f'Category {number}', slug=f'category-{number}')
+            category = ServiceCategory.objects.create(name=f'Service {number}')
+            ServiceIssue.objects.create(category=category, description='Other', price=Decimal('299.00'))
+
+            order = self.create_order()
+            TechnicianRating.objects.create(
+                technician=self.technician, customer=self.customer, order=order, rating=5, comment='Quick'
+            )
+            service = self.create_service()
+            TechnicianRating.objects.create(
+                technician=self.technician, customer=self.customer, service_request=service, rating=4
+            )
+
+    # Measurement
+
+    def count_queries(self, user, method, path, data=None, form=None, status_code=200):
+        if callable(path):
+            path = path()
+        if callable(data):
+            data = data()
+        if callable(form):
+            form = form()
+        if callable(user):
+            user = user()
+        if user is None:
+            self.client.cookies.clear()
+        else:
+            self.client.force_login(user)
+        # Cold caches: the budget covers the work a cache miss does
+        cache.clear()
+
+        kwargs = {}
+        if data is not None:
+            kwargs = {'data': json.dumps(data), 'content_type': 'application/json'}
+        elif form is not None:
+            kwargs = {'data': form}
+        # on_commit work (cache invalidation, queued media deletions) is part of the request
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(path, **kwargs)
+        self.assertEqual(
+            response.status_code, status_code,
+            f'{method.upper()} {path}: {response.status_code} {response.content[:300]!r}'
+        )
+        return len(queries)
+
+    def assertQueryBudget(self, budget, user, method, path, data=None, form=None, status_code=200):
+        """
+        `data` is sent as JSON, `form` form-encoded. `user`, `path`, `data` and
+        `form` may be callables; they are called (outside the measurement)
+        before each request, to create the row a write endpoint consumes. The
+        request is made once beforehand so rows created on first use (e.g.
+        CatalogVersion) and process-wide caches (the current Site) are not
+        counted.
+        """
+        self.count_queries(user, method, path, data, form, status_code)
+        self.seed(self.SMALL)
+        small = self.count_queries(user, method, path, data, form, status_code)
+        self.seed(self.LARGE - self.SMALL)
+        large = self.count_queries(user, method, path, data, form, status_code)
+
+        label = f'{method.upper()} {path() if callable(path) else path}'
+        self.assertEqual(small, large, f'{label}: query count grows with the data ({small} -> {large})')
+        self.assertLessEqual(large, budget, f'{label}: {large} queries, budget is {budget}')
+
+
+class StorePageQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_buy_now(self):
+        product = self.create_product()
+        self.assertQueryBudget(17, self.customer, 'get', f'/buy-now/{product.slug}/', status_code=302)
+
+    def test_select_address(self):
+        order = self.create_order(status='PENDING', technician=False)
+        self.assertQueryBudget(
+            6, self.customer, 'post', f'/select-address/{order.id}/',
+            form={'address': self.address.id}, status_code=302,
+        )
+
+    def test_confirm_order(self):
+        product = self.create_product()
+        self.assertQueryBudget(
+            16, self.customer, 'get',
+            lambda: f'/confirm-order/{self.create_order(status="PENDING", products=[product]).id}/',
+            status_code=302,
+        )
+
+    def test_update_order_status(self):
+        self.assertQueryBudget(
+            5, self.technician, 'post',
+            lambda: f'/update-order-status/{self.create_order(status="SHIPPED").id}/',
+            status_code=302,
+        )
+
+
+class StoreAPIQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_product_list(self):
+        self.assertQueryBudget(3, None, 'get', '/api/products/')
+        self.assertQueryBudget(10, None, 'get', '/api/products/?view=full&facets=true')
+
+    def test_product_search(self):
+        self.assertQueryBudget(9, None, 'get', '/api/products/search/?q=laptop&facets=true')
+
+    def test_product_detail(self):
+        product = self.create_product()
+        self.assertQueryBudget(5, None, 'get', f'/api/products/{product.slug}/')
+
+    def test_address_list(self):
+        self.assertQueryBudget(3, self.customer, 'get', '/api/addresses/')
+
+    def test_address_create(self):
+        self.assertQueryBudget(4, self.customer, 'post', '/api/addresses/create/', data={
+            'street_address': '2 Beach Road', 'city': 'Kochi', 'state': 'Kerala',
+            'pincode': '682002', 'is_default': True,
+        }, status_code=201)
+
+    def test_address_update(self):
+        self.assertQueryBudget(4, self.customer, 'patch', f'/api/addresses/{self.address.id}/update/', data={
+            'city': 'Ernakulam',
+        })
+
+    def test_address_delete(self):
+        self.assertQueryBudget(
+            6, self.customer, 'delete',
+            lambda: f'/api/addresses/{Address.objects.create(user=self.customer, pincode="682003").id}/delete/',
+            status_code=204,
+        )
+
+    def test_order_list(self):
+        self.assertQueryBudget(5, self.customer, 'get', '/api/orders/')
+
+    def test_order_detail(self):
+        order = self.create_order()
+        self.assertQueryBudget(5, self.customer, 'get', f'/api/orders/{order.id}/')
+
+    def test_create_order(self):
+        product = self.create_product()
+        self.assertQueryBudget(20, self.customer, 'post', '/api/orders/create/', data={
+            'product_slug': product.slug, 'address_id': self.address.id, 'quantity': 1,
+        }, status_code=201)
+
+    def test_create_bulk_order(self):
+        products = [self.create_product() for _ in range(self.ITEMS_PER_ORDER)]
+        self.assertQueryBudget(21, self.customer, 'post', '/api/orders/create-bulk/', data={
+            'address_id': self.address.id,
+            'items': [{'product_slug': product.slug, 'quantity': 1} for product in products],
+        }, status_code=201)
+
+    def test_cancel_order(self):
+        self.assertQueryBudget(
+            20, self.customer, 'post',
+            lambda: f'/api/orders/{self.create_order(status="PROCESSING").id}/cancel/',
+        )
+
+
+class TechnicianAPIQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_assigned_orders(self):
+        self.assertQueryBudget(5, self.technician, 'get', '/api/technician/assigned-orders/')
+
+    def test_assigned_services(self):
+        self.assertQueryBudget(4, self.technician, 'get', '/api/technician/assigned-services/')
+
+    def test_stats(self):
+        self.assertQueryBudget(9, self.technician, 'get', '/api/technician/stats/')
+
+    def test_complete_order(self):
+        self.assertQueryBudget(
+            5, self.technician, 'patch',
+            lambda: f'/api/technician/complete-order/{self.create_order(status="SHIPPED").id}/',
+        )
+
+    def test_complete_service(self):
+        self.assertQueryBudget(
+            6, self.technician, 'patch',
+            lambda: f'/api/technician/complete-service/{self.create_service(status="IN_PROGRESS").id}/',
+        )
+
+
+class ProductDeletionQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_delete_product_image(self):
+        self.assertQueryBudget(
+            8, self.admin, 'post',
+            lambda: f'/admin/delete-product-image/{self.create_product().additional_images.get().id}/',
+        )
+
+    def test_delete_product(self):
+        self.assertQueryBudget(
+            22, self.admin, 'post',
+            lambda: f'/admin-panel/products/{self.create_product().id}/delete/',
+            status_code=302,
+        )
+
+
+class RequestMetricsTests(QueryBudgetTestCase):
+
+    def server_timing(self, response):
+        """{metric: parameters} of the Server-Timing header"""
+        metrics = (metric.split(';', 1) for metric in response.headers['Server-Timing'].split(', '))
+        return {metric[0]: metric[1] if len(metric) > 1 else '' for metric in metrics}
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing(self):
+        product = self.create_product()
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/products/{product.slug}/')
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'total', 'db', 'cache', 'render'})
+        self.assertTrue(timing['db'].endswith(f';desc="{len(queries)} queries"'))
+        self.assertEqual(timing['cache'], 'desc="hits=0 misses=2"')
+
+        response = self.client.get(f'/api/products/{product.slug}/')
+        self.assertEqual(self.server_timing(response)['cache'], 'desc="hits=2 misses=0"')
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_server_timing_only_for_staff(self):
+        product = self.create_product()
+        response = self.client.get(f'/api/products/{product.slug}/')
+        self.assertNotIn('Server-Timing', response.headers)
+
+        self.client.force_login(self.customer)
+        response = self.client.get(f'/api/products/{product.slug}/')
+        self.assertNotIn('Server-Timing', response.headers)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(f'/api/products/{product.slug}/')
+        self.assertIn('render', self.server_timing(response))
+
+    def test_request_log(self):
+        self.create_order()
+        self.client.force_login(self.customer)
+        with self.assertLogs('ecom_project.instrumentation', 'INFO') as logs:
+            self.client.get('/api/orders/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertEqual(record['route'], 'api/orders/')
+        self.assertEqual(record['user'], self.customer.pk)
+        self.assertNotIn('top_sql', record)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0, SLOW_REQUEST_TOP_SQL=2)
+    def test_slow_request_log(self):
+        self.create_order()
+        self.client.force_login(self.customer)
+        with self.assertLogs('ecom_project.instrumentation', 'WARNING') as logs:
+            self.client.get('/api/orders/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(record['slow'])
+        self.assertEqual(len(record['top_sql']), 2)
+        self.assertGreaterEqual(record['top_sql'][0]['ms'], record['top_sql'][1]['ms'])
+        self.assertLessEqual(sum(statement['count'] for statement in record['top_sql']), record['queries'])
+
+
+class MediaDeletionTests(QueryBudgetTestCase):
+
+    def age(self, name):
+        """Backdate a stored file past MEDIA_GC_MIN_AGE"""
+        old = (timezone.now() - timedelta(hours=2)).timestamp()
+        os.utime(product_image_storage.path(name), (old, old))
+
+    def queue(self, name, files=()):
+        MediaDeletion.queue(name, files)
+        MediaDeletion.objects.update(queued_at=timezone.now() - timedelta(hours=2))
+
+    def store(self, content):
+        name = product_image_storage.save('photo.png', ContentFile(content))
+        self.age(name)
+        return name
+
+    def test_unused_file_is_deleted(self):
+        name = self.store(b'unused')
+        self.queue(name)
+        self.assertEqual(process_deletion_queue(), 1)
+        self.assertFalse(product_image_storage.exists(name))
+
+    def test_recent_deletions_wait(self):
+        name = self.store(b'recent')
+        MediaDeletion.queue(name)
+        self.assertEqual(process_deletion_queue(), 0)
+        self.assertTrue(product_image_storage.exists(name))
+
+    def test_reused_blob_is_kept(self):
+        name = self.store(b'reused')
+        self.queue(name)
+        # Stored again by an upload whose row is not committed yet
+        self.assertEqual(product_image_storage.save('again.png', ContentFile(b'reused')), name)
+        process_deletion_queue()
+        self.assertTrue(product_image_storage.exists(name))
+
+    def test_variant_files_of_other_rows_are_kept(self):
+        card = self.create_product().image_variants['card']['webp']
+        self.age(card)
+        name = self.store(b'other original')
+        self.queue(name, [card])
+        process_deletion_queue()
+        self.assertFalse(product_image_storage.exists(name))
+        self.assertTrue(product_image_storage.exists(card))
+
+
+class ImageVariantTests(QueryBudgetTestCase):
+
+    def test_force_regenerates_stored_variants(self):
+        product = self.create_product()
+        image = ProductImage.objects.get(product=product)
+        self.assertEqual(image.image_variants['card']['width'], 64)
+        # Stale variants, e.g. built before VARIANT_SIZES changed
+        stale = {**product.image_variants, 'card': {**product.image_variants['card'], 'width': 1}}
+        Product.objects.filter(pk=product.pk).update(image_variants=stale)
+        ProductImage.objects.filter(pk=image.pk).update(image_variants=stale)
+
+        call_command('generate_image_variants', force=True, stdout=StringIO())
+        product.refresh_from_db()
+        image.refresh_from_db()
+        self.assertEqual(product.image_variants['card']['width'], 64)
+        self.assertEqual(image.image_variants['card']['width'], 64)
+
+
+class StockReservationTests(QueryBudgetTestCase):
+
+    def checkout(self, product, quantity):
+        self.client.force_login(self.customer)
+        response = self.client.post('/api/orders/create-bulk/', {
+            'address_id': self.address.id,
+            'items': [{'product_slug': product.slug, 'quantity': quantity}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return Order.objects.get(pk=response.json()['id'])
+
+    def expire(self, order):
+        StockReservation.objects.filter(order=order).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def assertStock(self, product, stock, reserved):
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.reserved_stock), (stock, reserved))
+
+    def test_pending_order_holds_stock(self):
+        product = self.create_product(stock=5)
+        order = self.checkout(product, 2)
+        self.assertStock(product, 5, 2)
+        self.assertEqual(product.available_stock, 3)
+        self.assertEqual(order.stock_reservations.get().quantity, 2)
+
+    def test_expired_holds_are_released(self):
+        product = self.create_product(stock=5)
+        expired, live = self.checkout(product, 2), self.checkout(product, 1)
+        self.expire(expired)
+        self.assertEqual(release_expired_reservations(), 1)
+        self.assertStock(product, 5, 1)
+        self.assertFalse(expired.stock_reservations.exists())
+        self.assertTrue(live.stock_reservations.exists())
+
+    def test_confirm_after_expiry_takes_free_stock(self):
+        product = self.create_product(stock=5)
+        order = self.checkout(product, 2)
+        self.expire(order)
+        release_expired_reservations()
+        self.client.get(f'/confirm-order/{order.id}/')
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'PROCESSING')
+        self.assertStock(product, 3, 0)
+
+    def test_confirm_after_expiry_fails_when_stock_was_sold(self):
+        product = self.create_product(stock=2)
+        order = self.checkout(product, 2)
+        self.expire(order)
+        release_expired_reservations()
+        take_stock({product.id: 1})
+        self.client.get(f'/confirm-order/{order.id}/')
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'PENDING')
+        self.assertStock(product, 1, 0)
+
+    def test_cancel_releases_hold(self):
+        product = self.create_product(stock=5)
+        order = self.checkout(product, 2)
+        response = self.client.post(f'/api/orders/{order.id}/cancel/')
+        self.assertEqual(response.status_code, 200)
+        self.assertStock(product, 5, 0)
+        self.assertFalse(order.stock_reservations.exists())
+
+    def test_delete_releases_hold(self):
+        product = self.create_product(stock=5)
+        self.checkout(product, 2).delete()
+        self.assertStock(product, 5, 0)
+
+    def test_take_stock_refuses_reserved_units(self):
+        product = self.create_product(stock=5)
+        self.checkout(product, 4)
+        with self.assertRaises(InsufficientStock):
+            take_stock({product.id: 2})
+        self.assertStock(product, 5, 4)
+        take_stock({product.id: 1})
+        self.assertStock(product, 4, 4)
+
+    def test_rebuild_repairs_drift(self):
+        held, drifted = self.create_product(stock=5), self.create_product(stock=5)
+        self.checkout(held, 2)
+        Product.objects.update(reserved_stock=3)
+        self.assertEqual(rebuild_reserved_stock(), 1)
+        self.assertStock(held, 5, 2)
+        self.assertStock(drifted, 5, 0)
+
+
+class IdempotencyTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.product = self.create_product(stock=5)
+        self.client.force_login(self.customer)
+
+    def body(self, quantity=1):
+        return json.dumps({
+            'address_id': self.address.id,
+            'items': [{'product_slug': self.product.slug, 'quantity': quantity}],
+        })
+
+    def checkout(self, body, key='checkout-1'):
+        return self.client.post(
+            '/api/orders/create-bulk/', body, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_is_replayed(self):
+        first = self.checkout(self.body())
+        retry = self.checkout(self.body())
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first.headers)
+        self.assertEqual(Order.objects.filter(customer=self.customer).count(), 1)
+
+    def test_different_request_is_rejected(self):
+        self.checkout(self.body(quantity=1))
+        response = self.checkout(self.body(quantity=2))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.filter(customer=self.customer).count(), 1)
+
+    def claim(self, body):
+        """The key as left by a first request that has not finished"""
+        return IdempotencyKey.objects.create(
+            user=self.customer, key='checkout-1', endpoint='api_create_bulk_order',
+            request_hash=hashlib.sha256(body.encode()).hexdigest(),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+    def test_request_in_progress_conflicts(self):
+        body = self.body()
+        self.claim(body)
+        response = self.checkout(body)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.filter(customer=self.customer).exists())
+
+    @override_settings(IDEMPOTENCY_IN_FLIGHT_TIMEOUT=60)
+    def test_abandoned_request_is_taken_over(self):
+        body = self.body()
+        claim = self.claim(body)
+        # Its worker died two minutes ago without releasing the key
+        IdempotencyKey.objects.filter(pk=claim.pk).update(created_at=timezone.now() - timedelta(minutes=2))
+
+        response = self.checkout(body)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+        self.assertEqual(self.checkout(body).headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.filter(customer=self.customer).count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        response = self.checkout(self.body(quantity=10))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        # The same key is free again for the corrected request
+        self.assertEqual(self.checkout(self.body(quantity=2)).status_code, 201)
+
+    def test_key_is_released_when_the_view_raises(self):
+        @api_view(['POST'])
+        @idempotent
+        def failing_view(request):
+            raise RuntimeError('boom')
+
+        request = APIRequestFactory().post('/failing/', {}, format='json', HTTP_IDEMPOTENCY_KEY='failing-1')
+        force_authenticate(request, user=self.customer)
+        with self.assertRaises(RuntimeError):
+            failing_view(request)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class CatalogFacetTests(QueryBudgetTestCase):
+
+    def test_brand_facet_ignores_case(self):
+        self.create_product(brand='Dell')
+        self.create_product(brand='DELL')
+        self.create_product(brand='Lenovo')
+        facets = self.client.get('/api/products/?facets=true').json()['facets']
+        self.assertEqual(facets['brand'], [
+            {'value': 'dell', 'label': 'DELL', 'count': 2},
+            {'value': 'lenovo', 'label': 'Lenovo', 'count': 1},
+        ])
+
+        response = self.client.get('/api/products/', {'brand': facets['brand'][0]['value']})
+        self.assertEqual(len(response.json()['results']), 2)
@@ -0,0 +1,206 @@
+# store/uploads.py - Staged product image uploads, processed outside the request thread
+#
+# The admin panel only copies uploads into the staging area
+# (media/staging/products/) and records a ProductImageUpload row.
+# `manage.py process_image_uploads` then claims pending rows, validates the
+# image, strips its metadata, optimizes it, stores it and builds the
+# responsive variants, then locks the product only to publish the result as
+# its main image or a ProductImage.
+
+import logging
+import os
+import posixpath
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from PIL import Image, ImageOps
+
+from .images import replace_image, store_image
+from .models import MediaDeletion, Product, ProductImage, ProductImageUpload
+
+logger = logging.getLogger(__name__)
+
+# Claims of an upload that crashed its worker more often than this are given up
+MAX_ATTEMPTS = 3
+
+
+class InvalidImage(Exception):
+    """The staged file is not an image we can publish"""
+
+
+def stage_product_image(product, uploaded_file, target, alt_text='', order=0):
+    """Copy an uploaded file to the staging area and queue it for processing"""
+    return ProductImageUpload.objects.create(
+        product=product,
+        target=target,
+        staged_file=uploaded_file,
+        original_name=os.path.basename(uploaded_file.name)[:255],
+        alt_text=alt_text,
+        order=order,
+    )
+
+
+def claim_uploads(limit=10):
+    """
+    Mark up to `limit` pending uploads as PROCESSING and return them.
+    Uploads left PROCESSING by a worker that died are picked up again once
+    IMAGE_UPLOAD_STALE_AFTER seconds have passed.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=getattr(settings, 'IMAGE_UPLOAD_STALE_AFTER', 600))
+    claimable = Q(status='PENDING') | Q(status='PROCESSING', started_at__lt=stale_before)
+
+    with transaction.atomic():
+        uploads = list(
+            ProductImageUpload.objects.select_for_update(skip_locked=True)
+            .filter(claimable)
+            .order_by('created_at', 'id')[:limit]
+        )
+        claimed = []
+        for upload in uploads:
+            if upload.attempts >= MAX_ATTEMPTS:
+                _fail(upload, 'Processing was interrupted too many times')
+                continue
+            upload.status = 'PROCESSING'
+            upload.started_at = now
+            upload.attempts += 1
+            upload.save(update_fields=['status', 'started_at', 'attempts'])
+            claimed.append(upload)
+    return claimed
+
+
+def prepare_image(field_file, original_name):
+    """
+    Validate a staged image and return it re-encoded without metadata,
+    downscaled to PRODUCT_IMAGE_MAX_DIMENSION, as a ContentFile
+    """
+    max_pixels = getattr(settings, 'PRODUCT_IMAGE_MAX_PIXELS', 40_000_000)
+    max_dimension = getattr(settings, 'PRODUCT_IMAGE_MAX_DIMENSION', 2400)
+
+    try:
+        with field_file.open('rb') as source:
+            image = Image.open(source)
+            if image.width * image.height > max_pixels:
+                raise InvalidImage(f'Image is too large ({image.width}x{image.height})')
+            image.verify()
+        with field_file.open('rb') as source:
+            image = Image.open(source)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except InvalidImage:
+        raise
+    except Exception:
+        raise InvalidImage('Not a valid image file')
+
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    # Re-encoding without passing exif/icc data drops camera and location metadata
+    buffer = BytesIO()
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if has_alpha:
+        image.convert('RGBA').save(buffer, format='PNG', optimize=True)
+        extension = 'png'
+    else:
+        image.convert('RGB').save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+        extension = 'jpg'
+
+    stem = posixpath.splitext(get_valid_filename(original_name) or 'image')[0] or 'image'
+    return ContentFile(buffer.getvalue(), name=f'{stem}.{extension}')
+
+
+def process_upload(upload):
+    """Publish one claimed upload; failures are recorded on the upload row"""
+    try:
+        content = prepare_image(upload.staged_file, upload.original_name)
+        # The Pillow work happens here, before the product row is locked
+        model = Product if upload.target == ProductImageUpload.MAIN else ProductImage
+        name, variants = store_image(model, content)
+        with transaction.atomic():
+            product = Product.objects.select_for_update().get(pk=upload.product_id)
+            if upload.target == ProductImageUpload.MAIN:
+                _replace_main_image(product, name, variants)
+            else:
+                image = ProductImage(product=product, alt_text=upload.alt_text, order=upload.order)
+                replace_image(image, name, variants)
+                image.save()
+                upload.product_image = image
+            upload.status = 'DONE'
+            upload.error = ''
+            upload.processed_at = timezone.now()
+            upload.save(update_fields=['status', 'error', 'processed_at', 'product_image'])
+    except Product.DoesNotExist:
+        return  # Product deleted meanwhile, the upload row went with it
+    except InvalidImage as e:
+        _fail(upload, str(e))
+        return
+    except Exception as e:
+        logger.exception('Could not process image upload #%s', upload.pk)
+        _fail(upload, f'Processing failed: {e}')
+        return
+
+    _discard_staged_file(upload)
+
+
+def _replace_main_image(product, name, variants):
+    replaced = replace_image(product, name, variants)
+    product.save(update_fields=['image', 'image_variants', 'updated_at'])
+    if replaced:
+        MediaDeletion.queue(*replaced)
+
+
+def _fail(upload, error):
+    upload.status = 'FAILED'
+    upload.error = error
+    upload.processed_at = timezone.now()
+    upload.save(update_fields=['status', 'error', 'processed_at'])
+    _discard_staged_file(upload)
+
+
+def _discard_staged_file(upload):
+    if upload.staged_file:
+        upload.staged_file.delete(save=False)
+        ProductImageUpload.objects.filter(pk=upload.pk).update(staged_file='')
+
+
+def process_pending_uploads(limit=10):
+    """Claim and process one batch; returns the number of uploads handled"""
+    uploads = claim_uploads(limit)
+    for upload in uploads:
+        process_upload(upload)
+    return len(uploads)
+
+
+def upload_status(product_ids):
+    """
+    Lightweight per-product summary for the admin panel to poll:
+    {product_id: {'pending': n, 'failed': [...], 'image': url}}
+    Failures are reported for a day.
+    """
+    storage = Product._meta.get_field('image').storage
+    status = {
+        row['id']: {
+            'pending': row['pending'],
+            'failed': [],
+            'image': storage.url(row['image']) if row['image'] else None,
+        }
+        for row in Product.objects.filter(pk__in=product_ids).values('id', 'image').annotate(
+            pending=Count('image_uploads', filter=Q(image_uploads__status__in=['PENDING', 'PROCESSING']))
+        )
+    }
+    failed = ProductImageUpload.objects.filter(
+        product_id__in=status, status='FAILED', processed_at__gte=timezone.now() - timedelta(days=1)
+    ).values('id', 'product_id', 'original_name', 'error', 'processed_at')
+    for row in failed:
+        status[row['product_id']]['failed'].append({
+            'id': row['id'],
+            'name': row['original_name'],
+            'error': row['error'],
+            'processed_at': row['processed_at'],
+        })
+    return status
@@ -23,6 +23,7 @@ urlpatterns = [
 
     # API endpoints
     path('api/products/', views.ProductListAPIView.as_view(), name='api_product_list'),
+    path('api/products/search/', views.ProductSearchAPIView.as_view(), name='api_product_search'),
     path('api/products/<slug:slug>/', views.ProductDetailAPIView.as_view(), name='api_product_detail'),
     path('api/addresses/', views.AddressListAPIView.as_view(), name='api_address_list'),
     path('api/addresses/create/', views.AddressCreateAPIView.as_view(), name='api_address_create'),
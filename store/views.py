@@ -2,22 +2,33 @@
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from .models import Product, Order, OrderItem, Address
+from .models import Product, Order, OrderItem, Address, CatalogVersion
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from .serializers import (
-    ProductSerializer, ProductDetailSerializer, AddressSerializer,
+    ProductSerializer, ProductCardSerializer, ProductDetailSerializer, AddressSerializer,
     AddressCreateUpdateSerializer, OrderSerializer
 )
+from .catalog import ProductCursorPagination, ProductSearchPagination, catalog_queryset, filter_products
+from .search import search_products
+from .facets import get_facets
+from .caching import (
+    catalog_validators, conditional_catalog, cached_product_payload, cached_product_payloads
+)
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.csrf import csrf_exempt
-import os
 from services.models import ServiceRequest
+from .technician_views import technician_service_feed_response
+from .stock import (
+    InsufficientStock, confirm_order_stock, order_quantities, release_order, reserve_order, return_stock
+)
+from .idempotency import idempotent
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 
 def product_list(request):
     products = Product.objects.filter(is_active=True)
@@ -38,17 +49,24 @@ def buy_now(request, slug):
     product = get_object_or_404(Product, slug=slug, is_active=True)
 
     # Check stock
-    if product.stock <= 0:
+    if product.available_stock <= 0:
         return redirect('product_detail', slug=slug)
 
-    order = Order.objects.create(customer=request.user, status='PENDING')
+    try:
+        with transaction.atomic():
+            order = Order.objects.create(customer=request.user, status='PENDING')
 
-    order_item = OrderItem.objects.create(
-        order=order,
-        product=product,
-        quantity=1,
-        price=product.price
-    )
+            order_item = OrderItem.objects.create(
+                order=order,
+                product=product,
+                quantity=1,
+                price=product.price
+            )
+
+            # Hold the unit while the customer picks an address and pays
+            reserve_order(order, {product.id: 1})
+    except InsufficientStock:
+        return redirect('product_detail', slug=slug)
 
     return redirect('select_address', order_id=order.id)
 
@@ -81,19 +99,23 @@ def payment_page(request, order_id):
 
 @login_required
 def confirm_order(request, order_id):
-    order = get_object_or_404(Order, id=order_id, customer=request.user)
+    with transaction.atomic():
+        # The order row lock keeps a double submit from taking the stock twice
+        order = get_object_or_404(Order.objects.select_for_update(), id=order_id, customer=request.user)
+        if order.status == 'PROCESSING':
+            return redirect('order_successful', order_id=order.id)
+        if order.status != 'PENDING':
+            return redirect('payment_page', order_id=order.id)
 
-    # Reduce stock for each item
-    for item in order.items.all():
-        if item.product.stock >= item.quantity:
-            item.product.stock -= item.quantity
-            item.product.save()
-        else:
-            # Handle insufficient stock
+        # Turn the order's hold into a stock decrement for every item at once,
+        # nothing changes on a shortfall
+        try:
+            confirm_order_stock(order)
+        except InsufficientStock:
             return redirect('payment_page', order_id=order.id)
 
-    order.status = 'PROCESSING'
-    order.save()
+        order.status = 'PROCESSING'
+        order.save()
     return redirect('order_successful', order_id=order.id)
 
 @login_required
@@ -113,15 +135,102 @@ def update_order_status(request, order_id):
     return redirect('technician_dashboard')
 
 # API Views
+def wants_facets(request):
+    return request.query_params.get('facets', '').lower() in ('true', '1')
+
 class ProductListAPIView(APIView):
     """
-    API view to list all active products.
+    API view to list active products, cursor paginated.
+
+    Query params:
+      view=card|full      - card (default) is the lightweight listing representation
+      fields=a,b,c        - only return these fields of the chosen representation
+      category, brand, featured, min_price, max_price, price_band, spec
+                          - see store.catalog.filter_products
+      facets=true         - add counts per facet value (store.facets)
+      cursor, page_size   - pagination
+    Full product detail stays on ProductDetailAPIView.
     """
     permission_classes = [permissions.AllowAny]
+    pagination_class = ProductCursorPagination
+    representations = {
+        'card': ProductCardSerializer,
+        'full': ProductSerializer,
+    }
+
+    @conditional_catalog(lambda request: catalog_validators(request, CatalogVersion.PRODUCTS))
     def get(self, request, format=None):
-        products = Product.objects.filter(is_active=True).select_related('category').prefetch_related('additional_images', 'specifications')
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        serializer_class = self.representations.get(request.query_params.get('view', 'card'))
+        if serializer_class is None:
+            return Response(
+                {'error': f"view must be one of: {', '.join(self.representations)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        available = list(serializer_class().fields)
+        fields = [f.strip() for f in request.query_params.get('fields', '').split(',') if f.strip()]
+        unknown = [f for f in fields if f not in available]
+        if unknown:
+            return Response(
+                {'error': f"Unknown fields: {', '.join(unknown)}", 'available_fields': available},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            products = filter_products(
+                Product.objects.filter(is_active=True).only('id', 'slug', 'created_at'),
+                request.query_params
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(products, request, view=self)
+        # Whole representations are cached per product; fields= is applied afterwards
+        payloads = cached_product_payloads(page, serializer_class, request, catalog_queryset(available))
+        if fields:
+            payloads = [{name: payload[name] for name in fields} for payload in payloads]
+        response = paginator.get_paginated_response(payloads)
+        if wants_facets(request):
+            response.data['facets'] = get_facets(products, request.query_params)
+        return response
+
+class ProductSearchAPIView(APIView):
+    """
+    Ranked product search: /api/products/search/?q=...
+
+    Matches name, brand, model number, features, specifications and
+    description (full-text, web-search syntax) and tolerates typos in
+    name/brand. Accepts the catalog filters and facets=true of
+    ProductListAPIView and page/page_size; results use the card
+    representation.
+    """
+    permission_classes = [permissions.AllowAny]
+    pagination_class = ProductSearchPagination
+
+    @conditional_catalog(lambda request: catalog_validators(request, CatalogVersion.PRODUCTS))
+    def get(self, request, format=None):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            products = filter_products(
+                search_products(Product.objects.filter(is_active=True).only('id', 'slug'), query),
+                request.query_params
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(products, request, view=self)
+        payloads = cached_product_payloads(
+            page, ProductCardSerializer, request, catalog_queryset(ProductCardSerializer.Meta.fields)
+        )
+        response = paginator.get_paginated_response(payloads)
+        if wants_facets(request):
+            response.data['facets'] = get_facets(products, request.query_params)
+        return response
 
 class ProductDetailAPIView(generics.RetrieveAPIView):
     """
@@ -134,6 +243,24 @@ class ProductDetailAPIView(generics.RetrieveAPIView):
     def get_queryset(self):
         return Product.objects.filter(is_active=True).select_related('category').prefetch_related('additional_images', 'specifications')
 
+    @staticmethod
+    def validators(request, slug=None, **kwargs):
+        updated_at = Product.objects.filter(slug=slug, is_active=True).values_list('updated_at', flat=True).first()
+        return catalog_validators(request, CatalogVersion.PRODUCTS, updated_at)
+
+    @conditional_catalog(validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = cached_product_payload(
+            self.kwargs.get('slug'),
+            self.get_serializer_class(),
+            request,
+            lambda: self.get_serializer(self.get_object()).data,
+        )
+        return Response(data)
+
     def get_object(self):
         slug = self.kwargs.get('slug')
         try:
@@ -205,20 +332,27 @@ class UserOrdersListView(generics.ListAPIView):
         return Order.objects.filter(
             customer=self.request.user
         ).select_related(
-            'shipping_address', 'technician'
+            'customer', 'shipping_address', 'technician'
         ).prefetch_related(
             'items__product'
-        ).order_by('-order_date')
+        ).with_rating_status().order_by('-order_date')
 
 class OrderDetailView(generics.RetrieveAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Order.objects.filter(customer=self.request.user)
+        return Order.objects.filter(
+            customer=self.request.user
+        ).select_related(
+            'customer', 'shipping_address', 'technician'
+        ).prefetch_related(
+            'items__product'
+        ).with_rating_status()
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent
 @transaction.atomic
 def create_order(request):
     """
@@ -245,10 +379,12 @@ def create_order(request):
         except Product.DoesNotExist:
             return Response({'error': 'Product not found'}, status=404)
 
+        quantity = int(quantity)
+
         # Check stock
-        if product.stock < quantity:
+        if product.available_stock < quantity:
             return Response(
-                {'error': f'Only {product.stock} items available in stock'},
+                {'error': f'Only {product.available_stock} items available in stock'},
                 status=400
             )
 
@@ -267,6 +403,9 @@ def create_order(request):
             price=product.price
         )
 
+        # Hold the stock while the order is pending
+        reserve_order(order, {product.id: quantity})
+
         # Serialize and return
         serializer = OrderSerializer(order)
         return Response(serializer.data, status=201)
@@ -276,6 +415,7 @@ def create_order(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent
 @transaction.atomic
 def create_bulk_order(request):
     """
@@ -292,28 +432,40 @@ def create_bulk_order(request):
         # Validate address
         address = get_object_or_404(Address, id=address_id, user=request.user)
 
-        # Validate stock for all items
-        validated_items = []
+        # Coalesce the cart: one line per product, in cart order
+        quantities = {}
         for raw in items:
             product_slug = raw.get('product_slug')
-            quantity = int(raw.get('quantity', 1))
             if not product_slug:
                 return Response({'error': 'Each item must include product_slug'}, status=400)
-
-            # Use select_for_update to lock rows during this transaction
             try:
-                product = Product.objects.select_for_update().get(slug=product_slug, is_active=True)
-            except Product.DoesNotExist:
-                return Response({'error': f'Product {product_slug} not found'}, status=404)
+                quantity = int(raw.get('quantity', 1))
+            except (TypeError, ValueError):
+                return Response({'error': f'Invalid quantity for {product_slug}'}, status=400)
+            if quantity < 1:
+                return Response({'error': f'Invalid quantity for {product_slug}'}, status=400)
+            quantities[product_slug] = quantities.get(product_slug, 0) + quantity
+
+        # Lock every product in one query, always in primary key order, so two
+        # checkouts sharing products queue up instead of deadlocking
+        products = {
+            product.slug: product
+            for product in Product.objects.select_for_update().filter(
+                slug__in=quantities, is_active=True
+            ).order_by('pk')
+        }
 
-            if product.stock < quantity:
+        # Validate stock for all items
+        for product_slug, quantity in quantities.items():
+            product = products.get(product_slug)
+            if product is None:
+                return Response({'error': f'Product {product_slug} not found'}, status=404)
+            if product.available_stock < quantity:
                 return Response(
-                    {'error': f'Only {product.stock} items available in stock for {product.name}'},
+                    {'error': f'Only {product.available_stock} items available in stock for {product.name}'},
                     status=400
                 )
 
-            validated_items.append((product, quantity))
-
         # Create the single order
         order = Order.objects.create(
             customer=request.user,
@@ -321,14 +473,22 @@ def create_bulk_order(request):
             shipping_address=address
         )
 
-        # Create order items
-        for product, quantity in validated_items:
-            OrderItem.objects.create(
+        # Create order items in one INSERT; bulk_create skips OrderItem.save(),
+        # so the order totals are refreshed explicitly
+        OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
-                product=product,
+                product=products[product_slug],
                 quantity=quantity,
-                price=product.price
+                price=products[product_slug].price
             )
+            for product_slug, quantity in quantities.items()
+        ])
+        order.refresh_totals()
+
+        # Hold the stock while the order is pending
+        reserve_order(order, {products[product_slug].id: quantity for product_slug, quantity in quantities.items()})
+        prefetch_related_objects([order], 'items__product')
 
         serializer = OrderSerializer(order)
         return Response(serializer.data, status=201)
@@ -343,23 +503,25 @@ def cancel_order(request, order_id):
     Cancel an order (only if pending/processing)
     """
     try:
-        order = get_object_or_404(Order, id=order_id, customer=request.user)
+        with transaction.atomic():
+            order = get_object_or_404(Order.objects.select_for_update(), id=order_id, customer=request.user)
 
-        if order.status not in ['PENDING', 'PROCESSING']:
-            return Response(
-                {'error': 'Order cannot be cancelled'},
-                status=400
-            )
+            if order.status not in ['PENDING', 'PROCESSING']:
+                return Response(
+                    {'error': 'Order cannot be cancelled'},
+                    status=400
+                )
 
-        # If order was processing, restore stock
-        if order.status == 'PROCESSING':
-            for item in order.items.all():
-                item.product.stock += item.quantity
-                item.product.save()
+            # If order was processing, restore stock; a pending one only gives back its hold
+            if order.status == 'PROCESSING':
+                return_stock(order_quantities(order))
+            else:
+                release_order(order)
 
-        order.status = 'CANCELLED'
-        order.save()
+            order.status = 'CANCELLED'
+            order.save()
 
+        prefetch_related_objects([order], 'items__product')
         serializer = OrderSerializer(order)
         return Response(serializer.data)
 
@@ -374,12 +536,7 @@ def delete_product_image(request, image_id):
         from .models import ProductImage
         image = ProductImage.objects.get(id=image_id)
 
-        # Delete the actual file
-        if image.image:
-            if os.path.isfile(image.image.path):
-                os.remove(image.image.path)
-
-        # Delete the database record
+        # The file is queued for the media GC (collect_media_garbage)
         image.delete()
 
         return JsonResponse({'success': True})
@@ -395,17 +552,8 @@ def delete_product(request, product_id):
     try:
         product = Product.objects.get(id=product_id)
         
-        # Delete product images from disk
-        if product.image:
-            if os.path.isfile(product.image.path):
-                os.remove(product.image.path)
-        
-        # Delete additional images
-        for img in product.additional_images.all():
-            if img.image and os.path.isfile(img.image.path):
-                os.remove(img.image.path)
-        
-        # Delete the product (cascade will delete related objects)
+        # Delete the product (cascade will delete related objects); its image
+        # files are queued for the media GC (collect_media_garbage)
         product.delete()
         
         return Response({'success': True, 'message': 'Product deleted successfully'}, status=200)
@@ -421,56 +569,5 @@ def get_assigned_services(request):
     if request.user.role != 'TECHNICIAN':
         return Response({'error': 'Unauthorized'}, status=403)
 
-    # Get services with related data including JobSheet via reverse relation
-    services = ServiceRequest.objects.filter(
-        technician=request.user
-    ).select_related(
-        'customer',
-        'service_category',
-        'service_location',
-        'issue'
-    ).prefetch_related('job_sheet')
-
-    services_data = []
-    for service in services:
-        has_job_sheet = False
-        job_sheet_status = None
-        job_sheet_id = None
-
-        try:
-            if hasattr(service, 'job_sheet'):
-                job_sheet = service.job_sheet
-                has_job_sheet = True
-                job_sheet_status = job_sheet.approval_status
-                job_sheet_id = job_sheet.id
-        except Exception:
-             pass
-
-        service_data = {
-            'id': service.id,
-            'customer': {
-                'name': service.customer.name,
-                'phone': service.customer.phone,
-            },
-            'service_category': {
-                'name': service.service_category.name,
-            },
-            'issue': {
-                'description': service.issue.description
-            } if service.issue else None,
-            'custom_description': service.custom_description,
-            'service_location': {
-                'street_address': service.service_location.street_address,
-                'city': service.service_location.city,
-                'state': service.service_location.state,
-                'pincode': service.service_location.pincode,
-            },
-            'request_date': service.request_date.isoformat(),
-            'status': service.status,
-            'has_job_sheet': has_job_sheet,
-            'job_sheet_status': job_sheet_status,
-            'job_sheet_id': job_sheet_id,
-        }
-        services_data.append(service_data)
-
-    return Response(services_data)
+    # Same feed as /api/technician/assigned-services/
+    return technician_service_feed_response(request)
@@ -232,6 +232,7 @@ interface Product {
   price: string;
   image: string;
   stock: number;
+  available_stock: number;
   brand?: string;
   model_number?: string;
   warranty_period?: string;
@@ -340,7 +341,9 @@ export const ProductDetailPage: React.FC = () => {
     );
   }
 
-  const inStock = product.stock > 0;
+  // Stock held by other customers' pending orders can't be bought
+  const availableStock = product.available_stock ?? product.stock;
+  const inStock = availableStock > 0;
 
   const getAllImages = () => product.all_images?.length ? product.all_images : (product.image ? [product.image] : []);
 
@@ -417,7 +420,7 @@ export const ProductDetailPage: React.FC = () => {
             <Box sx={{ display: 'flex', alignItems: 'center', gap: 2, mb: 2, justifyContent: { xs: 'center', md: 'flex-start' } }}>
               <ProductPrice>₹{product.price}</ProductPrice>
               <Chip
-                label={inStock ? `${product.stock} in stock` : 'Out of stock'}
+                label={inStock ? `${availableStock} in stock` : 'Out of stock'}
                 size="small"
                 sx={{
                   backgroundColor: inStock ? 'rgba(34, 197, 94, 0.15)' : 'rgba(239, 68, 68, 0.15)',
@@ -474,7 +477,7 @@ export const ProductDetailPage: React.FC = () => {
               </Grid>
               <Grid size={{ xs: 6, sm: 4, md: 3 }}>
                 <Typography sx={{ color: 'rgba(255, 255, 255, 0.6)', fontSize: '14px' }}>Stock</Typography>
-                <Typography sx={{ color: 'white', fontWeight: 500 }}>{product.stock} units</Typography>
+                <Typography sx={{ color: 'white', fontWeight: 500 }}>{availableStock} units</Typography>
               </Grid>
               {product.brand && (
                 <Grid size={{ xs: 6, sm: 4, md: 3 }}>
@@ -1,5 +1,5 @@
 // src/pages/StorePage.tsx - PART 1 - PROPER MOBILE FIX
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { styled } from '@mui/material/styles';
 import { useNavigate, useSearchParams } from 'react-router-dom';
 import {
@@ -786,16 +786,24 @@ export const StorePage: React.FC = () => {
   const { enqueueSnackbar } = useSnackbar();
 
   const products = useProductStore((state) => state.products);
+  const categories = useProductStore((state) => state.categories);
+  const nextPage = useProductStore((state) => state.nextPage);
+  const loadingMore = useProductStore((state) => state.loadingMore);
   const fetchProducts = useProductStore((state) => state.fetchProducts);
+  const fetchMoreProducts = useProductStore((state) => state.fetchMoreProducts);
   const addToCart = useCartStore((state) => state.addToCart);
 
+  const [searchParams] = useSearchParams();
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
-  const [selectedCategory, setSelectedCategory] = useState('All Products');
-  const [activeTab, setActiveTab] = useState('All Products');
-  const [visibleProducts, setVisibleProducts] = useState(8);
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+  // Category slug ('' = all products); a ?category= link is taken as a slug until the categories load
+  const [selectedCategory, setSelectedCategory] = useState(() => {
+    const param = (searchParams.get('category') ?? '').trim().toLowerCase();
+    return param === 'all' ? '' : param;
+  });
   const [error, setError] = useState<string | null>(null);
-  const [searchParams] = useSearchParams();
+  const loadMoreRef = useRef<HTMLDivElement | null>(null);
 
   const heroAnimation = useSpring({
     from: { opacity: 0, transform: 'translateX(-60px)' },
@@ -804,57 +812,44 @@ export const StorePage: React.FC = () => {
     delay: 300,
   });
 
-  const filteredProducts = products.filter(product => {
-    const matchesSearch = product.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      product.description.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesCategory = selectedCategory === 'All Products' || product.category.name === selectedCategory;
-    return matchesSearch && matchesCategory;
-  });
-
-  const categories = ['All Products', ...Array.from(new Set(products.map(p => p.category.name)))];
+  const categoryOptions = [{ value: '', label: 'All Products' }, ...categories];
 
   useEffect(() => {
     const catParam = searchParams.get('category');
-    if (!catParam) return;
+    if (!catParam || categories.length === 0) return;
 
     const normalize = (s: string) => s.trim().toLowerCase();
     const normalizedParam = normalize(catParam);
 
     if (normalizedParam === 'all' || normalizedParam === normalize('All Products')) {
-      setSelectedCategory('All Products');
-      setActiveTab('All Products');
-      setVisibleProducts(8);
+      setSelectedCategory('');
       return;
     }
 
-    const categoryNames = ['All Products', ...Array.from(new Set(products.map(p => p.category.name)))];
-    let matchName = categoryNames.find(c => normalize(c) === normalizedParam);
-
-    if (!matchName) {
-      const matchProduct = products.find(p => normalize(p.category.slug) === normalizedParam);
-      if (matchProduct) matchName = matchProduct.category.name;
-    }
+    let match = categories.find(c => c.value === normalizedParam || normalize(c.label) === normalizedParam);
 
-    if (!matchName) {
-      const partialMatch = categoryNames.find(c => {
-        const nc = normalize(c);
+    if (!match) {
+      match = categories.find(c => {
+        const nc = normalize(c.label);
         return nc.includes(normalizedParam) || normalizedParam.includes(nc);
       });
-      matchName = partialMatch;
     }
 
-    const finalMatch = matchName || 'All Products';
-    setSelectedCategory(finalMatch);
-    setActiveTab(finalMatch);
-    setVisibleProducts(8);
-  }, [products, searchParams]);
+    setSelectedCategory(match ? match.value : '');
+  }, [categories, searchParams]);
+
+  // Search runs on the server, so wait for the user to stop typing
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
   useEffect(() => {
     const loadProducts = async () => {
       setLoading(true);
       setError(null);
       try {
-        await fetchProducts();
+        await fetchProducts({ search: debouncedSearch, category: selectedCategory });
       } catch (err) {
         console.error('Error fetching products:', err);
         setError('Failed to load products. Please check your connection.');
@@ -863,7 +858,19 @@ export const StorePage: React.FC = () => {
       }
     };
     loadProducts();
-  }, [fetchProducts]);
+  }, [fetchProducts, debouncedSearch, selectedCategory]);
+
+  // Next page when the end of the grid scrolls into view
+  useEffect(() => {
+    const sentinel = loadMoreRef.current;
+    if (!sentinel || loading || error || !nextPage) return;
+
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) fetchMoreProducts();
+    }, { rootMargin: '400px' });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [fetchMoreProducts, loading, error, nextPage]);
 
   const handleAddToCart = (product: Product) => {
     addToCart(product, 1);
@@ -882,14 +889,8 @@ export const StorePage: React.FC = () => {
     navigate(`/product/${product.slug}`);
   };
 
-  const loadMoreProducts = () => {
-    setVisibleProducts(prev => prev + 8);
-  };
-
   const handleCategoryChange = (category: string) => {
     setSelectedCategory(category);
-    setActiveTab(category);
-    setVisibleProducts(8);
   };
 
   return (
@@ -930,7 +931,7 @@ export const StorePage: React.FC = () => {
           />
           <PremiumSelect>
             <Select
-              value={selectedCategory}
+              value={categoryOptions.some(c => c.value === selectedCategory) ? selectedCategory : ''}
               onChange={(e) => handleCategoryChange(e.target.value)}
               displayEmpty
               MenuProps={{
@@ -950,8 +951,8 @@ export const StorePage: React.FC = () => {
                 },
               }}
             >
-              {categories.map((category) => (
-                <MenuItem key={category} value={category}>{category}</MenuItem>
+              {categoryOptions.map((category) => (
+                <MenuItem key={category.value} value={category.value}>{category.label}</MenuItem>
               ))}
             </Select>
           </PremiumSelect>
@@ -962,9 +963,9 @@ export const StorePage: React.FC = () => {
         <BrowseTitle>Browse Categories</BrowseTitle>
 
         <CategoryTabs>
-          {categories.slice(0, 6).map((category) => (
-            <CategoryTab key={category} active={activeTab === category} onClick={() => handleCategoryChange(category)}>
-              {category}
+          {categoryOptions.slice(0, 6).map((category) => (
+            <CategoryTab key={category.value} active={selectedCategory === category.value} onClick={() => handleCategoryChange(category.value)}>
+              {category.label}
             </CategoryTab>
           ))}
         </CategoryTabs>
@@ -979,15 +980,15 @@ export const StorePage: React.FC = () => {
                 Retry Loading
               </Button>
             </Box>
-          ) : filteredProducts.length === 0 ? (
+          ) : products.length === 0 ? (
             <Box sx={{ gridColumn: '1 / -1', textAlign: 'center', py: 8, position: 'relative', zIndex: 2 }}>
               <Typography variant="h5" sx={{ mb: 2, color: 'rgba(255, 255, 255, 0.8)', fontWeight: 300, fontSize: '24px' }}>No products match your filters</Typography>
-              <Button onClick={() => { setSearchTerm(''); setSelectedCategory('All Products'); setActiveTab('All Products'); }} sx={{ mt: 2, backgroundColor: 'rgba(255, 255, 255, 0.08)', color: '#ffffff', border: '1px solid rgba(255, 255, 255, 0.15)', borderRadius: '12px', padding: '8px 16px', '&:hover': { backgroundColor: 'rgba(255, 255, 255, 0.15)' } }}>
+              <Button onClick={() => { setSearchTerm(''); setSelectedCategory(''); }} sx={{ mt: 2, backgroundColor: 'rgba(255, 255, 255, 0.08)', color: '#ffffff', border: '1px solid rgba(255, 255, 255, 0.15)', borderRadius: '12px', padding: '8px 16px', '&:hover': { backgroundColor: 'rgba(255, 255, 255, 0.15)' } }}>
                 Clear Filters
               </Button>
             </Box>
           ) : (
-            filteredProducts.slice(0, visibleProducts).map((product) => (
+            products.map((product) => (
               <ProductCard key={product.id}>
                 <ProductImageArea onClick={() => handleViewDetails(product)}>
                   <img
@@ -1004,7 +1005,7 @@ export const StorePage: React.FC = () => {
                 <ProductInfo>
                   <Box>
                     <ProductName onClick={() => handleViewDetails(product)}>{product.name}</ProductName>
-                    <ProductDescription>{product.description || 'Premium technology product with advanced features.'}</ProductDescription>
+                    <ProductDescription>{product.short_description || 'Premium technology product with advanced features.'}</ProductDescription>
                     <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 2 }}>
                       <Typography sx={{ fontSize: '20px', fontWeight: 600, color: '#60a5fa', background: 'linear-gradient(135deg, #60a5fa, #3b82f6)', WebkitBackgroundClip: 'text', WebkitTextFillColor: 'transparent' }}>
                         ₹{product.price}
@@ -1040,10 +1041,12 @@ export const StorePage: React.FC = () => {
           )}
         </ProductGrid>
 
-        {!loading && !error && visibleProducts < filteredProducts.length && (
-          <LoadMoreButton onClick={loadMoreProducts}>
-            Load More Products ({filteredProducts.length - visibleProducts} remaining)
-          </LoadMoreButton>
+        {!loading && !error && nextPage && (
+          <div ref={loadMoreRef}>
+            <LoadMoreButton onClick={() => fetchMoreProducts()} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load More Products'}
+            </LoadMoreButton>
+          </div>
         )}
       </ProductsSection>
 
@@ -166,6 +166,9 @@ interface ServiceRequest {
   job_sheet_status: 'PENDING' | 'APPROVED' | 'DECLINED' | null;
 }
 
+// Services the dashboard lists (everything but COMPLETED)
+const OPEN_SERVICE_STATUSES = ['SUBMITTED', 'ASSIGNED', 'IN_PROGRESS', 'CANCELLED'];
+
 interface TechnicianStats {
   total_orders: number;
   completed_orders: number;
@@ -235,16 +238,31 @@ export const TechnicianDashboard: React.FC = () => {
     checkTechnicianAccess();
   }, [isAuthenticated, checkAuthStatus, enqueueSnackbar, navigate]);
 
+  // The service feed is paginated; ask only for the open services and follow
+  // `next` so a long backlog is not cut off at the first page
+  const fetchOpenServices = async () => {
+    const services: ServiceRequest[] = [];
+    let response = await apiClient.get('/api/technician/assigned-services/', {
+      params: { status: OPEN_SERVICE_STATUSES.join(','), page_size: 200 },
+    });
+    services.push(...response.data.results);
+    while (response.data.next) {
+      response = await apiClient.get(response.data.next);
+      services.push(...response.data.results);
+    }
+    return services;
+  };
+
   const fetchDashboardData = async () => {
     setLoading(true);
     try {
-      const [ordersRes, servicesRes, statsRes] = await Promise.all([
+      const [ordersRes, services, statsRes] = await Promise.all([
         apiClient.get('/api/technician/assigned-orders/'),
-        apiClient.get('/api/technician/assigned-services/'),
+        fetchOpenServices(),
         apiClient.get('/api/technician/stats/'),
       ]);
       setOrders(ordersRes.data);
-      setServiceRequests(servicesRes.data);
+      setServiceRequests(services);
       setStats(statsRes.data);
     } catch (error) {
       enqueueSnackbar('Failed to load dashboard data', { variant: 'error' });
@@ -9,7 +9,7 @@ interface Product {
   id: number;
   name: string;
   slug: string;
-  description: string;
+  short_description: string;
   price: string;
   image: string;
   category: {
@@ -29,31 +29,100 @@ interface Address {
   is_default: boolean;
 }
 
+// A category facet value (store.facets on the backend)
+export interface CategoryFacet {
+  value: string; // category slug
+  label: string;
+  count: number;
+}
+
+// Filters the store page sends to the catalog endpoints
+export interface ProductFilters {
+  search?: string;
+  category?: string; // category slug
+}
+
+interface ProductPage {
+  results: Product[];
+  next: string | null;
+  facets?: { category: CategoryFacet[] };
+}
+
 // Define the shape of our store's state
 interface ProductState {
   products: Product[];
+  categories: CategoryFacet[];
+  nextPage: string | null;
+  loadingMore: boolean;
   addresses: Address[];
-  fetchProducts: () => Promise<void>;
+  fetchProducts: (filters?: ProductFilters) => Promise<void>;
+  fetchMoreProducts: () => Promise<void>;
   fetchAddresses: () => Promise<void>;
 }
 
+const PAGE_SIZE = 24;
+
+// Responses to an older fetchProducts() call (the filters changed meanwhile) are dropped
+let latestRequest = 0;
+
 // Create the store
-export const useProductStore = create<ProductState>((set) => ({
+export const useProductStore = create<ProductState>((set, get) => ({
   products: [],
+  categories: [],
+  nextPage: null,
+  loadingMore: false,
   addresses: [],
-  fetchProducts: async () => {
-    try {
+  // First page of the catalog for the given filters; more pages come from fetchMoreProducts
+  // as the user scrolls. Filtering and search run on the server (/api/products/ and
+  // /api/products/search/).
+  // Errors are rethrown and the products already shown are kept.
+  fetchProducts: async (filters = {}) => {
+    const request = ++latestRequest;
+    const search = filters.search?.trim();
+    const params: Record<string, string | number> = { page_size: PAGE_SIZE };
+    if (filters.category) params.category = filters.category;
+    if (search) params.q = search;
+    else params.view = 'card';
+    // The tabs list every category, so only the unfiltered catalog's facets are used
+    const unfiltered = !search && !filters.category;
+    if (unfiltered) params.facets = 'true';
+    const url = search ? `${API_BASE_URL}/api/products/search/` : `${API_BASE_URL}/api/products/`;
+
+    // Use direct axios for public endpoints
+    const response = await axios.get<ProductPage>(url, { params, timeout: 5000 });
+    if (request !== latestRequest) return;
 
-      // Use direct axios for public endpoints
-      const response = await axios.get(`${API_BASE_URL}/api/products/`, {
-        timeout: 5000
-      });
+    set({ products: response.data.results, nextPage: response.data.next });
+    if (unfiltered) {
+      set({ categories: response.data.facets?.category ?? [] });
+    } else if (get().categories.length === 0) {
+      // Opened filtered (e.g. /store?category=audio): one product is enough for the facets
+      axios.get<ProductPage>(`${API_BASE_URL}/api/products/`, {
+        params: { view: 'card', page_size: 1, facets: 'true' },
+        timeout: 5000,
+      })
+        .then((facetResponse) => set({ categories: facetResponse.data.facets?.category ?? [] }))
+        .catch((error) => console.error("Failed to fetch categories:", error));
+    }
+  },
+  fetchMoreProducts: async () => {
+    const { nextPage, loadingMore } = get();
+    if (!nextPage || loadingMore) return;
 
-      set({ products: response.data });
+    const request = latestRequest;
+    set({ loadingMore: true });
+    try {
+      const response = await axios.get<ProductPage>(nextPage, { timeout: 5000 });
+      if (request !== latestRequest) return;
+      set((state) => ({
+        products: [...state.products, ...response.data.results],
+        nextPage: response.data.next,
+      }));
     } catch (error) {
-      console.error("Failed to fetch products:", error);
-      // Set empty array on error so UI shows "no products" instead of loading forever
-      set({ products: [] });
+      // Keep what is shown; the next scroll (or Load More) retries the same page
+      console.error("Failed to fetch more products:", error);
+    } finally {
+      set({ loadingMore: false });
     }
   },
   fetchAddresses: async () => {
@@ -1,3 +1,361 @@
-from django.test import TestCase
+# users/tests.py - Query budgets for the account endpoints and the admin panel
+# (see store.tests.QueryBudgetTestCase)
+#
+# admin_panel has no tests module of its own, so its pages and APIs are
+# budgeted here. The dashboard-style pages refresh the sales rollups for the
+# days the seeded orders dirtied, which is part of their budget.
+# RollupRefreshTests covers the dirty-day queue of admin_panel.rollups and
+# AdminStatsCacheTests the invalidation of the cached dashboard counts.
 
-# Create your tests here.
+from itertools import count
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from admin_panel import rollups
+from admin_panel.models import RollupDirtyDay
+from admin_panel.rollups import local_day
+from admin_panel.stats import ADMIN_STATS_CACHE_KEY, get_admin_stats
+from services.models import ServiceCategory
+from store.models import ProductCategory
+from store.tests import QueryBudgetTestCase
+
+User = get_user_model()
+
+fresh_emails = (f'fresh{n}@example.com' for n in count(1))
+
+
+def fresh_user():
+    """A new account, for the endpoints that change or delete the account they act on"""
+    return User.objects.create_user(next(fresh_emails), 'password', name='Fresh', phone='9000000001')
+
+
+class AccountQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_login(self):
+        self.assertQueryBudget(
+            9, None, 'post', '/api/users/login/',
+            form={'username': 'customer@example.com', 'password': 'password'}, status_code=302,
+        )
+
+    def test_logout(self):
+        # Django's LogoutView renders the admin's logged_out.html, there is no redirect
+        self.assertQueryBudget(4, self.customer, 'post', '/api/users/logout/')
+
+    def test_add_address(self):
+        self.assertQueryBudget(
+            3, self.customer, 'post', '/api/users/add-address/',
+            form={'street_address': '3 Hill Road', 'city': 'Kochi', 'state': 'Kerala', 'pincode': '682004'},
+            status_code=302,
+        )
+
+    def test_csrf(self):
+        self.assertQueryBudget(0, None, 'get', '/api/users/csrf/')
+
+    def test_me(self):
+        self.assertQueryBudget(2, self.customer, 'get', '/api/users/me/')
+
+    def test_profile(self):
+        self.assertQueryBudget(2, self.customer, 'get', '/api/users/profile/')
+        self.assertQueryBudget(3, self.customer, 'patch', '/api/users/profile/', data={'phone': '9000000009'})
+
+    def test_profile_validation(self):
+        self.assertQueryBudget(3, self.customer, 'get', '/api/users/profile/validate/')
+
+    def test_change_password(self):
+        self.assertQueryBudget(
+            3, fresh_user, 'post', '/api/users/change-password/',
+            data={'current_password': 'password', 'new_password': 'Quartz-lamp-4417'},
+        )
+
+    def test_delete_account(self):
+        self.assertQueryBudget(
+            3, fresh_user, 'delete', '/api/users/delete-account/', data={'password': 'password'},
+        )
+
+    def test_logout_session(self):
+        self.assertQueryBudget(0, self.customer, 'post', '/api/users/logout-session/')
+
+    def test_debug_auth(self):
+        self.assertQueryBudget(2, self.customer, 'get', '/api/users/debug-auth/')
+
+    def test_create_from_google(self):
+        self.assertQueryBudget(
+            4, None, 'post', '/api/users/create-from-google/',
+            data=lambda: {'email': f'google{self.seeded}@example.com', 'name': 'Google User'},
+        )
+
+
+class AdminPanelPageQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_dashboard(self):
+        self.assertQueryBudget(30, self.admin, 'get', '/admin-panel/')
+        self.assertQueryBudget(27, self.admin, 'get', '/admin-dashboard/')
+
+    def test_users(self):
+        self.assertQueryBudget(4, self.admin, 'get', '/admin-panel/users/')
+        self.assertQueryBudget(4, self.admin, 'get', '/admin-panel/users/create/')
+        self.assertQueryBudget(10, self.admin, 'get', f'/admin-panel/users/{self.customer.id}/edit/')
+
+    def test_products(self):
+        product = self.create_product()
+        self.assertQueryBudget(6, self.admin, 'get', '/admin-panel/products/')
+        self.assertQueryBudget(3, self.admin, 'get', '/admin-panel/products/create/')
+        self.assertQueryBudget(8, self.admin, 'get', f'/admin-panel/products/{product.id}/edit/')
+
+    def test_orders(self):
+        self.create_order()
+        self.assertQueryBudget(32, self.admin, 'get', '/admin-panel/orders/')
+        self.assertQueryBudget(29, self.admin, 'get', '/admin-panel/orders/?technician=unassigned&status=PENDING')
+        # There is no edit_order.html, orders are edited through the POST and the JSON API
+
+    def test_services(self):
+        service = self.create_service()
+        self.assertQueryBudget(32, self.admin, 'get', '/admin-panel/services/')
+        self.assertQueryBudget(4, self.admin, 'get', f'/admin-panel/services/{service.id}/edit/')
+
+    def test_categories(self):
+        self.assertQueryBudget(7, self.admin, 'get', '/admin-panel/categories/')
+        # Product categories are edited in a modal on the list page
+        self.assertQueryBudget(
+            2, self.admin, 'get', f'/admin-panel/categories/{self.category.id}/edit/?type=product', status_code=302
+        )
+        self.assertQueryBudget(
+            4, self.admin, 'get', f'/admin-panel/categories/{self.service_category.id}/edit/?type=service'
+        )
+
+    def test_analytics(self):
+        self.assertQueryBudget(32, self.admin, 'get', '/admin-panel/analytics/')
+
+    def test_settings(self):
+        self.assertQueryBudget(2, self.admin, 'get', '/admin-panel/settings/')
+
+    def test_job_sheets(self):
+        sheet = self.create_service().job_sheet
+        self.assertQueryBudget(31, self.admin, 'get', '/admin-panel/job-sheets/')
+        self.assertQueryBudget(4, self.admin, 'get', f'/admin-panel/job-sheets/{sheet.id}/')
+
+
+class AdminPanelWriteQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_create_user(self):
+        self.assertQueryBudget(
+            4, self.admin, 'post', '/admin-panel/users/create/',
+            form=lambda: {
+                'email': f'new{self.seeded}@example.com', 'name': 'New User', 'role': 'CUSTOMER',
+                'password1': 'Quartz-lamp-4417', 'password2': 'Quartz-lamp-4417',
+            },
+            status_code=302,
+        )
+
+    def test_edit_user(self):
+        self.assertQueryBudget(
+            5, self.admin, 'post', f'/admin-panel/users/{self.customer.id}/edit/',
+            form={'name': 'Customer', 'email': 'customer@example.com', 'role': 'CUSTOMER', 'is_active': 'on'},
+            status_code=302,
+        )
+
+    def test_delete_user(self):
+        self.assertQueryBudget(
+            19, self.admin, 'post', lambda: f'/admin-panel/users/{fresh_user().id}/delete/',
+            status_code=302,
+        )
+
+    def test_create_product(self):
+        self.assertQueryBudget(
+            11, self.admin, 'post', '/admin-panel/products/create/',
+            form=lambda: {
+                'name': f'Tablet {self.seeded}', 'category': self.category.id, 'description': 'A tablet',
+                'price': '500.00', 'stock': '10', 'is_active': 'true',
+                'spec_names[]': ['RAM'], 'spec_values[]': ['8GB'],
+            },
+            status_code=302,
+        )
+
+    def test_edit_product(self):
+        product = self.create_product()
+        self.assertQueryBudget(
+            16, self.admin, 'post', f'/admin-panel/products/{product.id}/edit/',
+            form={
+                'name': product.name, 'category': self.category.id, 'description': 'Updated',
+                'price': '900.00', 'stock': '20', 'is_active': 'true',
+                'spec_names[]': ['RAM'], 'spec_values[]': ['32GB'],
+            },
+            status_code=302,
+        )
+
+    def test_edit_order(self):
+        order = self.create_order(status='PENDING', technician=False)
+        self.assertQueryBudget(
+            6, self.admin, 'post', f'/admin-panel/orders/{order.id}/edit/',
+            form={'status': 'PENDING', 'technician_id': self.technician.id}, status_code=302,
+        )
+
+    def test_delete_order(self):
+        self.assertQueryBudget(
+            18, self.admin, 'post',
+            lambda: f'/admin-panel/orders/{self.create_order().id}/delete/',
+            status_code=302,
+        )
+
+    def test_assign_technician(self):
+        self.assertQueryBudget(
+            6, self.admin, 'post',
+            lambda: f'/admin-panel/orders/{self.create_order(status="PENDING", technician=False).id}/assign/',
+            form={'technician_id': self.technician.id}, status_code=302,
+        )
+
+    def test_edit_service(self):
+        service = self.create_service(status='SUBMITTED', job_sheet=False)
+        self.assertQueryBudget(
+            6, self.admin, 'post', f'/admin-panel/services/{service.id}/edit/',
+            form={'status': 'SUBMITTED', 'technician_id': self.technician.id}, status_code=302,
+        )
+
+    def test_assign_service_technician(self):
+        self.assertQueryBudget(
+            6, self.admin, 'post',
+            lambda: f'/admin-panel/services/{self.create_service(status="SUBMITTED", job_sheet=False).id}/assign/',
+            form={'technician_id': self.technician.id}, status_code=302,
+        )
+
+    def test_create_category(self):
+        self.assertQueryBudget(
+            6, self.admin, 'post', '/admin-panel/categories/create/',
+            form=lambda: {'type': 'product', 'name': f'Tablets {self.seeded}'}, status_code=302,
+        )
+        self.assertQueryBudget(
+            6, self.admin, 'post', '/admin-panel/categories/create/',
+            form=lambda: {
+                'type': 'service', 'name': f'Tablet Repair {self.seeded}',
+                'issue_descriptions[]': ['Cracked screen'], 'issue_prices[]': ['1500'],
+            },
+            status_code=302,
+        )
+
+    def test_edit_category(self):
+        self.assertQueryBudget(
+            6, self.admin, 'post', f'/admin-panel/categories/{self.category.id}/edit/',
+            form={'type': 'product', 'name': 'Notebooks', 'slug': 'notebooks'}, status_code=302,
+        )
+        self.assertQueryBudget(
+            9, self.admin, 'post', f'/admin-panel/categories/{self.service_category.id}/edit/',
+            form={
+                'type': 'service', 'name': 'Notebook Repair',
+                'existing_issue_ids[]': [self.issue.id], 'existing_issue_descriptions[]': ['Does not boot'],
+                'existing_issue_prices[]': ['549'],
+            },
+            status_code=302,
+        )
+
+    def test_delete_category(self):
+        self.assertQueryBudget(
+            8, self.admin, 'post',
+            lambda: f'/admin-panel/categories/{ProductCategory.objects.create(name=f"Old {self.seeded}", slug=f"old-{self.seeded}").id}/delete/',
+            form={'type': 'product'}, status_code=302,
+        )
+        self.assertQueryBudget(
+            10, self.admin, 'post',
+            lambda: f'/admin-panel/categories/{ServiceCategory.objects.create(name=f"Old {self.seeded}").id}/delete/',
+            form={'type': 'service'}, status_code=302,
+        )
+
+    def test_delete_job_sheet(self):
+        self.assertQueryBudget(
+            5, self.admin, 'post',
+            lambda: f'/admin-panel/job-sheets/{self.create_service().job_sheet.id}/delete/',
+            status_code=302,
+        )
+
+
+class AdminPanelAPIQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_stats(self):
+        self.assertQueryBudget(27, self.admin, 'get', '/admin-panel/api/stats/')
+
+    def test_order_details(self):
+        order = self.create_order()
+        self.assertQueryBudget(6, self.admin, 'get', f'/admin-panel/api/orders/{order.id}/')
+
+    def test_product_image_status(self):
+        products = [self.create_product() for _ in range(3)]
+        ids = ','.join(str(product.id) for product in products)
+        self.assertQueryBudget(4, self.admin, 'get', f'/admin-panel/api/product-images/status/?ids={ids}')
+
+    def test_assign_technician(self):
+        self.assertQueryBudget(
+            6, self.admin, 'post', '/admin-panel/api/assign-technician/',
+            data=lambda: {
+                'order_id': self.create_order(status='PENDING', technician=False).id,
+                'technician_id': self.technician.id,
+            },
+        )
+
+    def test_assign_service_technician(self):
+        self.assertQueryBudget(
+            6, self.admin, 'post', '/admin-panel/api/assign-service-technician/',
+            data=lambda: {
+                'service_id': self.create_service(status='SUBMITTED', job_sheet=False).id,
+                'technician_id': self.technician.id,
+            },
+        )
+
+    def test_update_order_status(self):
+        self.assertQueryBudget(
+            5, self.admin, 'post', '/admin-panel/api/update-order-status/',
+            data=lambda: {'order_id': self.create_order(status='PROCESSING').id, 'status': 'SHIPPED'},
+        )
+
+    def test_update_service_status(self):
+        self.assertQueryBudget(
+            5, self.admin, 'post', '/admin-panel/api/update-service-status/',
+            data=lambda: {'service_id': self.create_service(status='ASSIGNED').id, 'status': 'IN_PROGRESS'},
+        )
+
+    def test_job_sheet_details(self):
+        sheet = self.create_service().job_sheet
+        self.assertQueryBudget(4, self.admin, 'get', f'/admin-panel/api/job-sheets/{sheet.id}/')
+
+    def test_service_detail(self):
+        service = self.create_service()
+        self.assertQueryBudget(3, self.admin, 'get', f'/admin-panel/api/service/{service.id}/')
+
+
+class RollupRefreshTests(QueryBudgetTestCase):
+
+    def test_day_marked_during_rebuild_stays_queued(self):
+        order = self.create_order()
+        day = local_day(order.order_date)
+        rebuild = rollups.rebuild_range
+
+        def rebuild_while_an_order_changes(first_day, last_day):
+            rebuild(first_day, last_day)
+            # Another order on the same day commits while the rebuild runs
+            rollups.mark_days_dirty([day])
+
+        with mock.patch.object(rollups, 'rebuild_range', side_effect=rebuild_while_an_order_changes):
+            self.assertEqual(rollups.refresh_dirty_days(), 1)
+        self.assertTrue(RollupDirtyDay.objects.filter(day=day).exists())
+
+        self.assertEqual(rollups.refresh_dirty_days(), 1)
+        self.assertFalse(RollupDirtyDay.objects.exists())
+
+    def test_failed_rebuild_requeues_days(self):
+        order = self.create_order()
+        with mock.patch.object(rollups, 'rebuild_range', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                rollups.refresh_dirty_days()
+        self.assertTrue(RollupDirtyDay.objects.filter(day=local_day(order.order_date)).exists())
+
+
+class AdminStatsCacheTests(QueryBudgetTestCase):
+
+    def test_stats_invalidated_on_commit(self):
+        get_admin_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order()
+            # Still cached until the order commits; deleting now would let a
+            # dashboard load cache the old counts again before the commit
+            self.assertIsNotNone(cache.get(ADMIN_STATS_CACHE_KEY))
+        self.assertIsNone(cache.get(ADMIN_STATS_CACHE_KEY))